@@ -4,6 +4,7 @@ cd "$( dirname "$0" )"
 
 echo
 echo "Installing MobileCoin command line interface."
+(cd ../python-utils && sudo python3 setup.py install)
 sudo python3 setup.py install
 
 echo
@@ -1,7 +1,10 @@
+from mc_util.amount import Pmob
 from mobilecoin.cli import CommandLineInterface
 from mobilecoin.client import (
     Client,
+    NetworkStatusProvider,
     WalletAPIError,
     mob2pmob,
     pmob2mob,
 )
+from mobilecoin.sharding import ShardedClient
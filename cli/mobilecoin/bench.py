@@ -0,0 +1,160 @@
+"""
+Open-loop load generation against a wallet server.
+
+Requests are scheduled at a fixed total arrival rate, independently of how quickly the server
+answers, and latency is measured from each request's scheduled time. A server which cannot keep
+up therefore shows growing latency, instead of the load generator quietly slowing down.
+"""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import queue
+import random
+import threading
+import time
+
+from .client import Client, WalletAPIError
+
+
+LoadTarget = namedtuple('LoadTarget', ['account_id', 'address', 'amount'])
+
+Sample = namedtuple('Sample', ['start', 'method', 'latency', 'ok'])
+
+LOAD_METHODS = {
+    'get_network_status': lambda c, t: c.get_network_status(),
+    'get_account': lambda c, t: c.get_account(t.account_id),
+    'get_balance_for_account': lambda c, t: c.get_balance_for_account(t.account_id),
+    'get_balance_for_address': lambda c, t: c.get_balance_for_address(t.address),
+    'get_addresses_for_account': lambda c, t: c.get_addresses_for_account(t.account_id),
+    'get_all_txos_for_account': lambda c, t: c.get_all_txos_for_account(t.account_id),
+    'get_transaction_logs_for_account': lambda c, t: c.get_transaction_logs_for_account(t.account_id),
+    'build_transaction': lambda c, t: c.build_transaction(t.account_id, t.amount, t.address),
+}
+
+DEFAULT_MIX = 'get_balance_for_account=8,get_all_txos_for_account=1,build_transaction=1'
+
+
+def parse_mix(mix):
+    """Parse a method mix such as "get_balance_for_account=8,build_transaction=1"."""
+    result = []
+    for item in mix.split(','):
+        method, _, weight = item.strip().partition('=')
+        if method not in LOAD_METHODS:
+            raise ValueError('Unknown method {}. Choose from: {}'.format(method, ', '.join(LOAD_METHODS)))
+        weight = float(weight) if weight else 1.0
+        if weight < 0:
+            raise ValueError('Weight for {} must not be negative.'.format(method))
+        result.append((method, weight))
+    return result
+
+
+def run_load(url, target, mix, rate, duration, workers, seed=0):
+    """
+    Issue requests from `workers` threads at `rate` requests per second for `duration` seconds.
+
+    Arrival times are drawn from a Poisson process, and methods are chosen from the weighted mix.
+    Return a list of Samples, with start times relative to the beginning of the run.
+    """
+    rng = random.Random(seed)
+    methods = [ method for method, _ in mix ]
+    weights = [ weight for _, weight in mix ]
+
+    schedule = queue.Queue()
+    samples = []
+    samples_lock = threading.Lock()
+
+    def worker():
+        c = Client(url=url)
+        while True:
+            item = schedule.get()
+            if item is None:
+                break
+            scheduled, method = item
+            delay = scheduled - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                LOAD_METHODS[method](c, target)
+                ok = True
+            except (WalletAPIError, ConnectionError, ValueError):
+                ok = False
+            latency = time.monotonic() - scheduled
+            with samples_lock:
+                samples.append(Sample(scheduled - start, method, latency, ok))
+        c.close()
+
+    threads = [ threading.Thread(target=worker, daemon=True) for _ in range(workers) ]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+
+    # Schedule arrivals slightly ahead of time, so that workers wait on the clock rather than the queue.
+    t = 0.0
+    while True:
+        t += rng.expovariate(rate)
+        if t >= duration:
+            break
+        scheduled = start + t
+        ahead = scheduled - time.monotonic() - 0.1
+        if ahead > 0:
+            time.sleep(ahead)
+        schedule.put((scheduled, rng.choices(methods, weights)[0]))
+
+    for _ in threads:
+        schedule.put(None)
+    for thread in threads:
+        thread.join()
+
+    return sorted(samples)
+
+
+def run_load_processes(url, target, mix, rate, duration, workers, processes, seed=0):
+    """Split the arrival rate evenly across several processes, and merge their samples."""
+    if processes <= 1:
+        return run_load(url, target, mix, rate, duration, workers, seed)
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [
+            executor.submit(run_load, url, target, mix, rate / processes, duration, workers, seed + i)
+            for i in range(processes)
+        ]
+        samples = []
+        for future in futures:
+            samples.extend(future.result())
+    return sorted(samples)
+
+
+def summarize(samples, interval=None, duration=None):
+    """
+    Compute throughput and latency percentiles, overall or for each `interval` seconds.
+    """
+    if interval is None:
+        groups = [(0.0, samples)]
+        if duration is None:
+            duration = max( s.start + s.latency for s in samples ) if samples else 0.0
+        span = duration
+    else:
+        buckets = {}
+        for s in samples:
+            buckets.setdefault(int(s.start // interval), []).append(s)
+        groups = [ (i * interval, buckets[i]) for i in sorted(buckets) ]
+        span = interval
+
+    rows = []
+    for t, group in groups:
+        latencies = sorted( s.latency for s in group if s.ok )
+        rows.append({
+            'time': t,
+            'requests': len(group),
+            'errors': sum( 1 for s in group if not s.ok ),
+            'throughput': len(latencies) / span if span > 0 else 0.0,
+            'p50_ms': 1000 * _percentile(latencies, 0.5),
+            'p90_ms': 1000 * _percentile(latencies, 0.9),
+            'p99_ms': 1000 * _percentile(latencies, 0.99),
+            'max_ms': 1000 * latencies[-1] if latencies else 0.0,
+        })
+    return rows
+
+
+def _percentile(sorted_values, fraction):
+    if len(sorted_values) == 0:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
@@ -1,17 +1,45 @@
 import argparse
+from contextlib import contextmanager
+import csv
 from decimal import Decimal
 from getpass import getpass
+import heapq
 import json
 import os
 from pathlib import Path
+import shlex
+import signal
 import subprocess
+import sys
 from textwrap import indent
+import time
 
+from mc_util.amount import Pmob
+from .bench import (
+    DEFAULT_MIX, LOAD_METHODS,
+    LoadTarget,
+    parse_mix, run_load_processes, summarize,
+)
 from .client import (
-    Client, WalletAPIError,
+    Client, SyncProgress, WalletAPIError,
     MAX_TOMBSTONE_BLOCKS,
-    pmob2mob,
 )
+from .daemon import CachingClient, DaemonClient
+from .replay import TrafficRecorder, replay
+
+
+# Commands which always talk to the wallet server directly, rather than through the client daemon.
+DIRECT_COMMANDS = ['start', 'stop', 'shell', 'daemon', 'bench']
+
+# Seconds to wait for the wallet server to start answering requests, or to exit.
+START_TIMEOUT = 60
+STOP_TIMEOUT = 30
+
+# Number of transaction logs fetched per request, and held back to put them in block order.
+HISTORY_PAGE_SIZE = 100
+
+# Seconds between updates of "status --watch".
+STATUS_WATCH_INTERVAL = 2.0
 
 
 class CommandLineInterface:
@@ -25,15 +53,41 @@ class CommandLineInterface:
 
         args = self.parser.parse_args()
         args = vars(args)
-        command = args.pop('command')
-        if command is None:
+        if args['command'] is None:
             self.parser.print_help()
             exit(1)
 
+        self.verbose = args['verbose']
+        self.recorder = None
+        if args['record'] is not None:
+            self.recorder = TrafficRecorder(args['record'])
+        self.client = self._create_client(args['command'])
+        try:
+            self._dispatch(args)
+        finally:
+            if self.recorder is not None:
+                self.recorder.close()
+
+    def _create_client(self, command):
+        # Forward requests through the client daemon if it is running.
+        if command not in DIRECT_COMMANDS and Path(self._daemon_socket()).exists():
+            try:
+                return self._attach_recorder(DaemonClient(self._daemon_socket(), verbose=self.verbose))
+            except ConnectionError:
+                pass
+        return self._attach_recorder(Client(url=self.config.get('api-url'), verbose=self.verbose))
+
+    def _attach_recorder(self, client):
+        # Commands which replace self.client keep recording with --record.
+        client.recorder = getattr(self, 'recorder', None)
+        return client
+
+    def _dispatch(self, args):
+        command = args.pop('command')
         self.verbose = args.pop('verbose')
         self.auto_confirm = args.pop('yes')
-
-        self.client = Client(url=self.config.get('api-url'), verbose=self.verbose)
+        args.pop('record')
+        self.client.verbose = self.verbose
 
         # Dispatch command.
         setattr(self, 'import', self.import_)  # Can't name a function "import".
@@ -46,6 +100,12 @@ class CommandLineInterface:
             print('Did you run "mobcli start"? You may also want to check the logs at {}.'.format(self.config['logfile']))
             exit(1)
 
+    def _daemon_socket(self):
+        socket_path = self.config.get('daemon-socket')
+        if socket_path is None:
+            socket_path = str(Path(self.config['logfile']).parent / 'mobcli.sock')
+        return socket_path
+
     def _create_parsers(self):
         self.parser = argparse.ArgumentParser(
             prog='mobilecoin',
@@ -53,6 +113,8 @@ class CommandLineInterface:
         )
         self.parser.add_argument('-v', '--verbose', action='store_true', help='Show more information.')
         self.parser.add_argument('-y', '--yes', action='store_true', help='Do not ask for confirmation.')
+        self.parser.add_argument('--record', metavar='FILE',
+                                 help='Record requests and responses to a JSON lines file, compressed if it ends in ".gz".')
 
         command_sp = self.parser.add_subparsers(dest='command', help='Commands')
 
@@ -65,12 +127,28 @@ class CommandLineInterface:
                                      help='Do not encrypt the wallet database. Secret keys will be stored on the hard drive in plaintext.')
         self.start_args.add_argument('--change-password', action='store_true',
                                      help='Change the password for the database.')
+        self.start_args.add_argument('--wait', action='store_true',
+                                     help='With --bg, wait until the server is answering requests.')
 
         # Stop server.
         self.stop_args = command_sp.add_parser('stop', help='Stop the local MobileCoin wallet server.')
 
+        # Interactive shell.
+        self.shell_args = command_sp.add_parser('shell', help='Run commands interactively, keeping a warm connection to the wallet server.')
+
+        # Client daemon.
+        self.daemon_args = command_sp.add_parser('daemon', help='Client daemon commands.')
+        daemon_action = self.daemon_args.add_subparsers(dest='action')
+        daemon_action.add_parser('start', help='Start a background client daemon, which later commands are forwarded to.')
+        daemon_action.add_parser('stop', help='Stop the client daemon.')
+        daemon_action.add_parser('status', help='Show client daemon statistics.')
+
         # Network status.
         self.status_args = command_sp.add_parser('status', help='Check the status of the MobileCoin network.')
+        self.status_args.add_argument('-w', '--watch', action='store_true',
+                                      help='Keep showing sync progress for the ledger and accounts, until interrupted.')
+        self.status_args.add_argument('--interval', type=float, default=STATUS_WATCH_INTERVAL,
+                                      help='Seconds between updates with --watch.')
 
         # List accounts.
         self.list_args = command_sp.add_parser('list', help='List accounts.')
@@ -103,8 +181,19 @@ class CommandLineInterface:
         self.remove_args = command_sp.add_parser('remove', help='Remove an account from local storage.')
         self.remove_args.add_argument('account_id', help='ID of the account to remove.')
         # Show transaction history.
-        self.history_args = command_sp.add_parser('history', help='Show account transaction history.')
+        self.history_args = command_sp.add_parser(
+            'history',
+            help='Show account transaction history.',
+            description='Show account transaction history, in block order. Transactions are fetched {} at a time, and '
+                        'only those to be shown are kept in memory.'.format(HISTORY_PAGE_SIZE),
+        )
         self.history_args.add_argument('account_id', help='Account ID.')
+        self.history_args.add_argument('--since-block', type=int, help='Only show transactions in or after this block.')
+        self.history_args.add_argument('--limit', type=int, help='Show at most this many transactions.')
+        self.history_args.add_argument('--no-pager', action='store_true', help='Do not page the output.')
+        self.history_args.add_argument('--export', metavar='FILE', help='Write the history to a file instead of showing it.')
+        self.history_args.add_argument('--format', choices=['csv', 'jsonl', 'columnar'], default='csv',
+                                       help='Export file format. The columnar format is Parquet, and requires pyarrow.')
 
         # Send transaction.
         self.send_args = command_sp.add_parser('send', help='Send a transaction.')
@@ -140,6 +229,16 @@ class CommandLineInterface:
         self.address_create_args.add_argument('account_id', help='Account ID.')
         self.address_create_args.add_argument('metadata', nargs='?', help='Address label.')
 
+        # Txo commands.
+        self.txos_args = command_sp.add_parser('txos', help='Account txo commands.')
+        txos_action = self.txos_args.add_subparsers(dest='action')
+
+        # Txo statistics.
+        self.txos_stats_args = txos_action.add_parser('stats', help='Show how the funds in an account are split across txos.')
+        self.txos_stats_args.add_argument('account_id', help='Account ID.')
+        self.txos_stats_args.add_argument('-a', '--amount', help='Estimate the inputs and transactions needed to send this amount of MOB.')
+        self.txos_stats_args.add_argument('--dust', help='Count unspent txos worth less than this amount of MOB as dust. Defaults to the network fee.')
+
         # Gift code commands.
         self.gift_args = command_sp.add_parser('gift', help='Gift code commands.')
         gift_action = self.gift_args.add_subparsers(dest='action')
@@ -162,6 +261,34 @@ class CommandLineInterface:
         self.gift_remove_args = gift_action.add_parser('remove', help='Remove a gift code.')
         self.gift_remove_args.add_argument('gift_code', help='Gift code to remove.')
 
+        # Benchmark commands.
+        self.bench_args = command_sp.add_parser('bench', help='Benchmark commands.')
+        bench_action = self.bench_args.add_subparsers(dest='action')
+
+        # Load test.
+        self.bench_load_args = bench_action.add_parser('load', help='Measure wallet server throughput and latency under load.')
+        self.bench_load_args.add_argument('account_id', nargs='?', help='Account to query. Not needed with --mock.')
+        self.bench_load_args.add_argument('--mock', action='store_true', help='Run against an in-process mock wallet server.')
+        self.bench_load_args.add_argument('--mix', default=DEFAULT_MIX,
+                                          help='Weighted methods to call, as "method=weight,...". Choose from: {}.'.format(
+                                              ', '.join(LOAD_METHODS)))
+        self.bench_load_args.add_argument('--rate', type=float, default=50, help='Requests per second.')
+        self.bench_load_args.add_argument('--duration', type=float, default=10, help='Seconds to run.')
+        self.bench_load_args.add_argument('--workers', type=int, default=8, help='Worker threads per process.')
+        self.bench_load_args.add_argument('--processes', type=int, default=1, help='Worker processes.')
+        self.bench_load_args.add_argument('--interval', type=float, default=1.0, help='Seconds per reporting interval.')
+        self.bench_load_args.add_argument('--json', dest='json_file', help='Also write the results to this JSON file.')
+
+        # Replay recorded traffic.
+        self.bench_replay_args = bench_action.add_parser('replay', help='Re-issue traffic recorded with --record against the wallet server.')
+        self.bench_replay_args.add_argument('recording', help='Recorded traffic file.')
+        self.bench_replay_args.add_argument('--speed', type=float, default=1.0,
+                                            help='Replay speed relative to the recording. Use 0 to send requests as fast as possible.')
+        self.bench_replay_args.add_argument('--workers', type=int, default=8, help='Worker threads.')
+        self.bench_replay_args.add_argument('--include-mutations', action='store_true',
+                                            help='Also re-issue requests which change wallet state, such as sending transactions.')
+        self.bench_replay_args.add_argument('--json', dest='json_file', help='Also write the results to this JSON file.')
+
     def _load_account_prefix(self, prefix):
         accounts = self.client.get_all_accounts()
         matching_ids = [
@@ -184,7 +311,7 @@ class CommandLineInterface:
         confirmation = input(message)
         return confirmation.lower() in ['y', 'yes']
 
-    def start(self, offline=False, bg=False, unencrypted=False, change_password=False):
+    def start(self, offline=False, bg=False, unencrypted=False, change_password=False, wait=False):
         password = ''
         new_password = ''
         if not unencrypted:
@@ -224,11 +351,6 @@ class CommandLineInterface:
         if ingest_enclave:
             wallet_server_command += ['--fog-ingest-enclave-css', ingest_enclave]
 
-        if bg:
-            wallet_server_command += [
-                '>', self.config['logfile'], '2>&1'
-            ]
-
         if self.verbose:
             print(' '.join(wallet_server_command))
 
@@ -237,21 +359,340 @@ class CommandLineInterface:
         Path(self.config['ledger-db']).mkdir(parents=True, exist_ok=True)
         Path(self.config['wallet-db']).parent.mkdir(parents=True, exist_ok=True)
 
-        if bg:
-            subprocess.Popen(' '.join(wallet_server_command), shell=True, env=env)
-            print('Started, view log at {}.'.format(self.config['logfile']))
-            print('Stop server with "mobcli stop".')
-        else:
-            subprocess.run(' '.join(wallet_server_command), shell=True, env=env)
+        if not bg:
+            subprocess.run(wallet_server_command, env=env)
+            return True
+
+        Path(self.config['logfile']).parent.mkdir(parents=True, exist_ok=True)
+        with open(self.config['logfile'], 'w') as log:
+            self._server_process = subprocess.Popen(
+                wallet_server_command,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+        self._pid_file().write_text(str(self._server_process.pid))
+        print('Started, view log at {}.'.format(self.config['logfile']))
+
+        if wait:
+            ready = self._wait_for_server(self._server_process)
+            if ready is None:
+                print('The server did not start answering requests. Check the log at {}.'.format(
+                    self.config['logfile']))
+                return False
+            network_status, seconds = ready
+            print('Ready after {:.1f} seconds.'.format(seconds))
+            network_height = int(network_status['network_block_height'])
+            local_height = int(network_status['local_block_height'])
+            if network_height == 0:
+                print('Offline, local ledger has {} blocks.'.format(local_height))
+            else:
+                print('Local ledger is {} blocks behind the network, at {}/{}.'.format(
+                    max(network_height - local_height, 0), local_height, network_height))
+
+        print('Stop server with "mobcli stop".')
+        return True
+
+    def _wait_for_server(self, process, timeout=START_TIMEOUT):
+        """
+        Probe the server with get_network_status, backing off between attempts, until it answers.
+
+        Return the network status and the number of seconds it took, or None if the server exited
+        or did not answer within the timeout.
+        """
+        client = Client(url=self.config.get('api-url'))
+        start = time.monotonic()
+        delay = 0.05
+        while True:
+            if process.poll() is not None:
+                return None
+            try:
+                network_status = client.get_network_status()
+            except (ConnectionError, ValueError, WalletAPIError):
+                pass
+            else:
+                client.close()
+                return network_status, time.monotonic() - start
+            if time.monotonic() - start > timeout:
+                return None
+            time.sleep(delay)
+            delay = min(delay * 2, 0.25)
 
-    def stop(self):
+    def stop(self, timeout=STOP_TIMEOUT):
         if self.verbose:
             print('Stopping MobileCoin wallet server...')
-        subprocess.Popen(['killall', '-v', self.config['executable']])
 
-    def status(self):
+        pid_file = self._pid_file()
+        try:
+            pid = int(pid_file.read_text())
+        except (OSError, ValueError):
+            pid = None
+
+        # The pid may have been reused by an unrelated process since the server exited.
+        if pid is not None and not _is_command(_process_command(pid), self.config['executable']):
+            print('Removing stale pid file {}.'.format(pid_file))
+            pid_file.unlink(missing_ok=True)
+            pid = None
+
+        if pid is None:
+            # The server was not started by mobcli; stop it by name, and wait until it is gone.
+            subprocess.run(['killall', '-v', self.config['executable']])
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                running = subprocess.run(
+                    ['killall', '-0', self.config['executable']],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
+                if running.returncode != 0:
+                    return True
+                time.sleep(0.05)
+            print('The server is still running.')
+            return False
+
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pid_file.unlink(missing_ok=True)
+            return True
+        except PermissionError:
+            print('Not permitted to stop the server, process {}.'.format(pid))
+            return False
+
+        # A server started by this process must be reaped, rather than polled.
+        process = getattr(self, '_server_process', None)
+        if process is not None and process.pid == pid:
+            try:
+                process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                print('The server is still running.')
+                return False
+        else:
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    os.kill(pid, 0)
+                except (ProcessLookupError, PermissionError):
+                    # Gone, or the pid now belongs to another user's process.
+                    break
+                if time.monotonic() > deadline:
+                    print('The server is still running.')
+                    return False
+                time.sleep(0.05)
+
+        pid_file.unlink(missing_ok=True)
+        return True
+
+    def _pid_file(self):
+        pid_file = self.config.get('pid-file')
+        if pid_file is None:
+            pid_file = Path(self.config['logfile']).parent / 'full-service.pid'
+        return Path(pid_file)
+
+    def shell(self):
+        self.client = self._attach_recorder(CachingClient(url=self.config.get('api-url'), verbose=self.verbose))
+        print('MobileCoin shell. Type "help" for a list of commands, or "exit" to quit.')
+
+        while True:
+            try:
+                line = input('mobcli> ')
+            except (EOFError, KeyboardInterrupt):
+                print()
+                break
+
+            try:
+                argv = shlex.split(line)
+            except ValueError as e:
+                print(e)
+                continue
+            if len(argv) == 0:
+                continue
+            if argv[0] in ['exit', 'quit']:
+                break
+            if argv[0] == 'help':
+                self.parser.print_help()
+                continue
+            if argv[0] in ['shell', 'daemon']:
+                print('Cannot run "{}" from the shell.'.format(argv[0]))
+                continue
+
+            try:
+                args = vars(self.parser.parse_args(argv))
+                if args['command'] is not None:
+                    self._dispatch(args)
+            except SystemExit:
+                pass
+            except KeyboardInterrupt:
+                print()
+            except WalletAPIError as e:
+                print(json.dumps(e.response.get('error', e.response), indent=2))
+
+        self.client.close()
+
+    def daemon(self, action, **args):
+        try:
+            getattr(self, 'daemon_' + action)(**args)
+        except TypeError:
+            self.daemon_args.print_help()
+
+    def daemon_start(self):
+        socket_path = self._daemon_socket()
+        try:
+            DaemonClient(socket_path).close()
+        except ConnectionError:
+            pass
+        else:
+            print('Client daemon is already running at {}.'.format(socket_path))
+            return
+
+        daemon_command = [sys.executable, '-m', 'mobilecoin.daemon', socket_path]
+        if self.config.get('api-url') is not None:
+            daemon_command += ['--url', self.config['api-url']]
+        if self.verbose:
+            print(' '.join(daemon_command))
+
+        subprocess.Popen(
+            daemon_command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+        for _ in range(50):
+            time.sleep(0.1)
+            try:
+                DaemonClient(socket_path).close()
+            except ConnectionError:
+                continue
+            print('Started client daemon at {}.'.format(socket_path))
+            print('Stop it with "mobcli daemon stop".')
+            return
+
+        print('Could not start the client daemon.')
+        exit(1)
+
+    def daemon_stop(self):
+        try:
+            daemon_client = DaemonClient(self._daemon_socket())
+        except ConnectionError:
+            print('Client daemon is not running.')
+            return
+        daemon_client.daemon_stop()
+        daemon_client.close()
+        print('Stopped client daemon.')
+
+    def daemon_status(self):
+        try:
+            daemon_client = DaemonClient(self._daemon_socket())
+        except ConnectionError:
+            print('Client daemon is not running.')
+            return
+        status = daemon_client.daemon_status()
+        daemon_client.close()
+        print('Client daemon running at {}, pid {}, up {:.0f} seconds.'.format(
+            self._daemon_socket(), status['pid'], status['uptime']))
+        print('Forwarding to {}.'.format(status['url']))
+        print('Served {} requests, {} cache hits, {} cache misses.'.format(
+            status['requests'], status['cache_hits'], status['cache_misses']))
+
+    def bench(self, action, **args):
+        try:
+            getattr(self, 'bench_' + action)(**args)
+        except TypeError:
+            self.bench_args.print_help()
+
+    def bench_load(self, account_id=None, mock=False, mix=DEFAULT_MIX, rate=50, duration=10, workers=8,
+                   processes=1, interval=1.0, json_file=None):
+        try:
+            mix = parse_mix(mix)
+        except ValueError as e:
+            print(e)
+            exit(1)
+
+        server = None
+        if mock:
+            from .mock_server import MockServer, MockWallet
+            server = MockServer(MockWallet(block_interval=1.0))
+            self.client = self._attach_recorder(Client(url=server.start()))
+            account = self.client.import_account('load test account', name='Load test')
+        elif account_id is None:
+            print('Choose an account to query, or run against a mock server with --mock.')
+            exit(1)
+        else:
+            account = self._load_account_prefix(account_id)
+
+        target = LoadTarget(account['account_id'], account['main_address'], '0.0001')
+        print('Running {} requests/sec for {} seconds, with {} processes of {} workers each.'.format(
+            rate, duration, processes, workers))
+        try:
+            samples = run_load_processes(self.client.url, target, mix, rate, duration, workers, processes)
+        finally:
+            if server is not None:
+                server.stop()
+
+        intervals = summarize(samples, interval)
+        total = summarize(samples, duration=duration)
+        print()
+        _print_load_summary(intervals)
+        print()
+        _print_load_summary(total, label_time=False)
+
+        if json_file is not None:
+            with open(json_file, 'w') as f:
+                json.dump({
+                    'url': self.client.url,
+                    'mix': dict(mix),
+                    'rate': rate,
+                    'duration': duration,
+                    'workers': workers,
+                    'processes': processes,
+                    'intervals': intervals,
+                    'total': total[0],
+                }, f, indent=2)
+                f.write('\n')
+            print(f'Wrote {json_file}')
+
+    def bench_replay(self, recording, speed=1.0, workers=8, include_mutations=False, json_file=None):
+        print('Replaying {} against {} at {}x speed.'.format(recording, self.client.url, speed))
+        samples, recorded, skipped = replay(recording, self.client.url, speed, workers, include_mutations)
+        if skipped > 0:
+            if include_mutations:
+                print('Skipped {} requests with redacted secrets.'.format(skipped))
+            else:
+                print('Skipped {} requests which change wallet state or hold redacted secrets. '
+                      'Use --include-mutations to send them.'.format(skipped))
+        if len(samples) == 0:
+            print('There are no requests to replay.')
+            return
+
+        print()
+        print('Recorded:')
+        _print_load_summary(summarize(recorded), label_time=False)
+        print()
+        print('Replayed:')
+        _print_load_summary(summarize(samples), label_time=False)
+
+        if json_file is not None:
+            with open(json_file, 'w') as f:
+                json.dump({
+                    'url': self.client.url,
+                    'recording': recording,
+                    'speed': speed,
+                    'recorded': summarize(recorded)[0],
+                    'replayed': summarize(samples)[0],
+                }, f, indent=2)
+                f.write('\n')
+            print(f'Wrote {json_file}')
+
+    def status(self, watch=False, interval=STATUS_WATCH_INTERVAL):
+        if watch:
+            self._watch_status(interval)
+            return
+
         network_status = self.client.get_network_status()
-        fee = pmob2mob(network_status['fee_pmob'])
+        fee = Pmob(network_status['fee_pmob'])
 
         if int(network_status['network_block_height']) == 0:
             print('Offline.')
@@ -265,6 +706,42 @@ class CommandLineInterface:
             ))
             print('Network fee is {}'.format(_format_mob(fee)))
 
+    def _watch_status(self, interval):
+        """
+        Redraw sync progress every interval seconds, from two requests per update: the network
+        status, and all accounts, whose next_block_index is their account_block_height.
+        """
+        progress = SyncProgress()
+        redraw = sys.stdout.isatty()
+        line_count = 0
+        try:
+            while True:
+                network_status = self.client.network_status(max_age=0)
+                accounts = self.client.get_all_accounts()
+                network_block = network_status.network_block_height
+                if network_block == 0:
+                    # Offline, so sync towards the local ledger instead.
+                    network_block = network_status.local_block_height
+                progress.update('ledger', network_status.local_block_height, network_block, network_status.fetched_at)
+                for account_id, account in accounts.items():
+                    progress.update(account_id, account['next_block_index'], network_block, network_status.fetched_at)
+                for key in list(progress.keys()):
+                    if key != 'ledger' and key not in accounts:
+                        progress.forget(key)
+
+                lines = [_format_sync_progress(progress, 'ledger', 'Ledger')]
+                for account_id, account in accounts.items():
+                    lines.append(_format_sync_progress(progress, account_id, '  ' + _format_account_header(account)))
+                if redraw and line_count:
+                    # Move up over the last update, and clear it.
+                    sys.stdout.write('\x1b[{}F\x1b[J'.format(line_count))
+                print('\n'.join(lines), flush=True)
+                line_count = len(lines)
+
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print()
+
     def list(self, **args):
         accounts = self.client.get_all_accounts(**args)
 
@@ -383,64 +860,64 @@ class CommandLineInterface:
         self.client.remove_account(account_id)
         print('Removed.')
 
-    def history(self, account_id):
+    def history(self, account_id, since_block=None, limit=None, no_pager=False, export=None, format='csv'):
         account = self._load_account_prefix(account_id)
         account_id = account['account_id']
 
-        transactions = self.client.get_all_transaction_logs_for_account(account_id)
-
-        def block_key(t):
-            submitted = t['submitted_block_index']
-            finalized = t['finalized_block_index']
-            if submitted is not None and finalized is not None:
-                return min([submitted, finalized])
-            elif submitted is not None and finalized is None:
-                return submitted
-            elif submitted is None and finalized is not None:
-                return finalized
-            else:
-                return None
+        transactions = _block_ordered(
+            self.client.iter_transaction_logs_for_account(account_id, page_size=HISTORY_PAGE_SIZE),
+            since_block,
+            limit,
+        )
 
-        transactions = sorted(transactions.values(), key=block_key)
+        if export is not None:
+            path = Path(export)
+            if path.exists():
+                print(f'The file {path} already exists. Please rename the existing file and retry.')
+                return
+            try:
+                count = _export_history(transactions, path, format)
+            except ImportError:
+                print('Exporting to the columnar format requires the pyarrow library. Try:')
+                print('$ pip install pyarrow')
+                return
+            print(f'Wrote {count} transactions to {path}')
+            return
 
-        for t in transactions:
-            print()
-            if t['direction'] == 'tx_direction_received':
-                amount = _format_mob(
-                    sum(
-                        pmob2mob(txo['value_pmob'])
-                        for txo in t['output_txos']
+        with _pager(enabled=not no_pager):
+            for t in transactions:
+                print()
+                if t['direction'] == 'tx_direction_received':
+                    amount = _format_mob(
+                        Pmob.total( txo['value_pmob'] for txo in t['output_txos'] )
                     )
-                )
-                print('Received {}'.format(amount))
-                print('  at {}'.format(t['assigned_address_id']))
-            elif t['direction'] == 'tx_direction_sent':
-                for txo in t['output_txos']:
-                    amount = _format_mob(pmob2mob(txo['value_pmob']))
-                    print('Sent {}'.format(amount))
-                    if not txo['recipient_address_id']:
-                        print('  to an unknown address.')
-                    else:
-                        print('  to {}'.format(txo['recipient_address_id']))
-            print('  in block {}'.format(block_key(t)), end=', ')
-            if t['fee_pmob'] is None:
-                print('paying an unknown fee.')
-            else:
-                print('paying a fee of {}'.format(_format_mob(pmob2mob(t['fee_pmob']))))
-        print()
+                    print('Received {}'.format(amount))
+                    print('  at {}'.format(t['assigned_address_id']))
+                elif t['direction'] == 'tx_direction_sent':
+                    for txo in t['output_txos']:
+                        amount = _format_mob(Pmob(txo['value_pmob']))
+                        print('Sent {}'.format(amount))
+                        if not txo['recipient_address_id']:
+                            print('  to an unknown address.')
+                        else:
+                            print('  to {}'.format(txo['recipient_address_id']))
+                print('  in block {}'.format(_block_key(t)), end=', ')
+                if t['fee_pmob'] is None:
+                    print('paying an unknown fee.')
+                else:
+                    print('paying a fee of {}'.format(_format_mob(Pmob(t['fee_pmob']))))
+            print()
 
     def send(self, account_id, amount, to_address, build_only=False, fee=None):
         account = self._load_account_prefix(account_id)
         account_id = account['account_id']
         balance = self.client.get_balance_for_account(account_id)
-        unspent = pmob2mob(balance['unspent_pmob'])
-
-        network_status = self.client.get_network_status()
+        unspent = Pmob(balance['unspent_pmob'])
 
         if fee is None:
-            fee = pmob2mob(network_status['fee_pmob'])
+            fee = self.client.network_status().fee_pmob
         else:
-            fee = Decimal(fee)
+            fee = Pmob.from_mob(fee)
 
         if unspent <= fee:
             print('There is not enough MOB in account {} to pay the transaction fee.'.format(account_id[:6]))
@@ -450,7 +927,7 @@ class CommandLineInterface:
             amount = unspent - fee
             total_amount = unspent
         else:
-            amount = Decimal(amount)
+            amount = Pmob.from_mob(amount)
             total_amount = amount + fee
 
         if build_only:
@@ -480,7 +957,7 @@ class CommandLineInterface:
             return
 
         if build_only:
-            tx_proposal = self.client.build_transaction(account_id, amount, to_address, fee=fee)
+            tx_proposal = self.client.build_transaction(account_id, None, to_address, amount_pmob=amount, fee_pmob=fee)
             path = Path('tx_proposal.json')
             if path.exists():
                 print(f'The file {path} already exists. Please rename the existing file and retry.')
@@ -496,14 +973,15 @@ class CommandLineInterface:
 
         transaction_log, tx_proposal = self.client.build_and_submit_transaction_with_proposal(
             account_id,
-            amount,
+            None,
             to_address,
-            fee=fee,
+            amount_pmob=amount,
+            fee_pmob=fee,
         )
 
         print('Sent {}, with a transaction fee of {}'.format(
-            _format_mob(pmob2mob(transaction_log['value_pmob'])),
-            _format_mob(pmob2mob(transaction_log['fee_pmob'])),
+            _format_mob(Pmob(transaction_log['value_pmob'])),
+            _format_mob(Pmob(transaction_log['fee_pmob'])),
         ))
 
     def submit(self, proposal, account_id=None, receipt=False):
@@ -516,8 +994,7 @@ class CommandLineInterface:
 
         # Check that the tombstone block is within range.
         tombstone_block = int(tx_proposal['tx']['prefix']['tombstone_block'])
-        network_status = self.client.get_network_status()
-        lo = int(network_status['network_block_height']) + 1
+        lo = self.client.network_status().network_block_height + 1
         hi = lo + MAX_TOMBSTONE_BLOCKS - 1
         if lo >= tombstone_block:
             print('This transaction has expired, and can no longer be submitted.')
@@ -541,7 +1018,7 @@ class CommandLineInterface:
         # Confirm and submit.
         if account_id is None:
             print('This transaction will not be logged, because an account id was not provided.')
-        total_value = sum( pmob2mob(outlay['value']) for outlay in tx_proposal['outlay_list'] )
+        total_value = Pmob.total( outlay['value'] for outlay in tx_proposal['outlay_list'] )
         if not self.confirm(
             'Submit this transaction proposal for {}? (Y/N) '.format(_format_mob(total_value))
         ):
@@ -610,6 +1087,71 @@ class CommandLineInterface:
         ))
         print()
 
+    def txos(self, action, **args):
+        try:
+            getattr(self, 'txos_' + action)(**args)
+        except TypeError:
+            self.txos_args.print_help()
+
+    def txos_stats(self, account_id, amount=None, dust=None):
+        account = self._load_account_prefix(account_id)
+        stats = self.client.analyze_txos(account['account_id'], amount=amount, dust_threshold=dust)
+
+        print()
+        print(_format_account_header(account))
+        print(indent('{} txos'.format(stats['count']), ' '*2))
+        for status, totals in stats['statuses'].items():
+            print(indent(
+                '{:<10} {:>8} {}'.format(status, totals['count'], _format_mob(totals['value_pmob'])),
+                ' '*4,
+            ))
+
+        if stats['histogram']:
+            print()
+            print(indent('Unspent txos by value:', ' '*2))
+            for bucket in stats['histogram']:
+                print(indent(
+                    '{:>24} {:>8} {}'.format(
+                        '{} - {}'.format(bucket['min_pmob'].format(), _format_mob(bucket['max_pmob'])),
+                        bucket['count'],
+                        _format_mob(bucket['value_pmob']),
+                    ),
+                    ' '*4,
+                ))
+
+        dust = stats['dust']
+        print()
+        print(indent(
+            'Dust, under {}: {} txos ({:.1%}), totalling {} ({:.1%})'.format(
+                _format_mob(dust['threshold_pmob']),
+                dust['count'],
+                dust['count_share'],
+                _format_mob(dust['value_pmob']),
+                dust['value_share'],
+            ),
+            ' '*2,
+        ))
+
+        send = stats['send']
+        if send is not None:
+            if send['sufficient']:
+                print(indent(
+                    'Sending {} takes {} txos in {} transaction{}, paying {} in fees.'.format(
+                        _format_mob(send['amount_pmob']),
+                        send['inputs'],
+                        send['transactions'],
+                        '' if send['transactions'] == 1 else 's',
+                        _format_mob(send['total_fee_pmob']),
+                    ),
+                    ' '*2,
+                ))
+            else:
+                print(indent(
+                    'There are not enough unspent txos to send {}.'.format(_format_mob(send['amount_pmob'])),
+                    ' '*2,
+                ))
+        print()
+
     def gift(self, action, **args):
         getattr(self, 'gift_' + action)(**args)
 
@@ -623,7 +1165,7 @@ class CommandLineInterface:
                 print()
                 _print_gift_code(
                     gift_code['gift_code_b58'],
-                    pmob2mob(gift_code['value_pmob']),
+                    Pmob(gift_code['value_pmob']),
                     gift_code['memo'],
                     response['gift_code_status'],
                 )
@@ -631,8 +1173,8 @@ class CommandLineInterface:
 
     def gift_create(self, account_id, amount, memo=''):
         account = self._load_account_prefix(account_id)
-        amount = Decimal(amount)
-        response = self.client.build_gift_code(account['account_id'], amount, memo)
+        amount = Pmob.from_mob(amount)
+        response = self.client.build_gift_code(account['account_id'], None, memo, amount_pmob=amount)
         gift_code_b58 = response['gift_code_b58']
         tx_proposal = response['tx_proposal']
 
@@ -653,7 +1195,7 @@ class CommandLineInterface:
     def gift_claim(self, account_id, gift_code):
         account = self._load_account_prefix(account_id)
         response = self.client.check_gift_code_status(gift_code)
-        amount = pmob2mob(response['gift_code_value'])
+        amount = Pmob(response['gift_code_value'])
         status = response['gift_code_status']
         memo = response.get('gift_code_memo', '')
 
@@ -687,7 +1229,7 @@ class CommandLineInterface:
             gift_code = self.client.get_gift_code(gift_code_b58)
             response = self.client.check_gift_code_status(gift_code_b58)
 
-            amount = pmob2mob(response['gift_code_value'])
+            amount = Pmob(response['gift_code_value'])
             status = response['gift_code_status']
             memo = response.get('gift_code_memo', '')
             print()
@@ -713,10 +1255,233 @@ class CommandLineInterface:
                 return
 
 
+def _process_command(pid):
+    """The arguments a running process was started with, or None if there is no such process."""
+    try:
+        return Path('/proc/{}/cmdline'.format(pid)).read_bytes().decode(errors='replace').split('\0')[:-1]
+    except FileNotFoundError:
+        if Path('/proc/self').exists():
+            return None
+    except OSError:
+        return None
+
+    # No /proc, as on macOS.
+    result = subprocess.run(['ps', '-p', str(pid), '-o', 'command='], capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return result.stdout.split()
+
+
+def _is_command(command, executable):
+    """Whether a process's arguments show that it is running executable."""
+    return bool(command) and Path(command[0]).name == Path(executable).name
+
+
+def _block_key(t):
+    submitted = t['submitted_block_index']
+    finalized = t['finalized_block_index']
+    blocks = [ int(b) for b in [submitted, finalized] if b is not None ]
+    if len(blocks) == 0:
+        return None
+    return min(blocks)
+
+
+def _block_ordered(transactions, since_block=None, limit=None):
+    """
+    Order a stream of transaction logs exactly by block, keeping the server's order within a
+    block. Logs without a block index come last.
+
+    Logs arrive from the server in the order they were written, which can be any distance from
+    block order, so the whole stream is read before the first log is yielded. Logs before
+    since_block are dropped as they arrive, and given a limit, only the earliest `limit` logs are
+    kept in a heap, so memory is bounded by what is shown rather than by the account's history.
+    """
+    items = []
+    for i, t in enumerate(transactions):
+        block = _block_key(t)
+        if since_block is not None and (block is None or block < since_block):
+            continue
+        items.append((1, 0, i, t) if block is None else (0, block, i, t))
+        if limit is not None and len(items) >= 2 * limit + HISTORY_PAGE_SIZE:
+            # Drop the logs which can no longer be shown.
+            items = heapq.nsmallest(limit, items)
+    if limit is None:
+        items.sort()
+    else:
+        items = heapq.nsmallest(limit, items)
+    for item in items:
+        yield item[-1]
+
+
+HISTORY_EXPORT_FIELDS = [
+    'transaction_log_id',
+    'account_id',
+    'direction',
+    'status',
+    'block_index',
+    'submitted_block_index',
+    'finalized_block_index',
+    'value_pmob',
+    'fee_pmob',
+    'address',
+    'sent_time',
+]
+
+# Number of rows in each row group of a columnar export.
+COLUMNAR_ROW_GROUP_SIZE = 10000
+
+
+def _history_row(t):
+    """Flatten a transaction log into an export row, with amounts as integer picoMOB."""
+    if t['direction'] == 'tx_direction_received':
+        address = t['assigned_address_id']
+    else:
+        address = ';'.join( txo['recipient_address_id'] or '' for txo in t['output_txos'] )
+
+    def int_or_none(x):
+        return None if x is None else int(x)
+
+    return [
+        t['transaction_log_id'],
+        t['account_id'],
+        t['direction'],
+        t['status'],
+        _block_key(t),
+        int_or_none(t['submitted_block_index']),
+        int_or_none(t['finalized_block_index']),
+        int(t['value_pmob']),
+        int_or_none(t['fee_pmob']),
+        address,
+        t['sent_time'],
+    ]
+
+
+def _export_history(transactions, path, format):
+    """Write transaction logs to a file one row at a time, and return the number of rows."""
+    rows = map(_history_row, transactions)
+    count = 0
+
+    if format == 'columnar':
+        import pyarrow
+        import pyarrow.parquet
+
+        schema = pyarrow.schema([
+            ('transaction_log_id', pyarrow.string()),
+            ('account_id', pyarrow.string()),
+            ('direction', pyarrow.string()),
+            ('status', pyarrow.string()),
+            ('block_index', pyarrow.uint64()),
+            ('submitted_block_index', pyarrow.uint64()),
+            ('finalized_block_index', pyarrow.uint64()),
+            ('value_pmob', pyarrow.uint64()),
+            ('fee_pmob', pyarrow.uint64()),
+            ('address', pyarrow.string()),
+            ('sent_time', pyarrow.string()),
+        ])
+        with pyarrow.parquet.ParquetWriter(str(path), schema) as writer:
+            while True:
+                group = [ row for _, row in zip(range(COLUMNAR_ROW_GROUP_SIZE), rows) ]
+                if len(group) == 0:
+                    break
+                columns = [ list(column) for column in zip(*group) ]
+                writer.write_table(pyarrow.Table.from_arrays(columns, schema=schema))
+                count += len(group)
+        return count
+
+    with path.open('w', newline='') as f:
+        if format == 'csv':
+            writer = csv.writer(f)
+            writer.writerow(HISTORY_EXPORT_FIELDS)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        elif format == 'jsonl':
+            for row in rows:
+                f.write(json.dumps(dict(zip(HISTORY_EXPORT_FIELDS, row))))
+                f.write('\n')
+                count += 1
+        else:
+            raise ValueError('Unknown export format {}'.format(format))
+    return count
+
+
+@contextmanager
+def _pager(enabled=True):
+    """Send printed output through $PAGER while it is being generated, if writing to a terminal."""
+    if not enabled or not sys.stdout.isatty():
+        yield
+        return
+
+    env = dict(os.environ)
+    env.setdefault('LESS', 'FRX')
+    pager = subprocess.Popen(
+        os.environ.get('PAGER', 'less'),
+        shell=True,
+        stdin=subprocess.PIPE,
+        env=env,
+        universal_newlines=True,
+    )
+    stdout = sys.stdout
+    sys.stdout = pager.stdin
+    try:
+        yield
+    except BrokenPipeError:
+        pass  # The pager was closed before all output was written.
+    finally:
+        sys.stdout = stdout
+        try:
+            pager.stdin.close()
+        except BrokenPipeError:
+            pass
+        pager.wait()
+
+
+def _print_load_summary(rows, label_time=True):
+    print('{:>8} {:>9} {:>7} {:>11} {:>9} {:>9} {:>9}'.format(
+        'time' if label_time else '', 'requests', 'errors', 'req/sec', 'p50 ms', 'p90 ms', 'p99 ms'))
+    for row in rows:
+        print('{:>8} {:>9} {:>7} {:>11.1f} {:>9.2f} {:>9.2f} {:>9.2f}'.format(
+            '{:.0f}s'.format(row['time']) if label_time else 'total',
+            row['requests'],
+            row['errors'],
+            row['throughput'],
+            row['p50_ms'],
+            row['p90_ms'],
+            row['p99_ms'],
+        ))
+
+
 def _format_mob(mob):
+    if isinstance(mob, Pmob):
+        return '{} MOB'.format(mob.format())
     return '{} MOB'.format(_format_decimal(mob))
 
 
+def _format_sync_progress(progress, key, label):
+    height = progress.height(key)
+    target = progress.target(key)
+    result = '{:<24} {:>10}/{} blocks'.format(label, height, target)
+    if height >= target:
+        return result + ', synced'
+
+    rate = progress.rate(key)
+    eta = progress.eta(key)
+    if rate is not None:
+        result += ', {:.1f} blocks/sec'.format(rate)
+    if eta is not None:
+        result += ', {} left'.format(_format_duration(eta))
+    return result
+
+
+def _format_duration(seconds):
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return '{}h {:02d}m'.format(seconds // 3600, seconds % 3600 // 60)
+    if seconds >= 60:
+        return '{}m {:02d}s'.format(seconds // 60, seconds % 60)
+    return '{}s'.format(seconds)
+
+
 def _format_decimal(d):
     # Adapted from https://stackoverflow.com/questions/11227620/drop-trailing-zeros-from-decimal
     d = Decimal(d)
@@ -737,7 +1502,7 @@ def _format_balance(balance):
         offline = True
         network_block = int(balance['local_block_height'])
 
-    orphaned = pmob2mob(balance['orphaned_pmob'])
+    orphaned = Pmob(balance['orphaned_pmob'])
     if orphaned > 0:
         orphaned_status = ', {} orphaned'.format(_format_mob(orphaned))
     else:
@@ -755,7 +1520,7 @@ def _format_balance(balance):
         offline_status = ''
 
     result = '{}{} ({}){}'.format(
-        _format_mob(pmob2mob(balance['unspent_pmob'])),
+        _format_mob(Pmob(balance['unspent_pmob'])),
         orphaned_status,
         sync_status,
         offline_status,
@@ -802,7 +1567,7 @@ def _print_txo(txo, received=False):
         verb = 'Received'
     else:
         verb = 'Spent'
-    print('  {} {}'.format(verb, _format_mob(pmob2mob(txo['value_pmob']))))
+    print('  {} {}'.format(verb, _format_mob(Pmob(txo['value_pmob']))))
     if received:
         if int(txo['subaddress_index']) == 1:
             print('    as change')
@@ -1,27 +1,317 @@
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 import http.client
 import json
+import math
+import threading
 import time
 from urllib.parse import urlparse
 
+from mc_util.amount import Pmob
+
 DEFAULT_URL = 'http://127.0.0.1:9090/wallet'
 
 MAX_TOMBSTONE_BLOCKS = 100
 
+# The most txos a single transaction can spend.
+MAX_INPUTS = 16
+
+RECEIPT_PENDING = 'TransactionPending'
+
+# The most receipt statuses a Client remembers, least recently used first out.
+RECEIPT_STATUS_CACHE_SIZE = 10000
+
+# Methods which change nothing on the server, so they are safe to send again.
+READ_ONLY_METHODS = {
+    'get_all_accounts',
+    'get_account',
+    'export_account_secrets',
+    'get_all_txos_for_account',
+    'get_txo',
+    'get_network_status',
+    'check_b58_type',
+    'verify_address',
+    'get_balance_for_account',
+    'get_balance_for_address',
+    'get_addresses_for_account',
+    'get_all_transaction_logs_for_account',
+    'get_transaction_logs_for_account',
+    'create_receiver_receipts',
+    'check_receiver_receipt_status',
+    'get_gift_code',
+    'get_all_gift_codes',
+    'check_gift_code_status',
+}
+
+# Seconds between network status requests while a NetworkStatusProvider refreshes in the background.
+NETWORK_STATUS_POLL_INTERVAL = 1.0
+
+# Seconds a network status is served from memory before it is fetched again, by default.
+NETWORK_STATUS_MAX_AGE = 5.0
+
+# Time constant, in seconds, of the moving average of sync rates.
+SYNC_RATE_TIME_CONSTANT = 10.0
+
 
 class WalletAPIError(Exception):
     def __init__(self, response):
         self.response = response
 
 
+class NetworkStatus(namedtuple('NetworkStatus', [
+    'fee_pmob',
+    'local_block_height',
+    'network_block_height',
+    'fetched_at',
+    'response',
+])):
+    """
+    The network fee and block heights, as Pmob and ints, from one get_network_status response.
+
+    fetched_at is the time.monotonic() time the request was sent, and age is the seconds since.
+    response is the raw network_status object.
+    """
+    __slots__ = ()
+
+    @property
+    def age(self):
+        return time.monotonic() - self.fetched_at
+
+
+class NetworkStatusProvider:
+    """
+    Serve network status from memory, to any number of threads, with bounded staleness.
+
+    get() returns the latest NetworkStatus if it is younger than max_age seconds, and fetches a new
+    one otherwise. Callers which find it stale at the same time share one fetch. Fetches use a
+    connection of the provider's own, made from the client it was created with, so they never
+    interleave with that client's requests. After start(), a background thread polls the server
+    every poll_interval seconds, so that callers are served from memory, and wait_for_block() is
+    woken as soon as a new block is seen. The server has no way to push new blocks, so this is
+    the one request per interval that all callers share.
+    """
+
+    def __init__(self, client, poll_interval=NETWORK_STATUS_POLL_INTERVAL, max_age=NETWORK_STATUS_MAX_AGE):
+        self.poll_interval = poll_interval
+        self.max_age = max_age
+        self.refresh_count = 0
+        self._owner = client
+        # The provider's own connection, made on the first fetch, and used under _fetch_lock.
+        self._client = None
+        self._status = None
+        self._condition = threading.Condition()
+        self._fetch_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def get(self, max_age=None):
+        """The latest NetworkStatus, fetched again first if it is max_age seconds old or older."""
+        if max_age is None:
+            max_age = self.max_age
+        status = self._status
+        if status is None or status.age >= max_age:
+            status = self.refresh(max_age)
+        return status
+
+    def refresh(self, max_age=None):
+        """
+        Fetch the network status now, and return it. Given max_age, return the latest status
+        instead if another thread fetched one younger than that while this one waited.
+        """
+        with self._fetch_lock:
+            status = self._status
+            if max_age is not None and status is not None and status.age < max_age:
+                return status
+            if self._client is None:
+                self._client = self._owner._worker_client()
+            fetched_at = time.monotonic()
+            r = self._client.get_network_status(max_age)
+            self.refresh_count += 1
+        status = NetworkStatus(
+            Pmob(r['fee_pmob']),
+            int(r['local_block_height']),
+            int(r['network_block_height']),
+            fetched_at,
+            r,
+        )
+
+        with self._condition:
+            previous = self._status
+            if previous is None or status.fetched_at >= previous.fetched_at:
+                self._status = status
+                if previous is None or status.local_block_height != previous.local_block_height:
+                    self._condition.notify_all()
+        return status
+
+    def wait_for_block(self, block_height, timeout=None):
+        """
+        Wait until the local ledger has block_height blocks, returning the NetworkStatus which
+        shows it, or None after timeout seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._thread is None:
+                self.refresh()
+            with self._condition:
+                status = self._status
+                if status is not None and status.local_block_height >= block_height:
+                    return status
+                wait = self.poll_interval
+                if deadline is not None:
+                    wait = min(wait, deadline - time.monotonic())
+                    if wait <= 0:
+                        return None
+                self._condition.wait(wait)
+
+    def start(self):
+        """Start refreshing in a background thread. Returns the provider."""
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='network-status', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background thread."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+    def close(self):
+        """Stop the background thread, and close the provider's connection."""
+        self.stop()
+        with self._fetch_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                self.refresh()
+            except (ConnectionError, WalletAPIError, ValueError):
+                # Keep serving the last status. Once it is older than a caller's max_age, that
+                # caller fetches it itself, and sees the error.
+                pass
+            self._stopping.wait(self.poll_interval)
+
+
+class SyncProgress:
+    """
+    Estimate sync rates and time remaining from samples of block heights.
+
+    Each call to update() records the height reached and the target height for a key, such as
+    'ledger' or an account id. Rates are exponential moving averages weighted by the time between
+    samples, so samples may be taken at any interval. The target's own growth is tracked as well,
+    so the time remaining allows for new blocks arriving during the sync.
+    """
+
+    def __init__(self, time_constant=SYNC_RATE_TIME_CONSTANT):
+        self.time_constant = time_constant
+        # Key to [sample time, height, target, smoothed rate, smoothed target rate].
+        self._progress = {}
+
+    def update(self, key, height, target, now=None):
+        if now is None:
+            now = time.monotonic()
+        height = int(height)
+        target = int(target)
+
+        entry = self._progress.get(key)
+        if entry is None:
+            self._progress[key] = [now, height, target, None, None]
+            return
+        last_time, last_height, last_target, rate, target_rate = entry
+        elapsed = now - last_time
+        if elapsed <= 0:
+            return
+
+        # A height can fall if an account is removed and imported again, so clamp at 0.
+        instant_rate = max(height - last_height, 0) / elapsed
+        instant_target_rate = max(target - last_target, 0) / elapsed
+        if rate is None:
+            rate, target_rate = instant_rate, instant_target_rate
+        else:
+            weight = 1 - math.exp(-elapsed / self.time_constant)
+            rate += weight * (instant_rate - rate)
+            target_rate += weight * (instant_target_rate - target_rate)
+        self._progress[key] = [now, height, target, rate, target_rate]
+
+    def keys(self):
+        return self._progress.keys()
+
+    def height(self, key):
+        return self._progress[key][1]
+
+    def target(self, key):
+        return self._progress[key][2]
+
+    def remaining(self, key):
+        """Blocks left to reach the target."""
+        _, height, target, _, _ = self._progress[key]
+        return max(target - height, 0)
+
+    def rate(self, key):
+        """Smoothed blocks per second, or None until there are two samples."""
+        return self._progress[key][3]
+
+    def eta(self, key):
+        """
+        Estimated seconds to reach the target, 0 if it has been reached, or None if there is no
+        estimate yet, or the sync is not gaining on the target.
+        """
+        _, height, target, rate, target_rate = self._progress[key]
+        if height >= target:
+            return 0.0
+        if rate is None or rate <= target_rate:
+            return None
+        return (target - height) / (rate - target_rate)
+
+    def forget(self, key):
+        self._progress.pop(key, None)
+
+
 class Client:
+    """
+    A client for the full-service JSON-RPC API.
+
+    A Client keeps one HTTP connection open to the server, so it is not thread-safe. Use a
+    separate Client on each thread.
+    """
 
-    def __init__(self, url=None, verbose=False):
+    def __init__(self, url=None, verbose=False, record=None, local_b58=False, network_status=None):
         if url is None:
             url = DEFAULT_URL
         self.url = url
         self.verbose = verbose
         self._query_count = 0
+        self._connection = None
+
+        # A NetworkStatusProvider, which may be shared with other clients, or None to make one
+        # for this client when it is first needed.
+        self._network_status = network_status
+        self._owns_network_status = False
+
+        # Receipt statuses from check_receiver_receipt_statuses, with the height they were checked
+        # at, in least recently used order.
+        self._receipt_statuses = OrderedDict()
+        self.receipt_status_cache_size = RECEIPT_STATUS_CACHE_SIZE
+
+        # Answer check_b58_type and verify_address with mc_util instead of the server. mc_util
+        # checks that address keys are valid Ristretto points, as the server does.
+        self._mc_util = None
+        if local_b58:
+            import mc_util
+            self._mc_util = mc_util
+
+        # Traffic recording, to a TrafficRecorder or a log file path.
+        if record is not None and not hasattr(record, 'record'):
+            from .replay import TrafficRecorder
+            record = TrafficRecorder(record)
+        self.recorder = record
 
     def _req(self, request_data):
         default_params = {
@@ -36,22 +326,12 @@ class Client:
             print(json.dumps(request_data, indent=2))
             print()
 
-        try:
-            parsed_url = urlparse(self.url)
-            connection = http.client.HTTPConnection(parsed_url.netloc)
-            connection.request('POST', parsed_url.path, json.dumps(request_data), {'Content-Type': 'application/json'})
-            r = connection.getresponse()
-
-        except ConnectionError:
-            raise ConnectionError(f'Could not connect to wallet server at {self.url}.')
-
-        try:
-            response_data = json.load(r)
-        except ValueError:
-            raise ValueError('API returned invalid JSON:', r.text)
+        start = time.monotonic()
+        response_data = self._post(request_data)
+        if self.recorder is not None:
+            self.recorder.record(request_data, response_data, start, time.monotonic() - start)
 
         if self.verbose:
-            print(r.status, http.client.responses[r.status])
             print(json.dumps(response_data, indent=2))
             print()
 
@@ -65,6 +345,66 @@ class Client:
 
         return result
 
+    def _post(self, request_data):
+        """
+        Send a JSON-RPC request and return the decoded response.
+
+        The HTTP connection is kept open between requests. If a reused connection fails, the
+        request is retried once on a fresh connection, but only if it was never sent, as when the
+        server has closed an idle connection, or if its method is read-only. Otherwise the server
+        may already have carried it out, so ConnectionError is raised instead.
+        """
+        parsed_url = urlparse(self.url)
+        body = json.dumps(request_data)
+        headers = {'Content-Type': 'application/json'}
+
+        while True:
+            reused = self._connection is not None
+            if not reused:
+                self._connection = http.client.HTTPConnection(parsed_url.netloc)
+            sent = False
+            try:
+                self._connection.request('POST', parsed_url.path, body, headers)
+                sent = True
+                r = self._connection.getresponse()
+                response_body = r.read()
+            except (ConnectionError, http.client.HTTPException):
+                self._close_connection()
+                if reused and (not sent or request_data.get('method') in READ_ONLY_METHODS):
+                    continue
+                if sent:
+                    raise ConnectionError(
+                        f'Lost connection to wallet server at {self.url} during {request_data.get("method")}. '
+                        'It may or may not have been carried out.'
+                    )
+                raise ConnectionError(f'Could not connect to wallet server at {self.url}.')
+            break
+
+        if r.will_close:
+            self._close_connection()
+
+        if self.verbose:
+            print(r.status, http.client.responses[r.status])
+
+        try:
+            return json.loads(response_body)
+        except ValueError:
+            raise ValueError('API returned invalid JSON:', response_body)
+
+    def close(self):
+        """Close the connection to the wallet server, if one is open, and stop network status refreshes."""
+        if self._owns_network_status:
+            self._network_status.close()
+        self._close_connection()
+        if self.recorder is not None:
+            self.recorder.flush()
+
+    def _close_connection(self):
+        # Only the HTTP connection, so that a reconnect in _post leaves the rest running.
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
     def create_account(self, name=None):
         r = self._req({
             "method": "create_account",
@@ -163,12 +503,55 @@ class Client:
         })
         return r['txo']
 
-    def get_network_status(self):
+    def get_network_status(self, max_age=None):
+        # max_age is for clients which cache network status, such as DaemonClient. A Client
+        # always asks the wallet server.
         r = self._req({
             "method": "get_network_status",
         })
         return r['network_status']
 
+    @property
+    def network_status_provider(self):
+        """The NetworkStatusProvider used by network_status(). Call its start() to refresh in the background."""
+        if self._network_status is None:
+            self._network_status = NetworkStatusProvider(self)
+            self._owns_network_status = True
+        return self._network_status
+
+    def network_status(self, max_age=None):
+        """
+        The network fee and block heights as a NetworkStatus, served from memory unless the last
+        one fetched is max_age seconds old or older. max_age defaults to the provider's, and 0
+        always fetches a new one. Check the result's age to see how fresh it is.
+        """
+        return self.network_status_provider.get(max_age)
+
+    def check_b58_type(self, b58_code):
+        if self._mc_util is not None:
+            try:
+                return self._mc_util.check_b58_type(b58_code)
+            except ValueError as e:
+                raise WalletAPIError(_local_error('B58Error', e))
+        r = self._req({
+            "method": "check_b58_type",
+            "params": {
+                "b58_code": b58_code,
+            },
+        })
+        return r
+
+    def verify_address(self, address):
+        if self._mc_util is not None:
+            return self._mc_util.verify_address(address)
+        r = self._req({
+            "method": "verify_address",
+            "params": {
+                "address": address,
+            },
+        })
+        return r['verified']
+
     def get_balance_for_account(self, account_id):
         r = self._req({
             "method": "get_balance_for_account",
@@ -211,38 +594,45 @@ class Client:
         })
         return r['address_map']
 
-    def _build_and_submit_transaction(self, account_id, amount, to_address, fee):
-        amount = str(mob2pmob(amount))
+    # Amounts and fees are in MOB. To give them in picoMOB instead, pass None for the amount in
+    # MOB and use amount_pmob and fee_pmob.
+
+    def _build_and_submit_transaction(self, account_id, amount, to_address, fee, amount_pmob, fee_pmob):
+        amount = str(_amount_pmob(amount, amount_pmob, required=True))
         params = {
             "account_id": account_id,
             "addresses_and_values": [(to_address, amount)],
         }
+        fee = _amount_pmob(fee, fee_pmob)
         if fee is not None:
-            params['fee'] = str(mob2pmob(fee))
+            params['fee'] = str(fee)
         r = self._req({
             "method": "build_and_submit_transaction",
             "params": params,
         })
         return r
 
-    def build_and_submit_transaction(self, account_id, amount, to_address, fee=None):
-        r = self._build_and_submit_transaction(account_id, amount, to_address, fee)
+    def build_and_submit_transaction(self, account_id, amount, to_address, fee=None, amount_pmob=None, fee_pmob=None):
+        r = self._build_and_submit_transaction(account_id, amount, to_address, fee, amount_pmob, fee_pmob)
         return r['transaction_log']
 
-    def build_and_submit_transaction_with_proposal(self, account_id, amount, to_address, fee=None):
-        r = self._build_and_submit_transaction(account_id, amount, to_address, fee)
+    def build_and_submit_transaction_with_proposal(self, account_id, amount, to_address, fee=None,
+                                                   amount_pmob=None, fee_pmob=None):
+        r = self._build_and_submit_transaction(account_id, amount, to_address, fee, amount_pmob, fee_pmob)
         return r['transaction_log'], r['tx_proposal']
 
-    def build_transaction(self, account_id, amount, to_address, tombstone_block=None, fee=None):
-        amount = str(mob2pmob(amount))
+    def build_transaction(self, account_id, amount, to_address, tombstone_block=None, fee=None,
+                          amount_pmob=None, fee_pmob=None):
+        amount = str(_amount_pmob(amount, amount_pmob, required=True))
         params = {
             "account_id": account_id,
             "addresses_and_values": [(to_address, amount)],
         }
         if tombstone_block is not None:
             params['tombstone_block'] = str(int(tombstone_block))
+        fee = _amount_pmob(fee, fee_pmob)
         if fee is not None:
-            params['fee'] = str(mob2pmob(fee))
+            params['fee'] = str(fee)
         r = self._req({
             "method": "build_transaction",
             "params": params,
@@ -268,6 +658,17 @@ class Client:
         })
         return r['transaction_log_map']
 
+    def get_transaction_logs_for_account(self, account_id, offset=0, limit=100):
+        r = self._req({
+            "method": "get_transaction_logs_for_account",
+            "params": {
+                "account_id": account_id,
+                "offset": str(int(offset)),
+                "limit": str(int(limit)),
+            },
+        })
+        return r['transaction_log_map']
+
     def create_receiver_receipts(self, tx_proposal):
         r = self._req({
             "method": "create_receiver_receipts",
@@ -287,8 +688,81 @@ class Client:
         })
         return r
 
-    def build_gift_code(self, account_id, amount, memo=""):
-        amount = str(mob2pmob(amount))
+    def check_receiver_receipt_statuses(self, receipts, max_workers=8):
+        """
+        Check the status of many (address, receipt) pairs, returning results in the same order.
+
+        Duplicate pairs are checked once, and checks run concurrently on up to max_workers
+        connections. Statuses other than TransactionPending are final, so they are remembered by
+        this Client and never checked again. Pending receipts are only checked again once the
+        ledger has grown past the height of their last check. A pair whose check fails gives the
+        server's error response, which is not remembered. At most receipt_status_cache_size
+        statuses are remembered; clear_receipt_statuses() forgets them all.
+
+        The ledger height comes from network_status(), so it may be up to the provider's max_age
+        seconds old.
+        """
+        receipts = list(receipts)
+        keys = [ _receipt_key(address, receipt) for address, receipt in receipts ]
+        block_height = self.network_status().local_block_height
+
+        results = {}
+        to_check = {}
+        for key, pair in zip(keys, receipts):
+            cached = self._receipt_statuses.get(key)
+            if cached is not None:
+                status, checked_height = cached
+                if status['receipt_transaction_status'] != RECEIPT_PENDING or checked_height >= block_height:
+                    self._receipt_statuses.move_to_end(key)
+                    results[key] = status
+                    continue
+            to_check[key] = pair
+
+        if to_check:
+            local = threading.local()
+            clients = []
+            clients_lock = threading.Lock()
+
+            def check(key):
+                if not hasattr(local, 'client'):
+                    local.client = self._worker_client()
+                    with clients_lock:
+                        clients.append(local.client)
+                try:
+                    return key, local.client.check_receiver_receipt_status(*to_check[key]), None
+                except WalletAPIError as e:
+                    return key, None, e.response
+
+            try:
+                with ThreadPoolExecutor(max_workers=min(max_workers, len(to_check))) as executor:
+                    for key, status, error in executor.map(check, to_check):
+                        if error is None:
+                            self._remember_receipt_status(key, status, block_height)
+                            results[key] = status
+                        else:
+                            results[key] = error
+            finally:
+                for c in clients:
+                    c.close()
+
+        return [ results[key] for key in keys ]
+
+    def clear_receipt_statuses(self):
+        """Forget the receipt statuses remembered by check_receiver_receipt_statuses."""
+        self._receipt_statuses.clear()
+
+    def _remember_receipt_status(self, key, status, block_height):
+        self._receipt_statuses[key] = (status, block_height)
+        self._receipt_statuses.move_to_end(key)
+        while len(self._receipt_statuses) > self.receipt_status_cache_size:
+            self._receipt_statuses.popitem(last=False)
+
+    def _worker_client(self):
+        """A new client for the same server, for use on another thread."""
+        return Client(url=self.url, verbose=self.verbose)
+
+    def build_gift_code(self, account_id, amount, memo="", amount_pmob=None):
+        amount = str(_amount_pmob(amount, amount_pmob, required=True))
         r = self._req({
             "method": "build_gift_code",
             "params": {
@@ -368,6 +842,57 @@ class Client:
         else:
             raise Exception('Could not sync account {}'.format(account_id))
 
+    def iter_transaction_logs_for_account(self, account_id, page_size=100):
+        """
+        Yield the transaction logs for an account, fetching them one page at a time.
+
+        The server applies offset and limit to (transaction log, txo) rows, so a transaction log
+        can be split across two pages. The last log of each page is held back until the next page
+        arrives, and its txo lists are merged if it continues there.
+        """
+        offset = 0
+        held = None
+        while True:
+            page = self.get_transaction_logs_for_account(account_id, offset, page_size)
+            if len(page) == 0:
+                break
+            offset += page_size
+
+            logs = list(page.values())
+            if held is not None:
+                if logs[0]['transaction_log_id'] == held['transaction_log_id']:
+                    logs[0] = _merge_transaction_logs(held, logs[0])
+                else:
+                    yield held
+            held = logs.pop()
+            yield from logs
+
+        if held is not None:
+            yield held
+
+    def analyze_txos(self, account_id, amount=None, fee=None, dust_threshold=None, max_inputs=MAX_INPUTS,
+                     amount_pmob=None, fee_pmob=None, dust_threshold_pmob=None):
+        """
+        Summarize how an account's funds are split across txos, in one pass over its txos.
+
+        The report counts txos and their value by status. Unspent txos are also counted in a
+        histogram of powers of ten picoMOB, and those worth less than dust_threshold, which
+        defaults to the fee, are counted as dust. Given an amount, it estimates the inputs and
+        transactions needed to send it: the largest txos are spent first, as the server does, and
+        if more than max_inputs are needed, they are first combined by sending them to yourself.
+        Amounts are in MOB, or in picoMOB with the _pmob arguments, and the report's amounts are Pmob.
+        """
+        fee = _amount_pmob(fee, fee_pmob)
+        if fee is None:
+            fee = self.network_status().fee_pmob
+        dust_threshold = _amount_pmob(dust_threshold, dust_threshold_pmob)
+        if dust_threshold is None:
+            dust_threshold = fee
+        amount = _amount_pmob(amount, amount_pmob)
+
+        txos = self.get_all_txos_for_account(account_id)
+        return _analyze_txos(account_id, txos.values(), amount, fee, dust_threshold, max_inputs)
+
     def poll_gift_code_status(self, gift_code_b58, target_status, seconds=10, poll_delay=1.0):
         for _ in range(seconds):
             response = self.check_gift_code_status(gift_code_b58)
@@ -388,13 +913,138 @@ class Client:
             raise Exception('Txo {} never landed.'.format(txo_id))
 
 
+def _receipt_key(address, receipt):
+    return address, json.dumps(receipt, sort_keys=True)
+
+
+def _local_error(server_error, e):
+    """An error response in the server's format, for requests answered locally."""
+    return {
+        'error': {
+            'code': -32603,
+            'message': 'InternalError',
+            'data': {'server_error': server_error, 'details': str(e)},
+        },
+    }
+
+
+def _analyze_txos(account_id, txos, amount, fee, dust_threshold, max_inputs):
+    count = 0
+    statuses = {}
+    histogram = {}
+    dust_count = 0
+    dust_value = 0
+    unspent_count = 0
+    unspent_value = 0
+    unspent_values = []
+
+    for txo in txos:
+        value_pmob = txo['value_pmob']
+        value = int(value_pmob)
+        count += 1
+
+        status = txo['account_status_map'].get(account_id)
+        status = 'unknown' if status is None else status['txo_status'].replace('txo_status_', '', 1)
+        totals = statuses.get(status)
+        if totals is None:
+            totals = statuses[status] = [0, 0]
+        totals[0] += 1
+        totals[1] += value
+
+        if status != 'unspent':
+            continue
+        unspent_count += 1
+        unspent_value += value
+        # The number of digits picks the power of ten bucket, with 0 in a bucket of its own.
+        digits = len(value_pmob) if value else 0
+        bucket = histogram.get(digits)
+        if bucket is None:
+            bucket = histogram[digits] = [0, 0]
+        bucket[0] += 1
+        bucket[1] += value
+        if value < dust_threshold:
+            dust_count += 1
+            dust_value += value
+        if amount is not None:
+            unspent_values.append(value)
+
+    result = {
+        'account_id': account_id,
+        'count': count,
+        'statuses': {
+            status: {'count': n, 'value_pmob': Pmob(value)}
+            for status, (n, value) in sorted(statuses.items())
+        },
+        'histogram': [
+            {
+                'min_pmob': Pmob(10**(digits - 1) if digits else 0),
+                'max_pmob': Pmob(10**digits),
+                'count': n,
+                'value_pmob': Pmob(value),
+            }
+            for digits, (n, value) in sorted(histogram.items())
+        ],
+        'dust': {
+            'threshold_pmob': dust_threshold,
+            'count': dust_count,
+            'value_pmob': Pmob(dust_value),
+            'count_share': dust_count / unspent_count if unspent_count else 0.0,
+            'value_share': dust_value / unspent_value if unspent_value else 0.0,
+        },
+        'send': None,
+    }
+    if amount is not None:
+        unspent_values.sort(reverse=True)
+        inputs, transactions = _estimate_inputs(unspent_values, amount, fee, max_inputs)
+        result['send'] = {
+            'amount_pmob': amount,
+            'fee_pmob': fee,
+            'sufficient': inputs is not None,
+            'inputs': inputs,
+            'transactions': transactions,
+            'total_fee_pmob': None if transactions is None else Pmob(fee * transactions),
+        }
+    return result
+
+
+def _estimate_inputs(values, amount, fee, max_inputs):
+    """
+    Return the number of the largest values needed to send amount, and the transactions needed
+    to spend them, each paying a fee, or (None, None) if the values are not enough.
+    """
+    total = 0
+    for inputs, value in enumerate(values, 1):
+        total += value
+        transactions = _transactions_for_inputs(inputs, max_inputs)
+        if total >= amount + fee * transactions:
+            return inputs, transactions
+    return None, None
+
+
+def _transactions_for_inputs(inputs, max_inputs):
+    """Each self-transfer combines max_inputs txos into one, until one transaction can spend the rest."""
+    if inputs <= max_inputs:
+        return 1
+    return 1 + -(-(inputs - max_inputs) // (max_inputs - 1))
+
+
+def _merge_transaction_logs(a, b):
+    """Combine two partial copies of the same transaction log."""
+    result = dict(a)
+    for field in ['input_txos', 'output_txos', 'change_txos']:
+        seen = set( txo['txo_id_hex'] for txo in a[field] )
+        result[field] = a[field] + [ txo for txo in b[field] if txo['txo_id_hex'] not in seen ]
+    return result
+
+
 PMOB = Decimal("1e12")
 
 
 def mob2pmob(x):
-    """Convert from MOB to picoMOB."""
-    result = round(Decimal(x) * PMOB)
-    assert 0 <= result < 2**64
+    """Convert from MOB to picoMOB, raising ValueError if the result does not fit in 64 bits."""
+    result = Pmob.from_mob(x)
+    if not 0 <= result < 2**64:
+        raise ValueError('Amount {} MOB is out of range.'.format(x))
     return result
 
 
@@ -404,3 +1054,19 @@ def pmob2mob(x):
     if result == 0:
         result = Decimal("0")
     return result
+
+
+def _amount_pmob(mob, pmob, required=False):
+    """An amount given either in MOB or in picoMOB, as a Pmob, or None if neither is given."""
+    if mob is not None and pmob is not None:
+        raise ValueError('Give an amount in MOB or in picoMOB, not both.')
+    if pmob is not None:
+        result = Pmob(pmob)
+        if not 0 <= result < 2**64:
+            raise ValueError('Amount {} picoMOB is out of range.'.format(pmob))
+        return result
+    if mob is not None:
+        return mob2pmob(mob)
+    if required:
+        raise ValueError('An amount is required, in MOB or in picoMOB.')
+    return None
@@ -0,0 +1,230 @@
+"""
+Client daemon for mobcli.
+
+The daemon holds a single warm connection to the wallet server, along with a short-lived cache of
+the account index and network status. Later mobcli invocations send their JSON-RPC requests to the
+daemon over a local unix socket instead of opening a new connection to the wallet server.
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+
+from .client import Client
+
+
+# Network status, and therefore block heights, are served from memory for this many seconds.
+NETWORK_STATUS_TTL = 1.0
+
+# The account index is served from memory for this many seconds, so that accounts added by other
+# processes, and each account's next_block_index, are seen soon after they change.
+ACCOUNT_INDEX_TTL = 1.0
+
+ACCOUNT_INDEX_METHODS = {
+    'get_all_accounts',
+    'get_account',
+}
+
+ACCOUNT_INDEX_MUTATIONS = {
+    'create_account',
+    'import_account',
+    'import_account_from_legacy_root_entropy',
+    'update_account_name',
+    'remove_account',
+    'assign_address_for_account',
+}
+
+
+class CachingClient(Client):
+    """
+    A Client which serves repeated reads of the account index and network status from memory.
+
+    The account index is kept for ACCOUNT_INDEX_TTL seconds, or until an account is created,
+    imported, renamed, removed or given a new address through this client. Network status is kept
+    for NETWORK_STATUS_TTL seconds, or for less if a get_network_status request has a "max_age"
+    member, which is taken out before the request is sent on.
+    """
+
+    def __init__(self, url=None, verbose=False, network_status_ttl=NETWORK_STATUS_TTL,
+                 account_index_ttl=ACCOUNT_INDEX_TTL):
+        super().__init__(url=url, verbose=verbose)
+        self.network_status_ttl = network_status_ttl
+        self.account_index_ttl = account_index_ttl
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+    def _post(self, request_data):
+        method = request_data.get('method')
+
+        if method in ACCOUNT_INDEX_MUTATIONS:
+            response_data = super()._post(request_data)
+            self.clear_cache()
+            return response_data
+
+        if method in ACCOUNT_INDEX_METHODS:
+            ttl = self.account_index_ttl
+        elif method == 'get_network_status':
+            ttl = self.network_status_ttl
+            if 'max_age' in request_data:
+                request_data = dict(request_data)
+                max_age = request_data.pop('max_age')
+                ttl = max_age if ttl is None else min(ttl, max_age)
+        else:
+            return super()._post(request_data)
+
+        key = json.dumps([method, request_data.get('params')], sort_keys=True)
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                response_data, fetched = entry
+                if ttl is None or now - fetched < ttl:
+                    self.cache_hits += 1
+                    return response_data
+            self.cache_misses += 1
+
+        response_data = super()._post(request_data)
+        if 'result' in response_data:
+            with self._cache_lock:
+                self._cache[key] = (response_data, now)
+        return response_data
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+
+class DaemonClient(Client):
+    """A Client which forwards its requests to a running client daemon."""
+
+    def __init__(self, socket_path, verbose=False):
+        super().__init__(url='unix:' + str(socket_path), verbose=verbose)
+        self.socket_path = str(socket_path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._sock.connect(self.socket_path)
+        except OSError:
+            self._sock.close()
+            raise ConnectionError(f'Could not connect to client daemon at {self.socket_path}.')
+        self._file = self._sock.makefile('rwb')
+
+    def _post(self, request_data):
+        response_data = self._send_message(request_data)
+        if 'daemon_error' in response_data:
+            raise ConnectionError(response_data['daemon_error'])
+        return response_data
+
+    def _worker_client(self):
+        return DaemonClient(self.socket_path, verbose=self.verbose)
+
+    def get_network_status(self, max_age=None):
+        request_data = {'method': 'get_network_status'}
+        if max_age is not None:
+            # The daemon serves the status it has cached only if it is younger than this.
+            request_data['max_age'] = max_age
+        return self._req(request_data)['network_status']
+
+    def daemon_status(self):
+        return self._send_message({'daemon': 'status'})
+
+    def daemon_stop(self):
+        return self._send_message({'daemon': 'stop'})
+
+    def _send_message(self, message):
+        try:
+            self._file.write(json.dumps(message).encode() + b'\n')
+            self._file.flush()
+            line = self._file.readline()
+        except OSError:
+            line = b''
+        if not line:
+            raise ConnectionError(f'Lost connection to client daemon at {self.socket_path}.')
+        return json.loads(line)
+
+    def close(self):
+        if self._owns_network_status:
+            self._network_status.close()
+        self._file.close()
+        self._sock.close()
+
+
+class ClientDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serve JSON-RPC requests from a shared CachingClient over a unix socket."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, url=None, verbose=False):
+        self.socket_path = str(socket_path)
+        self.client = CachingClient(url=url, verbose=verbose)
+        self.client_lock = threading.Lock()
+        self.request_count = 0
+        self.started = time.monotonic()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        super().__init__(self.socket_path, _DaemonHandler)
+        os.chmod(self.socket_path, 0o600)
+
+    def serve_forever(self, poll_interval=0.5):
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            self.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def forward(self, request_data):
+        with self.client_lock:
+            self.request_count += 1
+            try:
+                return self.client._post(request_data)
+            except ConnectionError as e:
+                return {'daemon_error': str(e)}
+
+    def control(self, command):
+        if command == 'stop':
+            threading.Thread(target=self.shutdown).start()
+            return {'stopped': True}
+        elif command == 'status':
+            return {
+                'url': self.client.url,
+                'pid': os.getpid(),
+                'uptime': time.monotonic() - self.started,
+                'requests': self.request_count,
+                'cache_hits': self.client.cache_hits,
+                'cache_misses': self.client.cache_misses,
+            }
+        else:
+            return {'daemon_error': 'Unknown daemon command {}.'.format(command)}
+
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            message = json.loads(line)
+            if 'daemon' in message:
+                response_data = self.server.control(message['daemon'])
+            else:
+                response_data = self.server.forward(message)
+            self.wfile.write(json.dumps(response_data).encode() + b'\n')
+            self.wfile.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the mobcli client daemon.')
+    parser.add_argument('socket', help='Path of the unix socket to listen on.')
+    parser.add_argument('--url', help='Wallet server URL.')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log forwarded requests.')
+    args = parser.parse_args()
+
+    server = ClientDaemon(args.socket, url=args.url, verbose=args.verbose)
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,935 @@
+"""
+An in-memory stand-in for the full-service wallet JSON-RPC API.
+
+MockWallet implements the methods used by Client, for accounts, addresses, txos, balances,
+transactions, receipts and gift codes, against deterministic in-memory state. Submitted
+transactions land in the next simulated block. Blocks are added every `block_interval` seconds,
+or only when `advance_blocks` is called if no interval is given.
+
+MockServer serves a MockWallet over HTTP, so that the client, the CLI and tools built on them can
+be tested and benchmarked without a ledger, a network or a funded account.
+
+    python -m mobilecoin.mock_server --port 9090 --block-interval 1.0
+
+Addresses, keys and proofs produced by the mock are opaque placeholders, not valid MobileCoin
+data.
+"""
+import argparse
+import hashlib
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+
+
+DEFAULT_FEE_PMOB = 400000000
+
+# Imported accounts are credited with this much, so that they can be used as a funded wallet.
+DEFAULT_INITIAL_BALANCE_PMOB = 100 * 10**12
+
+B58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+
+CHANGE_SUBADDRESS_INDEX = 1
+
+TXO_LIST_FIELDS = ['input_txos', 'output_txos', 'change_txos']
+
+
+class MockWalletError(Exception):
+    """An error reported to the client in the same shape as a full-service server error."""
+
+    def __init__(self, server_error, details=''):
+        super().__init__(server_error, details)
+        self.server_error = server_error
+        self.details = details
+
+
+class MockWallet:
+
+    def __init__(
+        self,
+        block_interval=None,
+        fee_pmob=DEFAULT_FEE_PMOB,
+        initial_balance_pmob=DEFAULT_INITIAL_BALANCE_PMOB,
+        block_height=1,
+        seed='mock',
+    ):
+        self.block_interval = block_interval
+        self.fee_pmob = fee_pmob
+        self.initial_balance_pmob = initial_balance_pmob
+        self.block_height = block_height
+        self.seed = seed
+        self.request_count = 0
+
+        self._lock = threading.RLock()
+        self._last_block_time = time.monotonic()
+        self._counter = 0
+
+        self._accounts = {}
+        self._addresses = {}
+        self._subaddresses = {}
+        self._txos = {}
+        self._transaction_logs = {}
+        self._proposals = {}
+        self._pending = []
+        self._gift_codes = {}
+        self._gift_code_addresses = {}
+
+    # Request handling.
+
+    def handle(self, request_data):
+        """Answer a JSON-RPC request dict with a JSON-RPC response dict."""
+        response_data = {
+            'method': request_data.get('method'),
+            'jsonrpc': '2.0',
+            'id': request_data.get('id', 1),
+        }
+        method = request_data.get('method')
+        params = request_data.get('params') or {}
+
+        handler = getattr(self, 'rpc_' + str(method), None)
+        if handler is None:
+            response_data['error'] = {
+                'code': -32601,
+                'message': 'Method not found',
+                'data': {'server_error': 'MethodNotFound', 'details': str(method)},
+            }
+            return response_data
+
+        with self._lock:
+            self.request_count += 1
+            self._advance_clock()
+            try:
+                response_data['result'] = handler(**params)
+            except MockWalletError as e:
+                response_data['error'] = {
+                    'code': -32603,
+                    'message': 'Internal error',
+                    'data': {'server_error': e.server_error, 'details': e.details},
+                }
+            except (TypeError, KeyError, ValueError) as e:
+                response_data['error'] = {
+                    'code': -32600,
+                    'message': 'Invalid request',
+                    'data': {'server_error': type(e).__name__, 'details': str(e)},
+                }
+        return response_data
+
+    def advance_blocks(self, count=1):
+        """Add blocks to the simulated ledger, landing any pending transactions in the first one."""
+        with self._lock:
+            for _ in range(count):
+                self._add_block()
+
+    def _advance_clock(self):
+        if self.block_interval is None:
+            return
+        now = time.monotonic()
+        while now - self._last_block_time >= self.block_interval:
+            self._last_block_time += self.block_interval
+            self._add_block()
+
+    # Accounts.
+
+    def rpc_create_account(self, name=None, **fog_keys):
+        self._counter += 1
+        entropy = self._hash('entropy', self._counter)
+        account = self._add_account(name, entropy=entropy, first_block_index=self.block_height)
+        return {'account': account}
+
+    def rpc_import_account(self, mnemonic, key_derivation_version='2', name=None, first_block_index=None,
+                           next_subaddress_index=None, **fog_keys):
+        account = self._add_account(
+            name,
+            mnemonic=mnemonic,
+            key_derivation_version=key_derivation_version,
+            first_block_index=first_block_index,
+            next_subaddress_index=next_subaddress_index,
+        )
+        self._credit_import(account)
+        return {'account': account}
+
+    def rpc_import_account_from_legacy_root_entropy(self, entropy, name=None, first_block_index=None,
+                                                    next_subaddress_index=None, **fog_keys):
+        account = self._add_account(
+            name,
+            entropy=entropy,
+            first_block_index=first_block_index,
+            next_subaddress_index=next_subaddress_index,
+        )
+        self._credit_import(account)
+        return {'account': account}
+
+    def rpc_get_all_accounts(self):
+        return {
+            'account_ids': list(self._accounts.keys()),
+            'account_map': { a_id: dict(a['account']) for a_id, a in self._accounts.items() },
+        }
+
+    def rpc_get_account(self, account_id):
+        return {'account': dict(self._get_account(account_id)['account'])}
+
+    def rpc_update_account_name(self, account_id, name):
+        account = self._get_account(account_id)['account']
+        account['name'] = name
+        return {'account': dict(account)}
+
+    def rpc_remove_account(self, account_id):
+        self._get_account(account_id)
+        del self._accounts[account_id]
+        for address, (a_id, index) in list(self._addresses.items()):
+            if a_id == account_id:
+                del self._addresses[address]
+                del self._subaddresses[(a_id, index)]
+        for txo_id, txo in list(self._txos.items()):
+            if txo['received_account_id'] == account_id:
+                del self._txos[txo_id]
+        for log_id, log in list(self._transaction_logs.items()):
+            if log['account_id'] == account_id:
+                del self._transaction_logs[log_id]
+        return {'removed': True}
+
+    def rpc_export_account_secrets(self, account_id):
+        a = self._get_account(account_id)
+        return {
+            'account_secrets': {
+                'object': 'account_secrets',
+                'account_id': account_id,
+                'entropy': a['entropy'],
+                'mnemonic': a['mnemonic'],
+                'key_derivation_version': a['account']['key_derivation_version'],
+                'account_key': {
+                    'object': 'account_key',
+                    'view_private_key': '0a20' + self._hash('view', account_id),
+                    'spend_private_key': '0a20' + self._hash('spend', account_id),
+                    'fog_report_url': '',
+                    'fog_report_id': '',
+                    'fog_authority_spki': '',
+                },
+            },
+        }
+
+    # Addresses.
+
+    def rpc_assign_address_for_account(self, account_id, metadata=''):
+        account = self._get_account(account_id)['account']
+        index = int(account['next_subaddress_index'])
+        address = self._add_address(account_id, index, metadata)
+        account['next_subaddress_index'] = str(index + 1)
+        return {'address': dict(address)}
+
+    def rpc_get_addresses_for_account(self, account_id, offset='0', limit='1000'):
+        a = self._get_account(account_id)
+        addresses = sorted(a['addresses'].values(), key=lambda address: int(address['subaddress_index']))
+        offset, limit = int(offset), int(limit)
+        page = addresses[offset:offset + limit]
+        return {
+            'public_addresses': [ address['public_address'] for address in page ],
+            'address_map': { address['public_address']: dict(address) for address in page },
+        }
+
+    # Balances, txos and network status.
+
+    def rpc_get_network_status(self):
+        return {
+            'network_status': {
+                'object': 'network_status',
+                'network_block_height': str(self.block_height),
+                'local_block_height': str(self.block_height),
+                'fee_pmob': str(self.fee_pmob),
+            },
+        }
+
+    def rpc_get_balance_for_account(self, account_id):
+        self._get_account(account_id)
+        txos = [ t for t in self._txos.values() if t['received_account_id'] == account_id ]
+        secreted = sum(
+            t['value'] for t in self._txos.values()
+            if t['minted_account_id'] == account_id and t['received_account_id'] != account_id
+        )
+        return {'balance': self._balance(txos, secreted)}
+
+    def rpc_get_balance_for_address(self, address):
+        if address not in self._addresses:
+            raise MockWalletError('AddressNotFound', address)
+        account_id, index = self._addresses[address]
+        txos = [
+            t for t in self._txos.values()
+            if t['received_account_id'] == account_id and t['subaddress_index'] == index
+        ]
+        return {'balance': self._balance(txos, 0)}
+
+    def rpc_get_all_txos_for_account(self, account_id):
+        self._get_account(account_id)
+        txo_map = {
+            txo_id: self._txo_json(t) for txo_id, t in self._txos.items()
+            if account_id in (t['received_account_id'], t['minted_account_id'])
+        }
+        return {'txo_ids': list(txo_map.keys()), 'txo_map': txo_map}
+
+    def rpc_get_txo(self, txo_id):
+        if txo_id not in self._txos:
+            raise MockWalletError('TxoNotFound', txo_id)
+        return {'txo': self._txo_json(self._txos[txo_id])}
+
+    # Transactions.
+
+    def rpc_build_transaction(self, account_id, addresses_and_values=None, recipient_public_address=None,
+                              value_pmob=None, fee=None, tombstone_block=None, **options):
+        outlays = self._outlays(addresses_and_values, recipient_public_address, value_pmob)
+        tx_proposal = self._build(account_id, outlays, fee, tombstone_block)
+        return {'tx_proposal': tx_proposal, 'transaction_log_id': self._tx_id(tx_proposal)}
+
+    def rpc_submit_transaction(self, tx_proposal, comment=None, account_id=None):
+        log = self._submit(tx_proposal, account_id)
+        return {'transaction_log': log}
+
+    def rpc_build_and_submit_transaction(self, account_id, addresses_and_values=None, recipient_public_address=None,
+                                        value_pmob=None, fee=None, tombstone_block=None, comment=None, **options):
+        outlays = self._outlays(addresses_and_values, recipient_public_address, value_pmob)
+        tx_proposal = self._build(account_id, outlays, fee, tombstone_block)
+        log = self._submit(tx_proposal, account_id)
+        return {'transaction_log': log, 'tx_proposal': tx_proposal}
+
+    def rpc_get_all_transaction_logs_for_account(self, account_id):
+        logs = self._logs_for_account(account_id)
+        return {
+            'transaction_log_ids': [ log['transaction_log_id'] for log in logs ],
+            'transaction_log_map': { log['transaction_log_id']: dict(log) for log in logs },
+        }
+
+    def rpc_get_transaction_logs_for_account(self, account_id, offset, limit):
+        # Like full-service, page through (transaction log, txo) rows, so that a log with several
+        # txos can be split across pages, each holding a copy with only that page's txos.
+        offset, limit = int(offset), int(limit)
+        if limit > 1000:
+            raise MockWalletError('InvalidLimit', 'limit must not exceed 1000')
+        rows = []
+        for log in self._logs_for_account(account_id):
+            fields = [ (field, txo) for field in TXO_LIST_FIELDS for txo in log[field] ]
+            rows.extend( (log, field, txo) for field, txo in fields or [(None, None)] )
+
+        logs = []
+        for log, field, txo in rows[offset:offset + limit]:
+            if not logs or logs[-1]['transaction_log_id'] != log['transaction_log_id']:
+                logs.append(dict(log, **{ f: [] for f in TXO_LIST_FIELDS }))
+            if field is not None:
+                logs[-1][field].append(txo)
+        return {
+            'transaction_log_ids': [ log['transaction_log_id'] for log in logs ],
+            'transaction_log_map': { log['transaction_log_id']: dict(log) for log in logs },
+        }
+
+    # Receipts.
+
+    def rpc_create_receiver_receipts(self, tx_proposal):
+        proposal = self._get_proposal(tx_proposal)
+        receipts = []
+        for address, value, public_key in proposal['outputs']:
+            receipts.append({
+                'object': 'receiver_receipt',
+                'public_key': public_key,
+                'confirmation': self._hash('confirmation', public_key),
+                'tombstone_block': str(proposal['tombstone_block']),
+                'amount': {
+                    'object': 'amount',
+                    'commitment': self._hash('commitment', public_key),
+                    'masked_value': str(value),
+                },
+            })
+        return {'receiver_receipts': receipts}
+
+    def rpc_check_receiver_receipt_status(self, address, receiver_receipt):
+        if address not in self._addresses:
+            raise MockWalletError('AddressNotFound', address)
+        account_id, _ = self._addresses[address]
+        for t in self._txos.values():
+            if t['public_key'] == receiver_receipt['public_key'] and t['received_account_id'] == account_id:
+                if receiver_receipt['confirmation'] != self._hash('confirmation', t['public_key']):
+                    status = 'InvalidConfirmation'
+                elif int(receiver_receipt['amount']['masked_value']) != t['value']:
+                    status = 'AmountMismatch'
+                else:
+                    status = 'TransactionSuccess'
+                return {'receipt_transaction_status': status, 'txo': self._txo_json(t)}
+        return {'receipt_transaction_status': 'TransactionPending', 'txo': None}
+
+    # Gift codes.
+
+    def rpc_build_gift_code(self, account_id, value_pmob, memo='', **options):
+        self._counter += 1
+        entropy = self._hash('gift_code', self._counter)
+        gift_code_b58 = self._b58('gift_code', entropy, length=120)
+        gift_address = self._b58('gift_code_address', entropy)
+        self._gift_code_addresses[gift_address] = gift_code_b58
+        self._gift_codes[gift_code_b58] = {
+            'gift_code_b58': gift_code_b58,
+            'entropy': entropy,
+            'value': int(value_pmob),
+            'memo': memo or '',
+            'account_id': account_id,
+            'address': gift_address,
+            'txo_id': None,
+            'status': None,
+        }
+        tx_proposal = self._build(account_id, [(gift_address, int(value_pmob))], None, None)
+        return {'tx_proposal': tx_proposal, 'gift_code_b58': gift_code_b58}
+
+    def rpc_submit_gift_code(self, from_account_id, gift_code_b58, tx_proposal):
+        gift_code = self._get_gift_code(gift_code_b58)
+        self._submit(tx_proposal, from_account_id)
+        gift_code['status'] = 'GiftCodeSubmittedPending'
+        return {'gift_code': self._gift_code_json(gift_code)}
+
+    def rpc_get_gift_code(self, gift_code_b58):
+        return {'gift_code': self._gift_code_json(self._get_gift_code(gift_code_b58))}
+
+    def rpc_get_all_gift_codes(self):
+        return {'gift_codes': [ self._gift_code_json(g) for g in self._gift_codes.values() if g['status'] is not None ]}
+
+    def rpc_check_gift_code_status(self, gift_code_b58):
+        gift_code = self._gift_codes.get(gift_code_b58)
+        if gift_code is None or gift_code['status'] is None:
+            raise MockWalletError('GiftCodeNotFound', gift_code_b58)
+        return {
+            'gift_code_status': gift_code['status'],
+            'gift_code_value': gift_code['value'],
+            'gift_code_memo': gift_code['memo'],
+        }
+
+    def rpc_claim_gift_code(self, gift_code_b58, account_id, address=None):
+        gift_code = self._get_gift_code(gift_code_b58)
+        if gift_code['status'] == 'GiftCodeClaimed':
+            raise MockWalletError('GiftCodeClaimed', gift_code_b58)
+        if gift_code['status'] != 'GiftCodeAvailable':
+            raise MockWalletError('GiftCodeNotYetAvailable', gift_code_b58)
+        if address is None:
+            address = self._get_account(account_id)['account']['main_address']
+        value = gift_code['value'] - self.fee_pmob
+        public_key = self._hash('claim', gift_code_b58)
+        self._pending.append({
+            'transaction_log_id': None,
+            'account_id': None,
+            'inputs': [gift_code['txo_id']],
+            'outputs': [(address, value, public_key)],
+            'change': 0,
+            'tombstone_block': self.block_height + 10,
+        })
+        gift_code['status'] = 'GiftCodeClaimed'
+        return {'txo_id': self._txo_id(public_key)}
+
+    def rpc_remove_gift_code(self, gift_code_b58):
+        gift_code = self._gift_codes.pop(gift_code_b58, None)
+        if gift_code is None or gift_code['status'] is None:
+            raise MockWalletError('GiftCodeNotFound', gift_code_b58)
+        return {'removed': True}
+
+    # State helpers.
+
+    def _hash(self, *parts):
+        return hashlib.sha256(repr((self.seed,) + parts).encode()).hexdigest()
+
+    def _b58(self, *parts, length=100):
+        digest = int(self._hash(*parts) * 4, 16)
+        chars = []
+        while len(chars) < length:
+            digest, remainder = divmod(digest, 58)
+            chars.append(B58_ALPHABET[remainder])
+        return ''.join(chars)
+
+    def _txo_id(self, public_key):
+        return self._hash('txo', public_key)
+
+    def _tx_id(self, tx_proposal):
+        return self._hash('tx', json.dumps(tx_proposal['tx'], sort_keys=True))
+
+    def _get_account(self, account_id):
+        try:
+            return self._accounts[account_id]
+        except KeyError:
+            raise MockWalletError('AccountNotFound', account_id)
+
+    def _get_gift_code(self, gift_code_b58):
+        try:
+            return self._gift_codes[gift_code_b58]
+        except KeyError:
+            raise MockWalletError('GiftCodeNotFound', gift_code_b58)
+
+    def _get_proposal(self, tx_proposal):
+        try:
+            return self._proposals[self._tx_id(tx_proposal)]
+        except KeyError:
+            raise MockWalletError('InvalidTxProposal', 'Unknown tx_proposal.')
+
+    def _add_account(self, name, entropy=None, mnemonic=None, key_derivation_version=None,
+                     first_block_index=None, next_subaddress_index=None):
+        if mnemonic is not None:
+            key_derivation_version = str(int(key_derivation_version or 2))
+            account_id = self._hash('account', mnemonic)
+        else:
+            key_derivation_version = '1'
+            account_id = self._hash('account', entropy)
+        if account_id in self._accounts:
+            raise MockWalletError('AccountAlreadyExists', account_id)
+
+        if first_block_index is None:
+            first_block_index = 0
+        self._accounts[account_id] = {
+            'account': {
+                'object': 'account',
+                'account_id': account_id,
+                'name': name or '',
+                'key_derivation_version': key_derivation_version,
+                'main_address': None,
+                'next_subaddress_index': '2',
+                'first_block_index': str(int(first_block_index)),
+                'next_block_index': str(self.block_height),
+                'recovery_mode': False,
+                'fog_enabled': False,
+            },
+            'entropy': entropy,
+            'mnemonic': mnemonic,
+            'addresses': {},
+        }
+        main_address = self._add_address(account_id, 0, 'Main')
+        self._add_address(account_id, CHANGE_SUBADDRESS_INDEX, 'Change')
+        account = self._accounts[account_id]['account']
+        account['main_address'] = main_address['public_address']
+        if next_subaddress_index is not None:
+            for index in range(2, int(next_subaddress_index)):
+                self._add_address(account_id, index, '')
+            account['next_subaddress_index'] = str(max(2, int(next_subaddress_index)))
+        return dict(account)
+
+    def _add_address(self, account_id, index, metadata):
+        public_address = self._b58('address', account_id, index)
+        address = {
+            'object': 'address',
+            'public_address': public_address,
+            'account_id': account_id,
+            'metadata': metadata or '',
+            'subaddress_index': str(index),
+        }
+        self._accounts[account_id]['addresses'][public_address] = address
+        self._addresses[public_address] = (account_id, index)
+        self._subaddresses[(account_id, index)] = public_address
+        return address
+
+    def _credit_import(self, account):
+        if self.initial_balance_pmob <= 0:
+            return
+        account_id = account['account_id']
+        block_index = min(int(account['first_block_index']), self.block_height - 1)
+        public_key = self._hash('initial_balance', account_id)
+        txo = self._add_txo(public_key, self.initial_balance_pmob, account_id, 0, block_index, None)
+        self._add_log(
+            self._hash('log', public_key),
+            account_id,
+            'tx_direction_received',
+            txo['value'],
+            None,
+            None,
+            block_index,
+            'tx_status_succeeded',
+            output_txos=[txo],
+            assigned_address_id=account['main_address'],
+        )
+
+    def _add_txo(self, public_key, value, received_account_id, subaddress_index, block_index, minted_account_id):
+        txo_id = self._txo_id(public_key)
+        txo = {
+            'txo_id': txo_id,
+            'public_key': public_key,
+            'value': value,
+            'received_account_id': received_account_id,
+            'minted_account_id': minted_account_id,
+            'subaddress_index': subaddress_index,
+            'received_block_index': block_index,
+            'spent_block_index': None,
+            'status': 'unspent' if received_account_id is not None else 'secreted',
+        }
+        self._txos[txo_id] = txo
+        return txo
+
+    def _add_log(self, log_id, account_id, direction, value, fee, submitted_block_index, finalized_block_index,
+                 status, input_txos=(), output_txos=(), change_txos=(), assigned_address_id=None):
+        def abbrev(txo):
+            return {
+                'txo_id_hex': txo['txo_id'],
+                'recipient_address_id': '',
+                'value_pmob': str(txo['value']),
+            }
+
+        def optional_str(x):
+            return None if x is None else str(x)
+
+        log = {
+            'object': 'transaction_log',
+            'transaction_log_id': log_id,
+            'direction': direction,
+            'is_sent_recovered': None,
+            'account_id': account_id,
+            'input_txos': [ abbrev(t) for t in input_txos ],
+            'output_txos': [ abbrev(t) for t in output_txos ],
+            'change_txos': [ abbrev(t) for t in change_txos ],
+            'assigned_address_id': assigned_address_id,
+            'value_pmob': str(value),
+            'fee_pmob': optional_str(fee),
+            'submitted_block_index': optional_str(submitted_block_index),
+            'finalized_block_index': optional_str(finalized_block_index),
+            'status': status,
+            'sent_time': None,
+            'comment': '',
+            'failure_code': None,
+            'failure_message': None,
+        }
+        self._transaction_logs[log_id] = log
+        return log
+
+    def _logs_for_account(self, account_id):
+        self._get_account(account_id)
+        return [ log for log in self._transaction_logs.values() if log['account_id'] == account_id ]
+
+    def _outlays(self, addresses_and_values, recipient_public_address, value_pmob):
+        if addresses_and_values is None:
+            addresses_and_values = [(recipient_public_address, value_pmob)]
+        return [ (address, int(value)) for address, value in addresses_and_values ]
+
+    def _build(self, account_id, outlays, fee, tombstone_block):
+        self._get_account(account_id)
+        fee = self.fee_pmob if fee is None else int(fee)
+        if tombstone_block is None or int(tombstone_block) == 0:
+            tombstone_block = self.block_height + 10
+        tombstone_block = int(tombstone_block)
+        total = sum( value for _, value in outlays ) + fee
+
+        unspent = sorted(
+            (
+                t for t in self._txos.values()
+                if t['received_account_id'] == account_id and t['status'] == 'unspent'
+            ),
+            key=lambda t: (-t['value'], t['txo_id']),
+        )
+        inputs = []
+        input_value = 0
+        for t in unspent:
+            if input_value >= total:
+                break
+            inputs.append(t)
+            input_value += t['value']
+        if input_value < total:
+            raise MockWalletError('InsufficientFunds', 'Cannot make change for value {}'.format(total))
+
+        self._counter += 1
+        nonce = self._counter
+        outputs = [
+            (address, value, self._hash('output', nonce, i))
+            for i, (address, value) in enumerate(outlays)
+        ]
+        change = input_value - total
+        change_public_key = self._hash('change', nonce)
+
+        tx_out_public_keys = [ public_key for _, _, public_key in outputs ] + [change_public_key]
+        tx_proposal = {
+            'input_list': [
+                {
+                    'tx_out': {'public_key': t['public_key']},
+                    'subaddress_index': str(t['subaddress_index']),
+                    'key_image': self._hash('key_image', t['txo_id']),
+                    'value': str(t['value']),
+                    'attested_spent_height': '0',
+                    'attested_spent': False,
+                }
+                for t in inputs
+            ],
+            'outlay_list': [
+                {'value': str(value), 'receiver': {'b58_address': address}}
+                for address, value, _ in outputs
+            ],
+            'tx': {
+                'prefix': {
+                    'inputs': [ {'key_image': self._hash('key_image', t['txo_id'])} for t in inputs ],
+                    'outputs': [ {'public_key': public_key} for public_key in tx_out_public_keys ],
+                    'fee': str(fee),
+                    'tombstone_block': str(tombstone_block),
+                },
+                'signature': {'nonce': str(nonce)},
+            },
+            'fee': str(fee),
+            'outlay_index_to_tx_out_index': [ [str(i), str(i)] for i in range(len(outputs)) ],
+            'outlay_confirmation_numbers': [
+                list(bytes.fromhex(self._hash('confirmation', public_key)))
+                for _, _, public_key in outputs
+            ],
+        }
+        self._proposals[self._tx_id(tx_proposal)] = {
+            'account_id': account_id,
+            'inputs': [ t['txo_id'] for t in inputs ],
+            'outputs': outputs,
+            'change': change,
+            'change_public_key': change_public_key,
+            'fee': fee,
+            'tombstone_block': tombstone_block,
+        }
+        return tx_proposal
+
+    def _submit(self, tx_proposal, account_id):
+        log_id = self._tx_id(tx_proposal)
+        proposal = self._get_proposal(tx_proposal)
+        for txo_id in proposal['inputs']:
+            t = self._txos.get(txo_id)
+            if t is None or t['status'] != 'unspent':
+                raise MockWalletError('TransactionValidationError', 'ContainsSpentKeyImage')
+        if proposal['tombstone_block'] <= self.block_height:
+            raise MockWalletError('TransactionValidationError', 'TombstoneBlockExceeded')
+
+        for txo_id in proposal['inputs']:
+            self._txos[txo_id]['status'] = 'pending'
+
+        log = None
+        if account_id is not None:
+            value = sum( value for _, value, _ in proposal['outputs'] )
+            log = self._add_log(
+                log_id,
+                account_id,
+                'tx_direction_sent',
+                value,
+                proposal['fee'],
+                self.block_height,
+                None,
+                'tx_status_pending',
+                input_txos=[ self._txos[txo_id] for txo_id in proposal['inputs'] ],
+            )
+            log = dict(log)
+        self._pending.append(dict(proposal, transaction_log_id=log_id if account_id is not None else None))
+        return log
+
+    def _add_block(self):
+        block_index = self.block_height
+        self.block_height += 1
+        pending, self._pending = self._pending, []
+        for p in pending:
+            if block_index >= p['tombstone_block']:
+                self._fail(p)
+            else:
+                self._land(p, block_index)
+        # Accounts scan each block as soon as it is added.
+        for a in self._accounts.values():
+            a['account']['next_block_index'] = str(self.block_height)
+
+    def _land(self, p, block_index):
+        for txo_id in p['inputs']:
+            t = self._txos[txo_id]
+            t['status'] = 'spent'
+            t['spent_block_index'] = block_index
+
+        output_txos = []
+        for address, value, public_key in p['outputs']:
+            received_account_id, subaddress_index = self._addresses.get(address, (None, None))
+            t = self._add_txo(public_key, value, received_account_id, subaddress_index, block_index, p['account_id'])
+            output_txos.append((t, address))
+            if received_account_id is not None:
+                self._add_log(
+                    self._hash('log', public_key),
+                    received_account_id,
+                    'tx_direction_received',
+                    value,
+                    None,
+                    None,
+                    block_index,
+                    'tx_status_succeeded',
+                    output_txos=[t],
+                    assigned_address_id=address,
+                )
+            gift_code_b58 = self._gift_code_addresses.get(address)
+            if gift_code_b58 in self._gift_codes:
+                gift_code = self._gift_codes[gift_code_b58]
+                gift_code['txo_id'] = t['txo_id']
+                t['status'] = 'unspent'
+                if gift_code['status'] == 'GiftCodeSubmittedPending':
+                    gift_code['status'] = 'GiftCodeAvailable'
+
+        change_txos = []
+        if p['account_id'] is not None and p['change'] > 0:
+            change_txos.append(self._add_txo(
+                p['change_public_key'],
+                p['change'],
+                p['account_id'],
+                CHANGE_SUBADDRESS_INDEX,
+                block_index,
+                p['account_id'],
+            ))
+
+        log = self._transaction_logs.get(p['transaction_log_id'])
+        if log is not None:
+            log['status'] = 'tx_status_succeeded'
+            log['finalized_block_index'] = str(block_index)
+            log['output_txos'] = [
+                {'txo_id_hex': t['txo_id'], 'recipient_address_id': address, 'value_pmob': str(t['value'])}
+                for t, address in output_txos
+            ]
+            log['change_txos'] = [
+                {'txo_id_hex': t['txo_id'], 'recipient_address_id': '', 'value_pmob': str(t['value'])}
+                for t in change_txos
+            ]
+
+    def _fail(self, p):
+        for txo_id in p['inputs']:
+            t = self._txos.get(txo_id)
+            if t is not None and t['status'] == 'pending':
+                t['status'] = 'unspent'
+        log = self._transaction_logs.get(p['transaction_log_id'])
+        if log is not None:
+            log['status'] = 'tx_status_failed'
+
+    def _balance(self, txos, secreted):
+        def total(status):
+            return str(sum( t['value'] for t in txos if t['status'] == status ))
+
+        return {
+            'object': 'balance',
+            'network_block_height': str(self.block_height),
+            'local_block_height': str(self.block_height),
+            'account_block_height': str(self.block_height),
+            'is_synced': True,
+            'unspent_pmob': total('unspent'),
+            'pending_pmob': total('pending'),
+            'spent_pmob': total('spent'),
+            'secreted_pmob': str(secreted),
+            'orphaned_pmob': '0',
+        }
+
+    def _txo_json(self, t):
+        account_status_map = {}
+        if t['received_account_id'] is not None:
+            account_status_map[t['received_account_id']] = {
+                'txo_type': 'txo_type_received',
+                'txo_status': 'txo_status_' + t['status'],
+            }
+        if t['minted_account_id'] is not None and t['minted_account_id'] != t['received_account_id']:
+            account_status_map[t['minted_account_id']] = {
+                'txo_type': 'txo_type_minted',
+                'txo_status': 'txo_status_secreted',
+            }
+
+        def optional_str(x):
+            return None if x is None else str(x)
+
+        assigned_address = self._subaddresses.get((t['received_account_id'], t['subaddress_index']))
+
+        return {
+            'object': 'txo',
+            'txo_id_hex': t['txo_id'],
+            'value_pmob': str(t['value']),
+            'recipient_address_id': None,
+            'received_block_index': optional_str(t['received_block_index']),
+            'spent_block_index': optional_str(t['spent_block_index']),
+            'is_spent_recovered': False,
+            'received_account_id': t['received_account_id'],
+            'minted_account_id': t['minted_account_id'],
+            'account_status_map': account_status_map,
+            'target_key': '0a20' + self._hash('target_key', t['public_key']),
+            'public_key': t['public_key'],
+            'e_fog_hint': '',
+            'subaddress_index': optional_str(t['subaddress_index']),
+            'assigned_address': assigned_address,
+            'key_image': self._hash('key_image', t['txo_id']),
+            'confirmation': self._hash('confirmation', t['public_key']),
+        }
+
+    def _gift_code_json(self, gift_code):
+        return {
+            'object': 'gift_code',
+            'gift_code_b58': gift_code['gift_code_b58'],
+            'root_entropy': '',
+            'bip39_entropy': gift_code['entropy'],
+            'value_pmob': str(gift_code['value']),
+            'memo': gift_code['memo'],
+            'account_id': gift_code['account_id'],
+            'txo_id_hex': gift_code['txo_id'],
+        }
+
+
+class MockServer(ThreadingHTTPServer):
+    """Serve a MockWallet over HTTP, at the same path as full-service."""
+
+    daemon_threads = True
+
+    def __init__(self, wallet=None, host='127.0.0.1', port=0):
+        if wallet is None:
+            wallet = MockWallet()
+        self.wallet = wallet
+        super().__init__((host, port), _MockHandler)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return 'http://{}:{}/wallet'.format(host, port)
+
+    def start(self):
+        """Serve requests on a background thread, and return the server URL."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        try:
+            request_data = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        except ValueError:
+            self.send_error(400, 'Invalid JSON')
+            return
+        body = json.dumps(self.server.wallet.handle(request_data)).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run an in-memory mock of the full-service wallet API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9090)
+    parser.add_argument('--block-interval', type=float, default=1.0,
+                        help='Seconds between simulated blocks.')
+    parser.add_argument('--fee', type=int, default=DEFAULT_FEE_PMOB, help='Network fee, in picoMOB.')
+    parser.add_argument('--initial-balance', type=int, default=DEFAULT_INITIAL_BALANCE_PMOB,
+                        help='Balance credited to imported accounts, in picoMOB.')
+    parser.add_argument('--seed', default='mock', help='Seed for generated ids and keys.')
+    args = parser.parse_args()
+
+    wallet = MockWallet(
+        block_interval=args.block_interval,
+        fee_pmob=args.fee,
+        initial_balance_pmob=args.initial_balance,
+        seed=args.seed,
+    )
+    server = MockServer(wallet, args.host, args.port)
+    print('Serving mock wallet at {}'.format(server.url))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""
+Record and replay JSON-RPC traffic.
+
+A TrafficRecorder writes every request and response made by a Client to a newline-delimited JSON
+log, gzip-compressed if the file name ends in ".gz". Each line holds the request's start time in
+seconds since recording began, its latency, the request and the response.
+
+A recording can then be re-issued against a server at its original pace or scaled, with
+`replay`, or its responses can be served back to client code without a server, with
+ReplayClient.
+
+Secrets are replaced with REDACTED before they are written. These are the mnemonics and entropy
+sent to import accounts, the keys returned by export_account_secrets, gift codes, which can be
+claimed by anyone who holds them, and the b58 codes sent to check_b58_type, which may be transfer
+payloads carrying entropy.
+"""
+import gzip
+import json
+import queue
+import threading
+import time
+
+from .bench import Sample
+from .client import READ_ONLY_METHODS, Client
+
+
+REDACTED = '[redacted]'
+
+# Request and response fields which hold secrets, at any depth.
+SECRET_FIELDS = {
+    'mnemonic',
+    'entropy',
+    'legacy_root_entropy',
+    'root_entropy',
+    'bip39_entropy',
+    'view_private_key',
+    'spend_private_key',
+    'gift_code_b58',
+    'b58_code',
+}
+
+
+def _open(path, mode):
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class TrafficRecorder:
+    """Append request/response pairs to a log file. May be shared between clients and threads."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = _open(path, 'w')
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+
+    def record(self, request_data, response_data, start, elapsed):
+        entry = {
+            't': round(start - self._start, 6),
+            'elapsed': round(elapsed, 6),
+            'request': _redact(request_data),
+            'response': _redact(response_data),
+        }
+        if entry['request'] is not request_data:
+            # The request cannot be sent again as it was.
+            entry['redacted'] = True
+        line = json.dumps(entry, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line)
+            self._file.write('\n')
+
+    def flush(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def read_recording(path):
+    """Yield the entries of a recorded traffic log, in order."""
+    with _open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class ReplayClient(Client):
+    """
+    A Client which answers requests from a recording instead of a server.
+
+    Responses for identical requests are served in the order they were recorded, and the last one
+    is repeated once they run out. A request which was never recorded gets an error response.
+    """
+
+    def __init__(self, path, verbose=False):
+        super().__init__(url='replay:' + str(path), verbose=verbose)
+        self._responses = {}
+        for entry in read_recording(path):
+            key = _request_key(entry['request'])
+            self._responses.setdefault(key, []).append(entry['response'])
+        self._positions = {}
+        self._positions_lock = threading.Lock()
+
+    def _post(self, request_data):
+        key = _request_key(_redact(request_data))
+        responses = self._responses.get(key)
+        if responses is None:
+            return {
+                'error': {
+                    'code': -32603,
+                    'message': 'Internal error',
+                    'data': {'server_error': 'NotRecorded', 'details': key},
+                },
+            }
+        with self._positions_lock:
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+        return responses[min(position, len(responses) - 1)]
+
+    def _worker_client(self):
+        # There is no connection, so other threads can share this client.
+        return self
+
+    def close(self):
+        if self._owns_network_status:
+            self._network_status.stop()
+
+
+def _request_key(request_data):
+    return json.dumps([request_data.get('method'), request_data.get('params')], sort_keys=True)
+
+
+def _redact(data):
+    """JSON data with the values of SECRET_FIELDS replaced, as a copy, or data itself if it has none."""
+    if isinstance(data, dict):
+        result = {
+            key: REDACTED if key in SECRET_FIELDS and value else _redact(value)
+            for key, value in data.items()
+        }
+    elif isinstance(data, list):
+        result = [ _redact(value) for value in data ]
+    else:
+        return data
+    return data if result == data else result
+
+
+def replay(path, url, speed=1.0, workers=8, include_mutations=False):
+    """
+    Re-issue recorded requests against the server at `url`.
+
+    Requests are sent at their recorded offsets divided by `speed`, so a speed of 2 replays the
+    traffic twice as fast, and a speed of 0 sends it as fast as the workers allow. Only read-only
+    methods are sent, unless include_mutations is set, since sending transactions or gift codes
+    again could spend funds. Requests with redacted secrets are never sent.
+
+    Return a list of Samples, like the load generator, the recorded latencies of the same requests
+    for comparison, and the number of requests skipped.
+    """
+    schedule = queue.Queue()
+    samples = []
+    recorded = []
+    samples_lock = threading.Lock()
+
+    def worker():
+        c = Client(url=url)
+        while True:
+            item = schedule.get()
+            if item is None:
+                break
+            scheduled, request_data = item
+            delay = scheduled - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                response_data = c._post(request_data)
+                ok = 'result' in response_data
+            except (ConnectionError, ValueError):
+                ok = False
+            latency = time.monotonic() - scheduled
+            with samples_lock:
+                samples.append(Sample(scheduled - start, request_data.get('method'), latency, ok))
+        c.close()
+
+    threads = [ threading.Thread(target=worker, daemon=True) for _ in range(workers) ]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+
+    skipped = 0
+    for entry in read_recording(path):
+        method = entry['request'].get('method')
+        if entry.get('redacted') or not (include_mutations or method in READ_ONLY_METHODS):
+            skipped += 1
+            continue
+        recorded.append(Sample(entry['t'], entry['request'].get('method'), entry['elapsed'], 'result' in entry['response']))
+        if speed > 0:
+            scheduled = start + entry['t'] / speed
+            ahead = scheduled - time.monotonic() - 0.1
+            if ahead > 0:
+                time.sleep(ahead)
+        else:
+            scheduled = time.monotonic()
+        schedule.put((scheduled, entry['request']))
+
+    for _ in threads:
+        schedule.put(None)
+    for thread in threads:
+        thread.join()
+
+    return sorted(samples), recorded, skipped
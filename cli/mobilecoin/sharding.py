@@ -0,0 +1,249 @@
+"""
+Spread accounts across several full-service instances.
+
+A ShardedClient wraps one Client per wallet server, or shard. Each account lives on one shard,
+and requests for it are sent there. Wallet-wide reads are sent to every shard at once and merged.
+
+Account ids are derived from the account keys by the server, so they are not known before an
+import. New accounts are therefore created or imported on the shard with the fewest accounts,
+and the client remembers where each account is. Each account also has a home shard, chosen by
+consistent hashing of its id, and rebalance() moves every account which is not on its home shard
+there. That includes accounts placed by load, not only those which hash to a newly added shard,
+so rebalancing trades the even counts of load placement for placement by hash.
+"""
+from bisect import bisect
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+
+
+# Points on the hash ring per shard. More points spread accounts more evenly.
+RING_REPLICAS = 64
+
+# Methods whose first argument is an account id, which are sent to that account's shard.
+ACCOUNT_METHODS = {
+    'get_account',
+    'update_account_name',
+    'export_account_secrets',
+    'get_all_txos_for_account',
+    'get_balance_for_account',
+    'assign_address_for_account',
+    'get_addresses_for_account',
+    'build_and_submit_transaction',
+    'build_and_submit_transaction_with_proposal',
+    'build_transaction',
+    'get_all_transaction_logs_for_account',
+    'get_transaction_logs_for_account',
+    'iter_transaction_logs_for_account',
+    'build_gift_code',
+    'claim_gift_code',
+    'poll_balance',
+    'analyze_txos',
+}
+
+# Methods which read the ledger rather than any account, and can be sent to any shard.
+LEDGER_METHODS = {
+    'get_network_status',
+    'network_status',
+    'check_b58_type',
+    'verify_address',
+}
+
+
+class ShardedClient:
+    """
+    Route account requests across several Clients, each for a different wallet server.
+
+    clients is a dict of shard name to Client, or a list of Clients, named by their urls. Like a
+    Client, a ShardedClient should only be used from one thread at a time; it uses each shard's
+    Client from one thread at a time too.
+    """
+
+    def __init__(self, clients, replicas=RING_REPLICAS):
+        if not isinstance(clients, dict):
+            clients = { c.url: c for c in clients }
+        if not clients:
+            raise ValueError('A ShardedClient needs at least one shard.')
+        self.replicas = replicas
+        self.clients = {}
+        self._ring = []
+        # Account id to the name of the shard it is on, as last seen.
+        self._locations = {}
+        self._refreshed = False
+        for name, client in clients.items():
+            self.add_shard(name, client)
+
+    def add_shard(self, name, client):
+        """
+        Add a shard. New accounts are placed on it until it is as loaded as the others. Accounts
+        which now hash to it stay where they are, and are still found there, until rebalance()
+        moves them.
+        """
+        if name in self.clients:
+            raise ValueError('There is already a shard named {}.'.format(name))
+        self.clients[name] = client
+        for i in range(self.replicas):
+            self._ring.append((_hash('{}#{}'.format(name, i)), name))
+        self._ring.sort()
+
+    def home_shard(self, account_id):
+        """The name of the shard an account belongs on, by consistent hashing."""
+        i = bisect(self._ring, (_hash(account_id),)) % len(self._ring)
+        return self._ring[i][1]
+
+    def shard_name(self, account_id):
+        """
+        The name of the shard an account is on. An account which has not been seen, for example
+        one added by another client, is looked for on every shard, and if it is on none, its home
+        shard is given.
+        """
+        name = self._locations.get(account_id)
+        if name is None:
+            self.refresh()
+            name = self._locations.get(account_id)
+        if name is None:
+            name = self.home_shard(account_id)
+        return name
+
+    def shard(self, account_id):
+        """The Client for the shard an account is on, for requests which are not routed here."""
+        return self.clients[self.shard_name(account_id)]
+
+    def refresh(self):
+        """Find every account on every shard, returning the merged account map."""
+        results = self._fan_out(lambda c: c.get_all_accounts())
+        self._locations = {
+            account_id: name
+            for name, account_map in results.items()
+            for account_id in account_map
+        }
+        self._refreshed = True
+        return {
+            account_id: account
+            for account_map in results.values()
+            for account_id, account in account_map.items()
+        }
+
+    def loads(self):
+        """The number of accounts on each shard."""
+        if not self._refreshed:
+            self.refresh()
+        result = dict.fromkeys(self.clients, 0)
+        for name in self._locations.values():
+            result[name] += 1
+        return result
+
+    # Wallet-wide requests.
+
+    def get_all_accounts(self):
+        return self.refresh()
+
+    def get_all_gift_codes(self):
+        results = self._fan_out(lambda c: c.get_all_gift_codes())
+        return [ gift_code for gift_codes in results.values() for gift_code in gift_codes ]
+
+    # New accounts.
+
+    def create_account(self, name=None):
+        return self._add_account(lambda c: c.create_account(name))
+
+    def import_account(self, *args, **kwargs):
+        return self._add_account(lambda c: c.import_account(*args, **kwargs))
+
+    def import_account_from_legacy_root_entropy(self, *args, **kwargs):
+        return self._add_account(lambda c: c.import_account_from_legacy_root_entropy(*args, **kwargs))
+
+    def remove_account(self, account_id):
+        result = self.shard(account_id).remove_account(account_id)
+        self._locations.pop(account_id, None)
+        return result
+
+    def submit_transaction(self, tx_proposal, account_id=None):
+        if account_id is None:
+            client = next(iter(self.clients.values()))
+        else:
+            client = self.shard(account_id)
+        return client.submit_transaction(tx_proposal, account_id)
+
+    def submit_gift_code(self, gift_code_b58, tx_proposal, account_id):
+        return self.shard(account_id).submit_gift_code(gift_code_b58, tx_proposal, account_id)
+
+    # Rebalancing.
+
+    def rebalance(self, dry_run=False):
+        """
+        Move every account which is not on its home shard there, returning a list of
+        (account_id, from shard, to shard) moves. With dry_run, only return the list. Accounts
+        which were placed by load on a shard other than their home shard are moved too.
+
+        A move exports the account's secrets, imports it on its home shard, from its first block
+        and with the same name and subaddress count, then removes it from the old shard. The new
+        shard scans the account again, and its transaction logs only cover what that scan finds.
+        """
+        self.refresh()
+        moves = [
+            (account_id, name, self.home_shard(account_id))
+            for account_id, name in sorted(self._locations.items())
+            if name != self.home_shard(account_id)
+        ]
+        if not dry_run:
+            for account_id, source, target in moves:
+                self._move(account_id, source, target)
+        return moves
+
+    def _move(self, account_id, source, target):
+        old = self.clients[source]
+        new = self.clients[target]
+        account = old.get_account(account_id)
+        secrets = old.export_account_secrets(account_id)
+        fog_keys = {
+            field: secrets['account_key'][field]
+            for field in ['fog_report_url', 'fog_report_id', 'fog_authority_spki']
+            if secrets['account_key'].get(field)
+        }
+        options = {
+            'name': account['name'],
+            'first_block_index': account['first_block_index'],
+            'next_subaddress_index': account['next_subaddress_index'],
+            'fog_keys': fog_keys or None,
+        }
+        if secrets.get('mnemonic'):
+            imported = new.import_account(secrets['mnemonic'], secrets['key_derivation_version'], **options)
+        else:
+            imported = new.import_account_from_legacy_root_entropy(secrets['entropy'], **options)
+        if imported['account_id'] != account_id:
+            raise Exception('Moving account {} to shard {} gave it id {}.'.format(
+                account_id, target, imported['account_id']))
+        old.remove_account(account_id)
+        self._locations[account_id] = target
+
+    # Routing.
+
+    def __getattr__(self, method):
+        if method in ACCOUNT_METHODS:
+            def routed(account_id, *args, **kwargs):
+                return getattr(self.shard(account_id), method)(account_id, *args, **kwargs)
+            return routed
+        if method in LEDGER_METHODS:
+            return getattr(next(iter(self.clients.values())), method)
+        raise AttributeError('{} is not routed by ShardedClient; use shard(account_id).{}'.format(method, method))
+
+    def close(self):
+        for client in self.clients.values():
+            client.close()
+
+    def _add_account(self, add):
+        loads = self.loads()
+        name = min(loads, key=lambda name: (loads[name], name))
+        account = add(self.clients[name])
+        self._locations[account['account_id']] = name
+        return account
+
+    def _fan_out(self, request):
+        """Make a request of every shard concurrently, returning a dict of shard name to result."""
+        with ThreadPoolExecutor(max_workers=len(self.clients)) as executor:
+            futures = { name: executor.submit(request, client) for name, client in self.clients.items() }
+            return { name: future.result() for name, future in futures.items() }
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], 'big')
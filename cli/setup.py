@@ -11,7 +11,7 @@ setup(
     url='https://github.com/mobilecoinofficial/full-service/tree/main/cli',
     packages=['mobilecoin'],
     scripts=['bin/mobcli'],
-    install_requires=[],
+    install_requires=['mobilecoin-python-utils'],
     data_files=[
         ('scripts', ['mc_env.sh', 'install.sh']),
     ],
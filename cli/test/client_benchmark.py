@@ -0,0 +1,272 @@
+"""
+Measure the Python client's own cost per call, independently of full-service.
+
+Client is run against an in-process stub JSON-RPC server which answers every method with a canned,
+pre-serialized response, so nearly all of the measured time is spent in the client: building the
+request, encoding and decoding JSON, and the HTTP exchange. Each case is also run with the
+network removed, to isolate JSON decoding and result unwrapping.
+
+    python client_benchmark.py --calls 2000 --json results.json
+"""
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import statistics
+import threading
+import time
+import tracemalloc
+
+from mobilecoin import Client, Pmob, mob2pmob, pmob2mob
+
+
+def balance_response():
+    return {
+        'balance': {
+            'object': 'balance',
+            'network_block_height': '500000',
+            'local_block_height': '500000',
+            'account_block_height': '500000',
+            'is_synced': True,
+            'unspent_pmob': '123456789012345',
+            'pending_pmob': '0',
+            'spent_pmob': '98765432109876',
+            'secreted_pmob': '0',
+            'orphaned_pmob': '0',
+        },
+    }
+
+
+def txo_map_response(count):
+    txo_map = {}
+    for i in range(count):
+        txo_id = '{:064x}'.format(i)
+        txo_map[txo_id] = {
+            'object': 'txo',
+            'txo_id_hex': txo_id,
+            'value_pmob': str(1000000000 + i),
+            'recipient_address_id': None,
+            'received_block_index': str(100000 + i),
+            'spent_block_index': None,
+            'is_spent_recovered': False,
+            'received_account_id': 'a' * 64,
+            'minted_account_id': None,
+            'account_status_map': {'a' * 64: {'txo_type': 'txo_type_received', 'txo_status': 'txo_status_unspent'}},
+            'target_key': '0a20' + 'b' * 64,
+            'public_key': '0a20' + 'c' * 64,
+            'e_fog_hint': '0a54' + 'd' * 168,
+            'subaddress_index': '0',
+            'assigned_address': None,
+            'key_image': '0a20' + 'e' * 64,
+            'confirmation': None,
+        }
+    return {'txo_ids': list(txo_map.keys()), 'txo_map': txo_map}
+
+
+def tx_proposal_response(inputs, ring_size=11):
+    def tx_out(i):
+        return {
+            'amount': {'commitment': 'f' * 64, 'masked_value': str(i)},
+            'target_key': 'b' * 64,
+            'public_key': 'c' * 64,
+            'e_fog_hint': 'd' * 168,
+        }
+
+    def membership_proof(i):
+        return {
+            'index': str(i),
+            'highest_index': str(500000),
+            'elements': [
+                {'range': {'from': str(j), 'to': str(j)}, 'hash': '1' * 64}
+                for j in range(20)
+            ],
+        }
+
+    return {
+        'tx_proposal': {
+            'input_list': [
+                {
+                    'tx_out': tx_out(i),
+                    'subaddress_index': '0',
+                    'key_image': 'e' * 64,
+                    'value': '1000000000',
+                    'attested_spent_height': '0',
+                    'attested_spent': False,
+                }
+                for i in range(inputs)
+            ],
+            'outlay_list': [{'value': '100000000', 'receiver': {'view_public_key': '2' * 64, 'spend_public_key': '3' * 64}}],
+            'tx': {
+                'prefix': {
+                    'inputs': [
+                        {
+                            'ring': [ tx_out(j) for j in range(ring_size) ],
+                            'proofs': [ membership_proof(j) for j in range(ring_size) ],
+                        }
+                        for _ in range(inputs)
+                    ],
+                    'outputs': [ tx_out(i) for i in range(2) ],
+                    'fee': '400000000',
+                    'tombstone_block': '500100',
+                },
+                'signature': {
+                    'ring_signatures': [
+                        {'c_zero': '4' * 64, 'responses': ['5' * 64] * (2 * ring_size), 'key_image': 'e' * 64}
+                        for _ in range(inputs)
+                    ],
+                    'pseudo_output_commitments': ['6' * 64] * inputs,
+                    'range_proofs': '7' * 1400,
+                },
+            },
+            'fee': '400000000',
+            'outlay_index_to_tx_out_index': [['0', '0']],
+            'outlay_confirmation_numbers': [['8'] * 32],
+        },
+    }
+
+
+CASES = [
+    ('balance', 'get_balance_for_account', balance_response),
+    ('txos_1k', 'get_all_txos_for_account', lambda: txo_map_response(1000)),
+    ('txos_10k', 'get_all_txos_for_account', lambda: txo_map_response(10000)),
+    ('tx_proposal_16', 'build_transaction', lambda: tx_proposal_response(16)),
+]
+
+
+class StubServer(ThreadingHTTPServer):
+    """Answer each JSON-RPC method with a fixed, pre-serialized response."""
+
+    daemon_threads = True
+
+    def __init__(self, responses):
+        self.responses = {
+            method: json.dumps({'jsonrpc': '2.0', 'id': 1, 'result': result}).encode()
+            for method, result in responses.items()
+        }
+        super().__init__(('127.0.0.1', 0), _StubHandler)
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}/wallet'.format(self.server_address[1])
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        request_data = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        body = self.server.responses[request_data['method']]
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class OfflineClient(Client):
+    """A Client whose transport returns a canned response without any network."""
+
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = {
+            method: json.dumps({'jsonrpc': '2.0', 'id': 1, 'result': result})
+            for method, result in responses.items()
+        }
+
+    def _post(self, request_data):
+        json.dumps(request_data)
+        return json.loads(self.responses[request_data['method']])
+
+
+def call(client, method):
+    if method == 'get_balance_for_account':
+        return client.get_balance_for_account('a' * 64)
+    elif method == 'get_all_txos_for_account':
+        return client.get_all_txos_for_account('a' * 64)
+    elif method == 'build_transaction':
+        return client.build_transaction('a' * 64, '0.1', 'address')
+
+
+def measure(fn, calls, duration):
+    """
+    Time `fn` repeatedly, then measure its peak traced memory over a smaller number of calls: the
+    most memory tracemalloc saw allocated during a call, beyond what was allocated before it.
+    This is a size, not a count of allocations.
+    """
+    latencies = []
+    start = time.perf_counter()
+    while len(latencies) < calls and time.perf_counter() - start < duration:
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    alloc_calls = max(1, min(len(latencies) // 10, 100))
+    tracemalloc.start()
+    peaks = []
+    for _ in range(alloc_calls):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        fn()
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'calls': len(latencies),
+        'calls_per_second': len(latencies) / elapsed,
+        'p50_ms': 1000 * latencies[len(latencies) // 2],
+        'p90_ms': 1000 * latencies[int(len(latencies) * 0.9)],
+        'p99_ms': 1000 * latencies[int(len(latencies) * 0.99)],
+        'peak_traced_kib': statistics.mean(peaks) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Python client against a stub server.')
+    parser.add_argument('--calls', type=int, default=2000, help='Maximum number of calls per case.')
+    parser.add_argument('--duration', type=float, default=5.0, help='Maximum seconds per case.')
+    parser.add_argument('--json', help='Also write the results to this JSON file.')
+    args = parser.parse_args()
+
+    results = {}
+
+    for name, method, response in CASES:
+        responses = {method: response()}
+
+        server = StubServer(responses)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        client = Client(url=server.url)
+        results[name] = measure(lambda: call(client, method), args.calls, args.duration)
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+        offline_client = OfflineClient(responses)
+        results[name + '_offline'] = measure(lambda: call(offline_client, method), args.calls, args.duration)
+
+    results['mob2pmob'] = measure(lambda: mob2pmob('123.456789012345'), args.calls * 10, args.duration)
+    results['pmob2mob'] = measure(lambda: pmob2mob('123456789012345'), args.calls * 10, args.duration)
+
+    # Totalling a history of amounts, as the CLI does for outlays and received transactions.
+    values = [ str(1000000000 + i) for i in range(10000) ]
+    results['sum_10k_pmob2mob'] = measure(lambda: sum( pmob2mob(v) for v in values ), args.calls // 10, args.duration)
+    results['sum_10k_Pmob'] = measure(lambda: Pmob.total(values), args.calls // 10, args.duration)
+
+    print('{:<24} {:>10} {:>9} {:>9} {:>9} {:>16}'.format(
+        'case', 'calls/sec', 'p50 ms', 'p90 ms', 'p99 ms', 'peak traced KiB'))
+    for name, r in results.items():
+        print('{:<24} {:>10.0f} {:>9.3f} {:>9.3f} {:>9.3f} {:>16.1f}'.format(
+            name, r['calls_per_second'], r['p50_ms'], r['p90_ms'], r['p99_ms'], r['peak_traced_kib']))
+
+    if args.json is not None:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,6 @@ from contextlib import contextmanager
 from decimal import Decimal
 import sys
 import tempfile
-import time
 
 from mobilecoin import (
     Client,
@@ -294,9 +293,8 @@ def _start_test_server():
     cli = CommandLineInterface()
     cli.config['wallet-db'] = db_file.name
     cli.stop()
-    time.sleep(0.5)  # Wait for other servers to stop.
-    cli.start(bg=True, unencrypted=True)
-    time.sleep(1.5)  # Wait for the server to start listening.
+    if not cli.start(bg=True, unencrypted=True, wait=True):
+        raise Exception('Could not start the wallet server.')
     return cli
 
 
@@ -0,0 +1,17 @@
+import pytest
+
+from mobilecoin import Client, mob2pmob
+from mobilecoin.mock_server import MockServer, MockWallet
+
+
+@pytest.fixture
+def server():
+    with MockServer(MockWallet(initial_balance_pmob=mob2pmob(10))) as server:
+        yield server
+
+
+@pytest.fixture
+def c(server):
+    c = Client(url=server.url)
+    yield c
+    c.close()
@@ -1,21 +1,171 @@
+"""
+Benchmark how quickly full-service scans imported accounts.
+
+Runs several scenarios against a local wallet server, sampling account_block_height for each
+imported account until it is synced, and writes the results as JSON so that scan throughput can
+be compared across full-service builds.
+
+    python sync_benchmark.py source_wallet.json --accounts 4 --output results.json
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import json
+import os
 import sys
 import time
 
 from mobilecoin import Client
 from mobilecoin.cli import _load_import
 
-c = Client(verbose=False)
 
-source_wallet = sys.argv[1]
-data = _load_import(source_wallet)
-source_account = c.import_account(**data)
-source_account_id = source_account['account_id']
+SCENARIOS = ['single', 'concurrent', 'first_block']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark full-service account scanning.')
+    parser.add_argument('source_wallet', help='Account backup file for a funded account.')
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                        help='Scenario to run. May be given more than once. Defaults to all scenarios.')
+    parser.add_argument('--accounts', type=int, default=4,
+                        help='Number of accounts imported at once in the concurrent scenario.')
+    parser.add_argument('--first-block-steps', type=int, default=4,
+                        help='Number of different first_block_index values in the first_block scenario.')
+    parser.add_argument('--poll-delay', type=float, default=0.2, help='Seconds between height samples.')
+    parser.add_argument('--timeout', type=float, default=600, help='Seconds to wait for each scenario.')
+    parser.add_argument('--label', default='', help='Label for these results, such as the full-service build.')
+    parser.add_argument('--output', help='Write results to this JSON file instead of standard output.')
+    args = parser.parse_args()
+
+    c = Client(verbose=False)
+    source = _load_import(args.source_wallet)
+    network_status = c.get_network_status()
+    c.close()
+
+    results = {
+        'label': args.label,
+        'started_at': datetime.now(timezone.utc).isoformat(),
+        'network_block_height': int(network_status['network_block_height']),
+        'local_block_height': int(network_status['local_block_height']),
+        'scenarios': {},
+    }
+
+    for scenario in args.scenario or SCENARIOS:
+        if scenario == 'single':
+            imports = [('source', source)]
+        elif scenario == 'concurrent':
+            # Random accounts with no funds; they scan the same blocks as the source account.
+            imports = [('source', source)] + [
+                ('random_{}'.format(i), {'legacy_root_entropy': os.urandom(32).hex()})
+                for i in range(args.accounts - 1)
+            ]
+        elif scenario == 'first_block':
+            height = results['local_block_height']
+            imports = []
+            for i in range(args.first_block_steps):
+                first_block_index = height * i // args.first_block_steps
+                data = {
+                    'legacy_root_entropy': os.urandom(32).hex(),
+                    'first_block_index': first_block_index,
+                }
+                imports.append(('first_block_{}'.format(first_block_index), data))
+
+        print('Running scenario', scenario, file=sys.stderr)
+        results['scenarios'][scenario] = run_scenario(imports, args.poll_delay, args.timeout)
+
+    output = json.dumps(results, indent=2)
+    if args.output is None:
+        print(output)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(output)
+            f.write('\n')
+
+    for scenario, result in results['scenarios'].items():
+        print('{}: {} seconds, {} blocks/sec'.format(
+            scenario, round(result['wall_seconds'], 1), round(result['blocks_per_second'], 1),
+        ), file=sys.stderr)
+
+
+def run_scenario(imports, poll_delay, timeout):
+    """
+    Import every account at once, then sample their heights until all of them are synced.
+    """
+    with ThreadPoolExecutor(max_workers=len(imports)) as executor:
+        accounts = list(executor.map(_import, imports))
+
+    c = Client(verbose=False)
+    start = time.monotonic()
+    samples = { account_id: [] for _, account_id, _ in accounts }
+    synced = set()
+    try:
+        while len(synced) < len(accounts):
+            elapsed = time.monotonic() - start
+            if elapsed > timeout:
+                raise Exception('Accounts did not sync within {} seconds.'.format(timeout))
+            for _, account_id, _ in accounts:
+                if account_id in synced:
+                    continue
+                balance = c.get_balance_for_account(account_id)
+                samples[account_id].append((
+                    time.monotonic() - start,
+                    int(balance['account_block_height']),
+                    int(balance['unspent_pmob']),
+                ))
+                if balance['is_synced']:
+                    synced.add(account_id)
+            time.sleep(poll_delay)
+    finally:
+        for _, account_id, _ in accounts:
+            c.remove_account(account_id)
+        c.close()
+
+    account_results = [
+        _summarize(label, first_block_index, samples[account_id])
+        for label, account_id, first_block_index in accounts
+    ]
+    wall_seconds = max( r['sync_seconds'] for r in account_results )
+    total_blocks = sum( r['blocks_scanned'] for r in account_results )
+    return {
+        'wall_seconds': wall_seconds,
+        'blocks_per_second': total_blocks / wall_seconds if wall_seconds > 0 else 0.0,
+        'accounts': account_results,
+    }
+
+
+def _import(label_and_data):
+    label, data = label_and_data
+    c = Client(verbose=False)
+    if 'mnemonic' in data:
+        account = c.import_account(**data)
+    else:
+        account = c.import_account_from_legacy_root_entropy(**data)
+    c.close()
+    return label, account['account_id'], int(account['first_block_index'])
+
+
+def _summarize(label, first_block_index, samples):
+    """Compute scan throughput from a time series of (seconds, account_block_height, unspent_pmob)."""
+    sync_seconds, final_height, unspent_pmob = samples[-1]
+    blocks_scanned = max(final_height - first_block_index, 0)
+
+    time_to_first_balance = None
+    for seconds, _, unspent in samples:
+        if unspent > 0:
+            time_to_first_balance = seconds
+            break
 
-start = time.monotonic()
-balance = c.poll_balance(source_account_id, seconds=600, poll_delay=0.2)
-end = time.monotonic()
+    return {
+        'label': label,
+        'first_block_index': first_block_index,
+        'sync_seconds': sync_seconds,
+        'blocks_scanned': blocks_scanned,
+        'blocks_per_second': blocks_scanned / sync_seconds if sync_seconds > 0 else 0.0,
+        'time_to_first_balance': time_to_first_balance,
+        'unspent_pmob': unspent_pmob,
+        'samples': [ [round(seconds, 3), height] for seconds, height, _ in samples ],
+    }
 
-c.remove_account(source_account_id)
 
-print(round(end - start, 1), 'seconds')
-print(int(balance['unspent_pmob']) / 1e12, 'MOB')
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+from decimal import Decimal
+
+import pytest
+
+from mobilecoin import Pmob, mob2pmob, pmob2mob
+from mobilecoin.cli import _format_decimal, _format_mob
+
+
+def test_format_matches_format_decimal():
+    for value in [0, 1, 10**12, 10**12 + 1, 400000000, 123456789012345, 2**64 - 1, -5 * 10**11]:
+        assert Pmob(value).format() == _format_decimal(Decimal(value) / 10**12)
+        assert _format_mob(Pmob(value)) == _format_mob(pmob2mob(value))
+
+
+def test_mob2pmob():
+    assert mob2pmob('0.1') == 10**11
+    with pytest.raises(TypeError):
+        mob2pmob(Pmob(5))
+    with pytest.raises(ValueError):
+        mob2pmob('-1')
+    with pytest.raises(ValueError):
+        mob2pmob(2**64)
+
+
+def test_amount_pmob(server, c):
+    source_id = c.import_account('mnemonic words')['account_id']
+    dest = c.create_account()
+
+    # An int computed from a Pmob is still picoMOB when passed as amount_pmob.
+    amount = Pmob(10**11) * 2
+    tx_proposal = c.build_transaction(source_id, None, dest['main_address'], amount_pmob=amount, fee_pmob=Pmob(400000000))
+    assert tx_proposal['outlay_list'][0]['value'] == str(2 * 10**11)
+    tx_proposal = c.build_transaction(source_id, '0.2', dest['main_address'])
+    assert tx_proposal['outlay_list'][0]['value'] == str(2 * 10**11)
+
+    with pytest.raises(ValueError):
+        c.build_transaction(source_id, '0.2', dest['main_address'], amount_pmob=amount)
+    with pytest.raises(ValueError):
+        c.build_transaction(source_id, None, dest['main_address'])
+    with pytest.raises(ValueError):
+        c.build_transaction(source_id, None, dest['main_address'], amount_pmob=-1)
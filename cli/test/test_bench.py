@@ -0,0 +1,38 @@
+import pytest
+
+from mobilecoin.bench import LoadTarget, Sample, parse_mix, run_load, summarize
+from mobilecoin.mock_server import MockServer
+
+
+def test_parse_mix():
+    assert parse_mix('get_balance_for_account=8,build_transaction') == [
+        ('get_balance_for_account', 8.0),
+        ('build_transaction', 1.0),
+    ]
+    with pytest.raises(ValueError):
+        parse_mix('transfer_all_funds=1')
+
+
+def test_summarize():
+    samples = [
+        Sample(0.1, 'get_network_status', 0.010, True),
+        Sample(0.5, 'get_network_status', 0.020, True),
+        Sample(1.2, 'get_network_status', 0.030, False),
+    ]
+    first, second = summarize(samples, interval=1.0)
+    assert first['requests'] == 2
+    assert first['p50_ms'] == 20
+    assert second['errors'] == 1
+    assert second['throughput'] == 0
+
+    total, = summarize(samples, duration=2.0)
+    assert total['requests'] == 3
+    assert total['throughput'] == 1.0
+
+
+def test_run_load():
+    with MockServer() as server:
+        target = LoadTarget(None, None, None)
+        samples = run_load(server.url, target, [('get_network_status', 1)], rate=100, duration=0.5, workers=2)
+    assert len(samples) > 0
+    assert all( s.ok for s in samples )
@@ -0,0 +1,114 @@
+import os
+import threading
+
+import pytest
+
+from mobilecoin.cli import CommandLineInterface
+from mobilecoin.daemon import CachingClient, ClientDaemon, DaemonClient
+
+
+@pytest.fixture
+def daemon(server, tmp_path):
+    daemon = ClientDaemon(tmp_path / 'mobcli.sock', url=server.url)
+    thread = threading.Thread(target=daemon.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield daemon
+    daemon.shutdown()
+    thread.join()
+
+
+def test_caching_client(server):
+    c = CachingClient(url=server.url)
+    c.get_all_accounts()
+    c.get_all_accounts()
+    assert (c.cache_hits, c.cache_misses) == (1, 1)
+
+    # Changes to the account index made through the client clear the cache.
+    c.create_account()
+    assert len(c.get_all_accounts()) == 1
+    assert c.cache_misses == 2
+
+    c.get_network_status()
+    count = server.wallet.request_count
+    c.get_network_status()
+    assert server.wallet.request_count == count
+    c.close()
+
+
+def test_daemon_round_trip(server, daemon):
+    c = DaemonClient(daemon.socket_path)
+    account = c.create_account('Alice')
+    assert c.get_all_accounts() == {account['account_id']: account}
+    assert c.get_all_accounts() == {account['account_id']: account}
+
+    status = c.daemon_status()
+    assert status['url'] == server.url
+    assert status['pid'] == os.getpid()
+    assert status['requests'] == 3
+    assert (status['cache_hits'], status['cache_misses']) == (1, 1)
+
+    # Other clients share the daemon's connection and cache.
+    other = DaemonClient(daemon.socket_path)
+    assert other.get_all_accounts() == {account['account_id']: account}
+    assert other.daemon_status()['cache_hits'] == 2
+    other.close()
+
+    assert c.daemon_stop() == {'stopped': True}
+    c.close()
+    for _ in range(100):
+        if not os.path.exists(daemon.socket_path):
+            break
+        threading.Event().wait(0.05)
+    assert not os.path.exists(daemon.socket_path)
+    with pytest.raises(ConnectionError):
+        DaemonClient(daemon.socket_path)
+
+
+def test_daemon_network_status_max_age(server, daemon):
+    c = DaemonClient(daemon.socket_path)
+    height = c.network_status().local_block_height
+
+    # The daemon's cache is younger than its TTL, but max_age=0 is not served from it.
+    server.wallet.advance_blocks()
+    assert c.network_status(max_age=0).local_block_height == height + 1
+    assert c.network_status(max_age=0).local_block_height == height + 1
+    assert c.daemon_status()['cache_hits'] == 0
+
+    # Plain requests are still served from the cache.
+    c.get_network_status()
+    assert c.daemon_status()['cache_hits'] == 1
+    c.close()
+
+
+def test_daemon_error(tmp_path):
+    daemon = ClientDaemon(tmp_path / 'mobcli.sock', url='http://127.0.0.1:1/wallet')
+    thread = threading.Thread(target=daemon.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+
+    c = DaemonClient(daemon.socket_path)
+    with pytest.raises(ConnectionError):
+        c.get_all_accounts()
+    assert 'daemon_error' in c._send_message({'daemon': 'unknown'})
+    c.close()
+
+    daemon.shutdown()
+    thread.join()
+
+
+def test_shell(server, monkeypatch, capsys):
+    cli = CommandLineInterface.__new__(CommandLineInterface)
+    cli.config = {'api-url': server.url}
+    cli.verbose = False
+    cli.recorder = None
+    cli._create_parsers()
+
+    lines = iter(['list', '', 'create', 'daemon status', 'list "unterminated', 'list', 'exit'])
+    monkeypatch.setattr('builtins.input', lambda prompt: next(lines))
+    cli.shell()
+
+    out = capsys.readouterr().out
+    assert 'No accounts.' in out
+    assert 'Cannot run "daemon" from the shell.' in out
+    assert 'No closing quotation' in out
+    assert isinstance(cli.client, CachingClient)
+    assert len(cli.client.get_all_accounts()) == 1
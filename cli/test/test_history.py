@@ -0,0 +1,141 @@
+import csv
+import json
+
+import pytest
+
+from mobilecoin import Client, mob2pmob
+from mobilecoin.cli import (
+    HISTORY_EXPORT_FIELDS,
+    CommandLineInterface,
+    _block_key,
+    _block_ordered,
+    _history_row,
+)
+from mobilecoin.mock_server import MockServer, MockWallet
+
+
+def _log(submitted, finalized=None):
+    return {
+        'submitted_block_index': submitted,
+        'finalized_block_index': finalized,
+    }
+
+
+def test_block_key():
+    assert _block_key(_log('10', '9')) == 9
+    assert _block_key(_log('10')) == 10
+    assert _block_key(_log(None, '100')) == 100
+    assert _block_key(_log(None)) is None
+
+
+def test_block_ordered():
+    logs = [ _log(str(b)) for b in [3, 1, 2, 10, 4, 9, 11] ] + [_log(None)]
+    result = [ _block_key(t) for t in _block_ordered(iter(logs)) ]
+    assert result == [1, 2, 3, 4, 9, 10, 11, None]
+
+
+def test_block_ordered_far_out_of_order():
+    # Logs arriving several pages out of order, such as those written by a late account scan.
+    blocks = list(range(500, 1000)) + list(range(500))
+    logs = [ _log(str(b)) for b in blocks ]
+    assert [ _block_key(t) for t in _block_ordered(iter(logs)) ] == list(range(1000))
+    assert [ _block_key(t) for t in _block_ordered(iter(logs), limit=3) ] == [0, 1, 2]
+    assert [ _block_key(t) for t in _block_ordered(iter(logs + [_log(None)]), since_block=998) ] == [998, 999]
+
+
+def test_history_row():
+    t = {
+        'transaction_log_id': 'abc',
+        'account_id': 'def',
+        'direction': 'tx_direction_sent',
+        'status': 'tx_status_succeeded',
+        'submitted_block_index': '12',
+        'finalized_block_index': '13',
+        'value_pmob': '18446744073709551615',
+        'fee_pmob': None,
+        'output_txos': [{'recipient_address_id': 'xyz'}],
+        'sent_time': None,
+    }
+    row = dict(zip(HISTORY_EXPORT_FIELDS, _history_row(t)))
+    assert row['block_index'] == 12
+    assert row['value_pmob'] == 2**64 - 1
+    assert row['fee_pmob'] is None
+    assert row['address'] == 'xyz'
+
+
+@pytest.fixture
+def cli():
+    with MockServer(MockWallet(initial_balance_pmob=mob2pmob(10))) as server:
+        cli = CommandLineInterface.__new__(CommandLineInterface)
+        cli.client = Client(url=server.url)
+        cli.server = server
+        yield cli
+        cli.client.close()
+
+
+def _send_payments(cli):
+    c = cli.client
+    source_id = c.import_account('mnemonic words')['account_id']
+    dest = c.create_account()
+    for amount in ['0.1', '0.2']:
+        c.build_and_submit_transaction(source_id, amount, dest['main_address'])
+        cli.server.wallet.advance_blocks()
+    return source_id
+
+
+def test_export_csv(cli, tmp_path, capsys):
+    source_id = _send_payments(cli)
+    path = tmp_path / 'history.csv'
+    cli.history(source_id[:6], export=str(path), format='csv')
+    assert 'Wrote 3 transactions' in capsys.readouterr().out
+
+    with path.open(newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0].keys()) == HISTORY_EXPORT_FIELDS
+    assert [ (r['direction'], r['value_pmob'], r['fee_pmob']) for r in rows ] == [
+        ('tx_direction_received', str(mob2pmob(10)), ''),
+        ('tx_direction_sent', str(mob2pmob('0.1')), str(cli.server.wallet.fee_pmob)),
+        ('tx_direction_sent', str(mob2pmob('0.2')), str(cli.server.wallet.fee_pmob)),
+    ]
+    assert all( r['account_id'] == source_id for r in rows )
+
+    # An existing file is not overwritten.
+    cli.history(source_id[:6], export=str(path), format='jsonl')
+    assert 'already exists' in capsys.readouterr().out
+
+
+def test_export_jsonl(cli, tmp_path):
+    source_id = _send_payments(cli)
+    path = tmp_path / 'history.jsonl'
+    cli.history(source_id[:6], export=str(path), format='jsonl', since_block=2, limit=1)
+
+    rows = [ json.loads(line) for line in path.read_text().splitlines() ]
+    assert len(rows) == 1
+    assert list(rows[0].keys()) == HISTORY_EXPORT_FIELDS
+    assert rows[0]['direction'] == 'tx_direction_sent'
+    assert rows[0]['value_pmob'] == mob2pmob('0.2')
+    assert rows[0]['block_index'] == 2
+
+
+def test_export_columnar(cli, tmp_path):
+    pyarrow = pytest.importorskip('pyarrow')
+    import pyarrow.parquet
+
+    source_id = _send_payments(cli)
+    path = tmp_path / 'history.parquet'
+    cli.history(source_id[:6], export=str(path), format='columnar')
+
+    table = pyarrow.parquet.read_table(path)
+    assert table.column_names == HISTORY_EXPORT_FIELDS
+    for name in ['block_index', 'value_pmob', 'fee_pmob']:
+        assert table.schema.field(name).type == pyarrow.uint64()
+    assert table.schema.field('direction').type == pyarrow.string()
+
+    rows = table.to_pylist()
+    assert [ (r['direction'], r['value_pmob'], r['fee_pmob']) for r in rows ] == [
+        ('tx_direction_received', mob2pmob(10), None),
+        ('tx_direction_sent', mob2pmob('0.1'), cli.server.wallet.fee_pmob),
+        ('tx_direction_sent', mob2pmob('0.2'), cli.server.wallet.fee_pmob),
+    ]
+    assert [ r['block_index'] for r in rows ] == sorted( r['block_index'] for r in rows )
+    assert all( r['account_id'] == source_id for r in rows )
@@ -0,0 +1,31 @@
+import pytest
+
+from mobilecoin import Client, WalletAPIError
+
+mc_util = pytest.importorskip('mc_util')
+
+
+B58_ADDRESS = '6UEtkm1rieLhuz2wvELPHdGiCb96zNnW856QVeGLvYzE7NhmbG1MxnoSPGqyVfEHDvxzQmaURFpZcxT9TSypVgRVAusr7svtD1TcrYj92Uh'
+
+
+def test_local_b58():
+    # No server is listening at this URL, so every answer must be local.
+    c = Client(url='http://127.0.0.1:1/wallet', local_b58=True)
+
+    assert c.verify_address(B58_ADDRESS)
+    assert not c.verify_address('garbage')
+    wrapper_bytes = mc_util.wire.encode_printable_wrapper('public_address', mc_util.wire.encode_public_address(
+        mc_util.wire.PublicAddress(b'\x01' * 32, b'\x02' * 32)))
+    assert not c.verify_address(mc_util.b58.b58encode_str(mc_util.zlib.crc32(wrapper_bytes).to_bytes(4, 'little') + wrapper_bytes))
+    assert c.check_b58_type(B58_ADDRESS)['b58_type'] == 'PublicAddress'
+
+    payment_request = mc_util.payment_request_to_b58(B58_ADDRESS, 10**12, 'invoice')
+    assert c.check_b58_type(payment_request)['data'] == {
+        'public_address_b58': B58_ADDRESS,
+        'value': '1000000000000',
+        'memo': 'invoice',
+    }
+
+    with pytest.raises(WalletAPIError) as e:
+        c.check_b58_type('garbage')
+    assert e.value.response['error']['data']['server_error'] == 'B58Error'
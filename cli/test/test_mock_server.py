@@ -0,0 +1,326 @@
+from concurrent.futures import ThreadPoolExecutor
+import http.client
+import threading
+import time
+
+import pytest
+
+from mobilecoin import Client, WalletAPIError, mob2pmob, pmob2mob
+from mobilecoin.daemon import CachingClient
+
+
+def test_account_management(c):
+    account = c.create_account('A')
+    account_id = account['account_id']
+    assert c.get_account(account_id) == account
+    assert list(c.get_all_accounts().keys()) == [account_id]
+
+    account = c.update_account_name(account_id, 'B')
+    assert account['name'] == 'B'
+
+    address = c.assign_address_for_account(account_id, 'Address Name')
+    addresses = c.get_addresses_for_account(account_id)
+    assert len(addresses) == 3
+    assert addresses[address['public_address']]['metadata'] == 'Address Name'
+
+    c.remove_account(account_id)
+    assert c.get_all_accounts() == {}
+
+    with pytest.raises(WalletAPIError):
+        c.get_account(account_id)
+
+
+def test_transaction(server, c):
+    source_id = c.import_account('mnemonic words')['account_id']
+    dest = c.create_account()
+    dest_id = dest['account_id']
+
+    transaction_log = c.build_and_submit_transaction(source_id, '0.1', dest['main_address'])
+    assert transaction_log['status'] == 'tx_status_pending'
+    balance = c.get_balance_for_account(source_id)
+    assert pmob2mob(balance['pending_pmob']) == 10
+
+    server.wallet.advance_blocks()
+    balance = c.poll_balance(dest_id, int(transaction_log['submitted_block_index']) + 1, seconds=1)
+    assert pmob2mob(balance['unspent_pmob']) == pmob2mob(mob2pmob('0.1'))
+    balance = c.get_balance_for_account(source_id)
+    assert mob2pmob(10) - int(balance['unspent_pmob']) == mob2pmob('0.1004')
+
+    logs = c.get_all_transaction_logs_for_account(source_id)
+    assert [ t['status'] for t in logs.values() ] == ['tx_status_succeeded', 'tx_status_succeeded']
+
+
+def test_receipts(server, c):
+    source_id = c.import_account('mnemonic words')['account_id']
+    dest = c.create_account()
+
+    tx_proposal = c.build_transaction(source_id, '0.1', dest['main_address'])
+    receipt, = c.create_receiver_receipts(tx_proposal)
+    status = c.check_receiver_receipt_status(dest['main_address'], receipt)
+    assert status['receipt_transaction_status'] == 'TransactionPending'
+
+    c.submit_transaction(tx_proposal, source_id)
+    with pytest.raises(WalletAPIError):
+        c.submit_transaction(tx_proposal, source_id)
+    server.wallet.advance_blocks()
+
+    status = c.check_receiver_receipt_status(dest['main_address'], receipt)
+    assert status['receipt_transaction_status'] == 'TransactionSuccess'
+
+
+def test_gift_codes(server, c):
+    source_id = c.import_account('mnemonic words')['account_id']
+    dest_id = c.create_account()['account_id']
+
+    response = c.build_gift_code(source_id, '0.1', 'abc')
+    gift_code_b58 = response['gift_code_b58']
+    c.submit_gift_code(gift_code_b58, response['tx_proposal'], source_id)
+    assert c.check_gift_code_status(gift_code_b58)['gift_code_status'] == 'GiftCodeSubmittedPending'
+
+    server.wallet.advance_blocks()
+    response = c.check_gift_code_status(gift_code_b58)
+    assert response['gift_code_status'] == 'GiftCodeAvailable'
+    assert response['gift_code_memo'] == 'abc'
+
+    txo_id = c.claim_gift_code(dest_id, gift_code_b58)
+    server.wallet.advance_blocks()
+    assert c.get_txo(txo_id)['value_pmob'] == str(mob2pmob('0.0996'))
+    assert len(c.get_all_gift_codes()) == 1
+    assert c.remove_gift_code(gift_code_b58) is True
+
+
+def test_bulk_receipt_statuses(server, c):
+    source_id = c.import_account('mnemonic words')['account_id']
+    dest = c.create_account()
+
+    tx_proposal = c.build_transaction(source_id, '0.1', dest['main_address'])
+    receipt, = c.create_receiver_receipts(tx_proposal)
+    bad_receipt = dict(receipt, confirmation='00' * 32)
+    pairs = [
+        (dest['main_address'], receipt),
+        (dest['main_address'], bad_receipt),
+        (dest['main_address'], receipt),
+        ('unknown address', receipt),
+    ]
+
+    statuses = c.check_receiver_receipt_statuses(pairs, max_workers=4)
+    assert [ s.get('receipt_transaction_status') for s in statuses[:3] ] == ['TransactionPending'] * 3
+    assert statuses[3]['error']['data']['server_error'] == 'AddressNotFound'
+
+    # Pending receipts are not checked again until the ledger grows. The ledger height comes
+    # from the client's cached network status.
+    count = server.wallet.request_count
+    c.check_receiver_receipt_statuses(pairs[:3])
+    assert server.wallet.request_count == count
+
+    c.submit_transaction(tx_proposal, source_id)
+    server.wallet.advance_blocks()
+    c.network_status(max_age=0)
+    count = server.wallet.request_count
+    statuses = c.check_receiver_receipt_statuses(pairs[:3])
+    assert [ s['receipt_transaction_status'] for s in statuses ] == ['TransactionSuccess', 'InvalidConfirmation', 'TransactionSuccess']
+    assert server.wallet.request_count == count + 2
+
+    # Final statuses are remembered, even after the ledger grows.
+    server.wallet.advance_blocks()
+    c.network_status(max_age=0)
+    count = server.wallet.request_count
+    assert c.check_receiver_receipt_statuses(pairs[:3]) == statuses
+    assert server.wallet.request_count == count
+
+    # Statuses are forgotten when cleared, and the least recently used past the cache size.
+    c.clear_receipt_statuses()
+    c.receipt_status_cache_size = 1
+    count = server.wallet.request_count
+    assert c.check_receiver_receipt_statuses(pairs[:2]) == statuses[:2]
+    assert server.wallet.request_count == count + 2
+    assert len(c._receipt_statuses) == 1
+    count = server.wallet.request_count
+    assert c.check_receiver_receipt_statuses(pairs[:2]) == statuses[:2]
+    assert server.wallet.request_count == count + 1
+
+    # Worker connections are closed even when a check fails.
+    closed = []
+
+    class Worker(Client):
+        def close(self):
+            closed.append(self)
+            super().close()
+
+    c._worker_client = lambda: Worker(url='http://127.0.0.1:1/wallet')
+    c.clear_receipt_statuses()
+    with pytest.raises(ConnectionError):
+        c.check_receiver_receipt_statuses(pairs[:1])
+    assert len(closed) == 1
+
+
+def test_analyze_txos(server, c):
+    source_id = c.import_account('mnemonic words')['account_id']
+    dest = c.create_account()
+    dest_id = dest['account_id']
+    for amount in ['0.1', '0.0002', '2', '0.3']:
+        c.build_and_submit_transaction(source_id, amount, dest['main_address'])
+        server.wallet.advance_blocks()
+
+    stats = c.analyze_txos(dest_id, amount='2.1')
+    assert stats['count'] == 4
+    assert stats['statuses'] == {'unspent': {'count': 4, 'value_pmob': mob2pmob('2.4002')}}
+    assert [ (b['min_pmob'], b['count']) for b in stats['histogram'] ] == [(10**8, 1), (10**11, 2), (10**12, 1)]
+    assert stats['dust']['threshold_pmob'] == server.wallet.fee_pmob
+    assert stats['dust']['count'] == 1
+    assert stats['dust']['count_share'] == 0.25
+    assert stats['send'] == {
+        'amount_pmob': mob2pmob('2.1'),
+        'fee_pmob': server.wallet.fee_pmob,
+        'sufficient': True,
+        'inputs': 2,
+        'transactions': 1,
+        'total_fee_pmob': server.wallet.fee_pmob,
+    }
+
+    # Spending more inputs than one transaction can hold takes extra transactions to combine them.
+    send = c.analyze_txos(dest_id, amount='2.35', max_inputs=2)['send']
+    assert (send['inputs'], send['transactions']) == (3, 2)
+    assert c.analyze_txos(dest_id, amount='5')['send']['sufficient'] is False
+
+    stats = c.analyze_txos(source_id)
+    assert sorted(stats['statuses']) == ['secreted', 'spent', 'unspent']
+    assert stats['send'] is None
+
+
+def test_network_status(server, c):
+    status = c.network_status()
+    assert status.fee_pmob == server.wallet.fee_pmob
+    assert status.local_block_height == server.wallet.block_height
+    assert status.age >= 0
+
+    # Served from memory until it is max_age seconds old.
+    count = server.wallet.request_count
+    assert c.network_status() is status
+    assert server.wallet.request_count == count
+    assert c.network_status(max_age=0).fetched_at > status.fetched_at
+    assert server.wallet.request_count == count + 1
+
+    # Other clients can share a provider which refreshes in the background.
+    provider = c.network_status_provider
+    provider.poll_interval = 0.01
+    provider.start()
+    other = Client(url=server.url, network_status=provider)
+    try:
+        height = server.wallet.block_height
+        server.wallet.advance_blocks()
+        status = provider.wait_for_block(height + 1, timeout=5)
+        assert status.local_block_height == height + 1
+        assert other.network_status(max_age=60).local_block_height == height + 1
+        assert provider.wait_for_block(height + 100, timeout=0.05) is None
+    finally:
+        other.close()
+        c.close()
+
+
+def test_network_status_concurrent_callers(server, c):
+    provider = c.network_status_provider
+    start = threading.Barrier(8)
+
+    def get():
+        start.wait()
+        return provider.get(max_age=60)
+
+    count = server.wallet.request_count
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        statuses = list(executor.map(lambda _: get(), range(8)))
+
+    # Callers which found no status share one fetch, made on the provider's own connection.
+    assert all( status is statuses[0] for status in statuses )
+    assert provider.refresh_count == 1
+    assert server.wallet.request_count == count + 1
+    assert c._connection is None
+    c.close()
+    assert provider._client is None
+
+
+class _DroppedConnection:
+    """A kept-alive connection which the server drops after reading a request."""
+
+    def __init__(self, fail_on_send=False):
+        self.fail_on_send = fail_on_send
+
+    def request(self, *args):
+        if self.fail_on_send:
+            raise BrokenPipeError()
+
+    def getresponse(self):
+        raise http.client.RemoteDisconnected()
+
+    def close(self):
+        pass
+
+
+def test_retries_only_when_safe(server, c):
+    account_id = c.import_account('mnemonic words')['account_id']
+    dest = c.create_account()
+
+    # A read-only request is sent again on a new connection.
+    c._connection = _DroppedConnection()
+    assert c.get_account(account_id)['account_id'] == account_id
+
+    # So is any request which never reached the server.
+    c._connection = _DroppedConnection(fail_on_send=True)
+    c.build_and_submit_transaction(account_id, '0.1', dest['main_address'])
+
+    # Other requests may have been carried out, so they are not sent again.
+    count = server.wallet.request_count
+    c._connection = _DroppedConnection()
+    with pytest.raises(ConnectionError):
+        c.build_and_submit_transaction(account_id, '0.1', dest['main_address'])
+    assert server.wallet.request_count == count
+
+
+def test_reconnect_keeps_network_status_running(server, c):
+    provider = c.network_status_provider
+    provider.poll_interval = 0.01
+    provider.start()
+    try:
+        c._connection = _DroppedConnection()
+        c.get_all_accounts()
+        count = provider.refresh_count
+        time.sleep(0.2)
+        assert provider._thread is not None
+        assert provider.refresh_count > count
+    finally:
+        c.close()
+    assert provider._thread is None
+
+
+def test_caching_client(server):
+    c = CachingClient(url=server.url, account_index_ttl=0.05)
+    try:
+        account_id = c.create_account('A')['account_id']
+        block = c.get_account(account_id)['next_block_index']
+        server.wallet.advance_blocks()
+        assert c.get_account(account_id)['next_block_index'] == block
+        time.sleep(0.05)
+        assert int(c.get_account(account_id)['next_block_index']) == int(block) + 1
+
+        next_subaddress_index = c.get_account(account_id)['next_subaddress_index']
+        c.assign_address_for_account(account_id)
+        assert int(c.get_account(account_id)['next_subaddress_index']) == int(next_subaddress_index) + 1
+    finally:
+        c.close()
+
+
+def test_transaction_log_pages(server, c):
+    source_id = c.import_account('mnemonic words')['account_id']
+    dest = c.create_account()
+    for amount in ['0.1', '0.2', '0.3']:
+        c.build_and_submit_transaction(source_id, amount, dest['main_address'])
+        server.wallet.advance_blocks()
+
+    # Each send has an input, an output and a change row, so pages of 2 rows split them.
+    page = c.get_transaction_logs_for_account(source_id, 0, 2)
+    first, second = page.values()
+    assert len(second['input_txos']) == 1 and second['output_txos'] == [] and second['change_txos'] == []
+
+    logs = c.get_all_transaction_logs_for_account(source_id)
+    assert list(c.iter_transaction_logs_for_account(source_id, page_size=2)) == list(logs.values())
+    assert list(c.iter_transaction_logs_for_account(source_id, page_size=1)) == list(logs.values())
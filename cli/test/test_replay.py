@@ -0,0 +1,85 @@
+import pytest
+
+from mobilecoin import Client, WalletAPIError
+from mobilecoin.mock_server import DEFAULT_INITIAL_BALANCE_PMOB, MockServer
+from mobilecoin.replay import REDACTED, ReplayClient, TrafficRecorder, read_recording, replay
+
+
+def test_record_and_replay(tmp_path):
+    path = tmp_path / 'traffic.ndjson.gz'
+
+    with MockServer() as server:
+        c = Client(url=server.url, record=str(path))
+        account = c.import_account('mnemonic words')
+        c.get_balance_for_account(account['account_id'])
+        c.get_balance_for_account(account['account_id'])
+        c.recorder.close()
+
+        entries = list(read_recording(path))
+        assert [ e['request']['method'] for e in entries ] == [
+            'import_account',
+            'get_balance_for_account',
+            'get_balance_for_account',
+        ]
+
+        # The mnemonic is not written to the recording.
+        assert entries[0]['request']['params']['mnemonic'] == REDACTED
+        assert entries[0]['redacted']
+        assert 'mnemonic words' not in str(entries)
+
+        # Only the reads are replayed, and the import cannot be.
+        samples, recorded, skipped = replay(path, server.url, speed=0, workers=1)
+        assert [ s.ok for s in samples ] == [True, True]
+        assert len(recorded) == 2
+        assert skipped == 1
+        samples, recorded, skipped = replay(path, server.url, speed=0, workers=1, include_mutations=True)
+        assert len(samples) == 2
+        assert skipped == 1
+
+    # Responses are served back without a server.
+    c = ReplayClient(path)
+    assert c.import_account('mnemonic words') == account
+    assert c.get_balance_for_account(account['account_id'])['unspent_pmob'] == str(DEFAULT_INITIAL_BALANCE_PMOB)
+
+
+def test_recorder_follows_client(tmp_path):
+    from mobilecoin.cli import CommandLineInterface
+
+    path = tmp_path / 'traffic.ndjson'
+    with MockServer() as server:
+        cli = CommandLineInterface.__new__(CommandLineInterface)
+        cli.recorder = TrafficRecorder(str(path))
+        cli.client = cli._attach_recorder(Client(url=server.url))
+        cli.client.get_all_accounts()
+
+        # Commands such as shell replace the client, and keep recording.
+        cli.client = cli._attach_recorder(Client(url=server.url))
+        cli.client.get_network_status()
+        cli.recorder.close()
+
+    assert [ e['request']['method'] for e in read_recording(path) ] == [
+        'get_all_accounts',
+        'get_network_status',
+    ]
+
+
+def test_gift_codes_and_b58_codes_are_redacted(tmp_path):
+    path = tmp_path / 'traffic.ndjson'
+
+    with MockServer() as server:
+        c = Client(url=server.url, record=str(path))
+        account_id = c.import_account('mnemonic words')['account_id']
+        gift_code = c.build_gift_code(account_id, '0.1', 'memo')
+        c.submit_gift_code(gift_code['gift_code_b58'], gift_code['tx_proposal'], account_id)
+        c.check_gift_code_status(gift_code['gift_code_b58'])
+        c.get_all_gift_codes()
+        # The mock server does not implement check_b58_type, but the request is still recorded.
+        with pytest.raises(WalletAPIError):
+            c.check_b58_type(gift_code['gift_code_b58'])
+        c.recorder.close()
+
+    with open(path) as f:
+        text = f.read()
+    assert gift_code['gift_code_b58'] not in text
+    redacted = [ e['request']['method'] for e in read_recording(path) if e.get('redacted') ]
+    assert redacted == ['import_account', 'submit_gift_code', 'check_gift_code_status', 'check_b58_type']
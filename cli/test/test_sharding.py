@@ -0,0 +1,99 @@
+from contextlib import ExitStack
+
+import pytest
+
+from mobilecoin import Client, ShardedClient, mob2pmob
+from mobilecoin.mock_server import MockServer, MockWallet
+
+
+@pytest.fixture
+def servers():
+    with ExitStack() as stack:
+        yield [
+            stack.enter_context(MockServer(MockWallet(initial_balance_pmob=mob2pmob(1))))
+            for _ in range(3)
+        ]
+
+
+def _sharded(servers):
+    return ShardedClient({ 'shard{}'.format(i): Client(url=s.url) for i, s in enumerate(servers) })
+
+
+def test_routing_and_fan_out(servers):
+    c = _sharded(servers[:2])
+    try:
+        account_ids = [ c.import_account('words {}'.format(i))['account_id'] for i in range(6) ]
+        assert c.loads() == {'shard0': 3, 'shard1': 3}
+        assert sorted(c.get_all_accounts()) == sorted(account_ids)
+
+        for account_id in account_ids:
+            assert c.get_balance_for_account(account_id)['unspent_pmob'] == str(mob2pmob(1))
+            assert c.get_account(account_id)['account_id'] == account_id
+
+        c.build_gift_code(account_ids[0], '0.1')
+        gift_code = c.build_gift_code(account_ids[1], '0.1')
+        c.submit_gift_code(gift_code['gift_code_b58'], gift_code['tx_proposal'], account_ids[1])
+        assert [ g['gift_code_b58'] for g in c.get_all_gift_codes() ] == [gift_code['gift_code_b58']]
+
+        # A new client finds existing accounts on every shard.
+        other = _sharded(servers[:2])
+        assert other.shard_name(account_ids[0]) == c.shard_name(account_ids[0])
+
+        # Accounts added by another client are found too, even off their home shard.
+        account_id = other.import_account('words 6')['account_id']
+        name = other.shard_name(account_id)
+        if name == c.home_shard(account_id):
+            other.remove_account(account_id)
+            name = 'shard1' if name == 'shard0' else 'shard0'
+            other.clients[name].import_account('words 6')
+        assert c.shard_name(account_id) == name
+        c.remove_account(account_id)
+        other.close()
+
+        c.remove_account(account_ids[0])
+        assert sorted(c.loads().values()) == [2, 3]
+        assert c.get_network_status()['fee_pmob'] == str(servers[0].wallet.fee_pmob)
+        with pytest.raises(AttributeError):
+            c.get_txo
+    finally:
+        c.close()
+
+
+def test_rebalance(servers):
+    c = _sharded(servers[:2])
+    try:
+        account_ids = [ c.import_account('words {}'.format(i), name=str(i))['account_id'] for i in range(12) ]
+        c.rebalance()
+        assert all( c.shard_name(a) == c.home_shard(a) for a in account_ids )
+
+        c.add_shard('shard2', Client(url=servers[2].url))
+        moves = c.rebalance(dry_run=True)
+        assert moves
+        assert all( target == 'shard2' for _, _, target in moves )
+        assert c.rebalance() == moves
+        assert c.rebalance() == []
+
+        accounts = c.get_all_accounts()
+        assert sorted(accounts) == sorted(account_ids)
+        assert sorted( a['name'] for a in accounts.values() ) == sorted( str(i) for i in range(12) )
+        assert sorted(c.clients['shard2'].get_all_accounts()) == sorted( a for a, _, _ in moves )
+    finally:
+        c.close()
+
+
+def test_rebalance_after_adding_shard(servers):
+    c = _sharded(servers[:2])
+    try:
+        account_ids = [ c.import_account('words {}'.format(i))['account_id'] for i in range(12) ]
+        c.add_shard('shard2', Client(url=servers[2].url))
+
+        # Accounts placed by load move to their home shards, wherever those are.
+        placed = { a: c.shard_name(a) for a in account_ids }
+        moves = c.rebalance()
+        assert sorted(moves) == sorted( (a, placed[a], c.home_shard(a)) for a in account_ids if placed[a] != c.home_shard(a) )
+        assert all( c.shard_name(a) == c.home_shard(a) for a in account_ids )
+        assert c.rebalance() == []
+        assert sorted(c.get_all_accounts()) == sorted(account_ids)
+        assert sum(c.loads().values()) == 12
+    finally:
+        c.close()
@@ -0,0 +1,141 @@
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import mobilecoin.cli
+from mobilecoin import Client
+from mobilecoin.cli import CommandLineInterface, _is_command, _process_command
+from mobilecoin.mock_server import MockServer
+
+
+def _cli(tmp_path):
+    cli = CommandLineInterface.__new__(CommandLineInterface)
+    cli.verbose = False
+    cli.config = {
+        'executable': str(tmp_path / 'full-service'),
+        'logfile': str(tmp_path / 'wallet.log'),
+    }
+    return cli
+
+
+def test_process_command():
+    assert _process_command(os.getpid())
+    assert _is_command(['/usr/bin/full-service', '--ledger-db', 'x'], 'full-service')
+    assert not _is_command(['/usr/bin/python', 'full-service'], 'full-service')
+    assert not _is_command(None, 'full-service')
+
+
+def test_stop_ignores_stale_pid_file(tmp_path, capsys):
+    cli = _cli(tmp_path)
+    unrelated = subprocess.Popen(['sleep', '30'])
+    try:
+        cli._pid_file().write_text(str(unrelated.pid))
+        assert cli.stop(timeout=1)
+        assert unrelated.poll() is None
+        assert not cli._pid_file().exists()
+        assert 'stale pid file' in capsys.readouterr().out
+    finally:
+        unrelated.kill()
+        unrelated.wait()
+
+
+def test_stop_server(tmp_path):
+    cli = _cli(tmp_path)
+    os.symlink(shutil.which('sleep'), cli.config['executable'])
+    cli._server_process = subprocess.Popen([cli.config['executable'], '30'])
+    # Wait for the child to exec, so that it shows the server's command.
+    while not _is_command(_process_command(cli._server_process.pid), 'full-service'):
+        time.sleep(0.01)
+    cli._pid_file().write_text(str(cli._server_process.pid))
+    assert cli.stop(timeout=5)
+    assert cli._server_process.returncode is not None
+    assert not cli._pid_file().exists()
+
+
+def _write_executable(path, script):
+    path.write_text('#!/bin/sh\n' + script)
+    path.chmod(0o755)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def test_wait_for_server_backs_off(tmp_path, monkeypatch):
+    cli = _cli(tmp_path)
+    process = subprocess.Popen(['sleep', '30'])
+    delays = []
+    monkeypatch.setattr(mobilecoin.cli.time, 'sleep', delays.append)
+
+    class StartingClient(Client):
+        attempts = 0
+
+        def get_network_status(self, max_age=None):
+            StartingClient.attempts += 1
+            if StartingClient.attempts <= 5:
+                raise ConnectionError('Not listening yet.')
+            return super().get_network_status()
+
+    monkeypatch.setattr(mobilecoin.cli, 'Client', StartingClient)
+    try:
+        with MockServer() as server:
+            cli.config['api-url'] = server.url
+            network_status, seconds = cli._wait_for_server(process)
+        assert 'local_block_height' in network_status
+        assert seconds >= 0
+        assert StartingClient.attempts == 6
+        assert delays == [0.05, 0.1, 0.2, 0.25, 0.25]
+    finally:
+        process.kill()
+        process.wait()
+
+
+def test_wait_for_server_timeout(tmp_path):
+    cli = _cli(tmp_path)
+    cli.config['api-url'] = 'http://127.0.0.1:{}/wallet'.format(_free_port())
+    process = subprocess.Popen(['sleep', '30'])
+    try:
+        start = time.monotonic()
+        assert cli._wait_for_server(process, timeout=0.3) is None
+        assert 0.3 <= time.monotonic() - start < 5
+    finally:
+        process.kill()
+        process.wait()
+
+    # A server which has exited is not waited for.
+    start = time.monotonic()
+    assert cli._wait_for_server(process, timeout=30) is None
+    assert time.monotonic() - start < 1
+
+
+def test_start_wait(tmp_path, capsys):
+    cli = _cli(tmp_path)
+    port = _free_port()
+    cli.config.update({
+        'api-url': 'http://127.0.0.1:{}/wallet'.format(port),
+        'ledger-db': str(tmp_path / 'ledger-db'),
+        'wallet-db': str(tmp_path / 'wallet-db' / 'wallet.db'),
+    })
+    cli_dir = Path(mobilecoin.cli.__file__).parent.parent
+    _write_executable(Path(cli.config['executable']), 'PYTHONPATH={} exec {} -m mobilecoin.mock_server --port {}\n'.format(
+        cli_dir, sys.executable, port))
+    try:
+        assert cli.start(offline=True, bg=True, unencrypted=True, wait=True)
+        assert 'Ready after' in capsys.readouterr().out
+        assert cli._pid_file().read_text() == str(cli._server_process.pid)
+    finally:
+        cli._server_process.kill()
+        cli._server_process.wait()
+
+    # A server which exits at once is reported, without waiting for the timeout.
+    _write_executable(Path(cli.config['executable']), 'exit 1\n')
+    start = time.monotonic()
+    assert not cli.start(offline=True, bg=True, unencrypted=True, wait=True)
+    assert time.monotonic() - start < 5
+    assert 'did not start answering requests' in capsys.readouterr().out
@@ -0,0 +1,51 @@
+import math
+
+import pytest
+
+from mobilecoin.cli import _format_duration, _format_sync_progress
+from mobilecoin.client import SyncProgress
+
+
+def test_rate_and_eta():
+    progress = SyncProgress(time_constant=10)
+    progress.update('ledger', 1000, 2000, now=0)
+    assert progress.rate('ledger') is None
+    assert progress.eta('ledger') is None
+
+    progress.update('ledger', 1100, 2000, now=1)
+    assert progress.rate('ledger') == 100
+    assert progress.eta('ledger') == 9
+
+    # Samples are weighted by the time between them, and the target's growth slows the estimate.
+    progress.update('ledger', 1100, 2000, now=11)
+    assert progress.rate('ledger') == pytest.approx(100 / math.e)
+    progress.update('ledger', 1200, 2010, now=12)
+    weight = 1 - math.exp(-0.1)
+    rate = 100 / math.e + weight * (100 - 100 / math.e)
+    assert progress.rate('ledger') == pytest.approx(rate)
+    assert progress.eta('ledger') == pytest.approx(810 / (rate - weight * 10))
+
+    progress.update('ledger', 2010, 2010, now=13)
+    assert progress.remaining('ledger') == 0
+    assert progress.eta('ledger') == 0
+
+
+def test_stalled_sync_has_no_eta():
+    progress = SyncProgress()
+    progress.update('a', 10, 100, now=0)
+    progress.update('a', 10, 110, now=5)
+    assert progress.rate('a') == 0
+    assert progress.eta('a') is None
+
+
+def test_format_sync_progress():
+    progress = SyncProgress()
+    progress.update('ledger', 100, 1000, now=0)
+    progress.update('ledger', 250, 1000, now=1)
+    assert _format_sync_progress(progress, 'ledger', 'Ledger').split() == [
+        'Ledger', '250/1000', 'blocks,', '150.0', 'blocks/sec,', '5s', 'left']
+    progress.update('ledger', 1000, 1000, now=2)
+    assert _format_sync_progress(progress, 'ledger', 'Ledger').endswith('1000/1000 blocks, synced')
+
+    assert _format_duration(59.6) == '1m 00s'
+    assert _format_duration(3725) == '1h 02m'
@@ -1,19 +1,36 @@
+from collections import deque, namedtuple
 from decimal import Decimal
+from functools import lru_cache
+import importlib
+from itertools import chain, islice
 import zlib
-import base64
+import binascii
 
-import base58
+from . import b58
+from .amount import Pmob
+from . import ristretto
+from . import wire
 
-from . import external_pb2
-from . import printable_pb2
+# The protobuf modules take most of mc_util's import time, so they are imported by the functions
+# that need them, leaving amount conversions and checksums cheap for short-lived scripts.
+_LAZY_MODULES = ("external_pb2", "printable_pb2")
+
+
+def __getattr__(name):
+    if name in _LAZY_MODULES:
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
 
 
 PMOB = Decimal("1e12")
 
 
 def mob2pmob(x):
-    """Convert from MOB to picoMOB."""
-    return round(Decimal(x) * PMOB)
+    """Convert from MOB to picoMOB, raising ValueError if the result does not fit in 64 bits"""
+    result = Pmob.from_mob(x)
+    if not 0 <= result < 2**64:
+        raise ValueError("Amount {} MOB is out of range".format(x))
+    return result
 
 
 def pmob2mob(x):
@@ -27,67 +44,375 @@ def pmob2mob(x):
 
 def b64_public_address_to_b58_wrapper(b64_string):
     """Convert a b64-encoded PublicAddress protobuf to a b58-encoded PrintableWrapper protobuf"""
-    public_address_bytes = base64.b64decode(b64_string)
+    return _cached("b64_public_address_to_b58_wrapper", b64_string)
 
-    public_address = external_pb2.PublicAddress()
-    public_address.ParseFromString(public_address_bytes)
-
-    wrapper = printable_pb2.PrintableWrapper()
-    wrapper.public_address.CopyFrom(public_address)
 
-    wrapper_bytes = wrapper.SerializeToString()
+def _b64_public_address_to_b58_wrapper(b64_string):
+    wrapper_bytes = _public_address_to_wrapper_bytes(binascii.a2b_base64(b64_string))
+    checksum_bytes = zlib.crc32(wrapper_bytes).to_bytes(4, byteorder="little")
+    return b58.b58encode_str(checksum_bytes + wrapper_bytes)
 
-    checksum = zlib.crc32(wrapper_bytes)
-    checksum_bytes = checksum.to_bytes(4, byteorder="little")
 
-    checksum_and_wrapper_bytes = checksum_bytes + wrapper_bytes
+def _public_address_to_wrapper_bytes(public_address_bytes):
+    try:
+        public_address = wire.decode_public_address(public_address_bytes)
+        return wire.encode_printable_wrapper("public_address", wire.encode_public_address(public_address))
+    except ValueError:
+        pass
 
-    return base58.b58encode(checksum_and_wrapper_bytes).decode("utf-8")
+    from . import printable_pb2
+    wrapper = printable_pb2.PrintableWrapper()
+    wrapper.public_address.ParseFromString(public_address_bytes)
+    return wrapper.SerializeToString()
 
 
 def b58_wrapper_to_b64_public_address(b58_string):
     """Convert a b58-encoded PrintableWrapper address into a b64-encoded PublicAddress protobuf"""
-    checksum_and_wrapper_bytes = base58.b58decode(b58_string)
-    wrapper_bytes = checksum_and_wrapper_bytes[4:]
+    return _cached("b58_wrapper_to_b64_public_address", b58_string)
+
 
+def _b58_wrapper_to_b64_public_address(b58_string):
+    wrapper_bytes = memoryview(b58.b58decode(b58_string))[4:]
+    public_address_bytes = _wrapper_to_public_address_bytes(wrapper_bytes)
+    return binascii.b2a_base64(public_address_bytes, newline=False).decode("utf-8")
+
+
+def _wrapper_to_public_address_bytes(wrapper_bytes):
+    try:
+        field, payload = wire.decode_printable_wrapper(wrapper_bytes)
+        if field == "public_address":
+            return wire.encode_public_address(wire.decode_public_address(payload))
+    except ValueError:
+        pass
+
+    from . import printable_pb2
     wrapper = printable_pb2.PrintableWrapper()
     wrapper.ParseFromString(wrapper_bytes)
-    public_address = wrapper.public_address
+    return wrapper.public_address.SerializeToString()
+
+
+# A PublicAddress with only a view and a spend key serializes as these two field headers, each
+# followed by 32 bytes of key, and its PrintableWrapper adds one more header in front. The bulk
+# conversions handle this layout by slicing, and anything else one address at a time.
+_KEYS_ONLY_ADDRESS_LENGTH = 72
+_VIEW_KEY_HEADER = b"\x0a\x22\x0a\x20"
+_SPEND_KEY_HEADER = b"\x12\x22\x0a\x20"
+_KEYS_ONLY_WRAPPER_HEADER = b"\x0a\x48"
+
+
+def b64_public_addresses_to_b58_wrappers(b64_strings, chunksize=1000):
+    """Convert an iterable of b64-encoded PublicAddress protobufs to b58-encoded PrintableWrappers, in order"""
+    return _bulk_convert(_b64_public_addresses_to_b58_wrappers, b64_strings, None, chunksize)
+
+
+def b58_wrappers_to_b64_public_addresses(b58_strings, chunksize=1000):
+    """Convert an iterable of b58-encoded PrintableWrapper addresses to b64-encoded PublicAddress protobufs, in order"""
+    return _bulk_convert(_b58_wrappers_to_b64_public_addresses, b58_strings, None, chunksize)
+
+
+def _b64_public_addresses_to_b58_wrappers(b64_strings):
+    a2b_base64 = binascii.a2b_base64
+    crc32 = zlib.crc32
+    b58encode_str = b58.b58encode_str
+    results = []
+    for b64_string in b64_strings:
+        public_address_bytes = a2b_base64(b64_string)
+        if _is_keys_only_address(public_address_bytes):
+            wrapper_bytes = _KEYS_ONLY_WRAPPER_HEADER + public_address_bytes
+        else:
+            wrapper_bytes = _public_address_to_wrapper_bytes(public_address_bytes)
+        results.append(b58encode_str(crc32(wrapper_bytes).to_bytes(4, "little") + wrapper_bytes))
+    return results
+
+
+def _b58_wrappers_to_b64_public_addresses(b58_strings):
+    b2a_base64 = binascii.b2a_base64
+    b58decode = b58.b58decode
+    results = []
+    for b58_string in b58_strings:
+        wrapper_bytes = memoryview(b58decode(b58_string))[4:]
+        public_address_bytes = wrapper_bytes[2:]
+        if wrapper_bytes[:2] != _KEYS_ONLY_WRAPPER_HEADER or not _is_keys_only_address(public_address_bytes):
+            public_address_bytes = _wrapper_to_public_address_bytes(wrapper_bytes)
+        results.append(b2a_base64(public_address_bytes, newline=False).decode("utf-8"))
+    return results
+
+
+def _is_keys_only_address(public_address_bytes):
+    return (
+        len(public_address_bytes) == _KEYS_ONLY_ADDRESS_LENGTH
+        and public_address_bytes[:4] == _VIEW_KEY_HEADER
+        and public_address_bytes[36:40] == _SPEND_KEY_HEADER
+    )
+
 
-    public_address_bytes = public_address.SerializeToString()
-    return base64.b64encode(public_address_bytes).decode("utf-8")
+def _chunks(iterable, chunksize):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _bulk_convert(convert_chunk, iterable, processes, chunksize):
+    """
+    Apply a chunk conversion function across an iterable, yielding results in input order.
+
+    Inputs larger than one chunk are spread across a pool of `processes` worker processes, if
+    given. Chunks are consumed lazily, so arbitrarily long inputs stream in bounded memory.
+    """
+    import multiprocessing
+    chunks = _chunks(iterable, chunksize)
+    first = next(chunks, None)
+    if first is None:
+        return
+    if processes is None or processes <= 1 or len(first) < chunksize:
+        yield from convert_chunk(first)
+        for chunk in chunks:
+            yield from convert_chunk(chunk)
+        return
+
+    # Keep a bounded number of chunks in flight, so that the input is not read ahead of the output.
+    with multiprocessing.Pool(processes) as pool:
+        pending = deque()
+        for chunk in chain([first], chunks):
+            pending.append(pool.apply_async(convert_chunk, (chunk,)))
+            if len(pending) > 2 * processes:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
 
 
 def b58_string_passes_checksum(b58_string):
     """Validate the checksum of a b58-encoded string"""
-    checksum_and_wrapper_bytes = base58.b58decode(b58_string)
-    wrapper_bytes = checksum_and_wrapper_bytes[4:]
-    checksum_bytes = checksum_and_wrapper_bytes[0:4]
-    new_checksum = zlib.crc32(wrapper_bytes)
-    new_checksum_bytes = new_checksum.to_bytes(4, byteorder="little")
+    return _cached("b58_string_passes_checksum", b58_string)
 
-    return checksum_bytes == new_checksum_bytes
+
+def _b58_string_passes_checksum(b58_string):
+    try:
+        checksum_and_wrapper_bytes = b58.b58decode(b58_string)
+    except ValueError:
+        return False
+    return _passes_checksum(memoryview(checksum_and_wrapper_bytes))
 
 
 def b58_string_is_public_address(b58_string):
     """Check if a b58-encoded string contains a PrintableWrapper protobuf with a PublicAddress"""
-    if not b58_string_passes_checksum(b58_string):
+    try:
+        return parse_b58_wrapper(b58_string).b58_type == "PublicAddress"
+    except ValueError:
         return False
 
-    checksum_and_wrapper_bytes = base58.b58decode(b58_string)
-    wrapper_bytes = checksum_and_wrapper_bytes[4:]
+
+ParsedWrapper = namedtuple("ParsedWrapper", ["b58_type", "message", "wrapper"])
+ParsedWrapper.__doc__ = """
+A decoded PrintableWrapper. b58_type is "PublicAddress", "PaymentRequest" or "TransferPayload",
+as in full-service's check_b58_type, and message is the corresponding protobuf message.
+"""
+
+_B58_TYPES = {
+    "public_address": "PublicAddress",
+    "payment_request": "PaymentRequest",
+    "transfer_payload": "TransferPayload",
+}
+
+
+def parse_b58_wrapper(b58_string):
+    """
+    Decode a b58-encoded PrintableWrapper, checking its checksum, and return a ParsedWrapper.
+
+    Raise ValueError if the string is not valid base58, fails the checksum, or does not contain
+    a PrintableWrapper.
+    """
+    from google.protobuf.message import DecodeError
+    from . import printable_pb2
+    data = memoryview(b58.b58decode(b58_string))
+    if not _passes_checksum(data):
+        raise ValueError("Checksum mismatch")
+
     wrapper = printable_pb2.PrintableWrapper()
+    try:
+        wrapper.ParseFromString(data[4:])
+    except DecodeError as e:
+        raise ValueError("Invalid PrintableWrapper: {}".format(e)) from None
+    field = wrapper.WhichOneof("wrapper")
+    if field is None:
+        raise ValueError("Empty PrintableWrapper")
+    return ParsedWrapper(_B58_TYPES[field], getattr(wrapper, field), wrapper)
+
+
+def parse_b58_wrappers(b58_strings):
+    """Parse each of an iterable of b58 strings, yielding a ParsedWrapper, or None if it is invalid"""
+    for b58_string in b58_strings:
+        try:
+            yield parse_b58_wrapper(b58_string)
+        except ValueError:
+            yield None
+
+
+def _passes_checksum(checksum_and_wrapper):
+    return (
+        len(checksum_and_wrapper) >= 4
+        and zlib.crc32(checksum_and_wrapper[4:]).to_bytes(4, byteorder="little") == checksum_and_wrapper[:4]
+    )
+
 
+def payment_request_to_b58(b58_public_address, amount_pmob, memo=""):
+    """
+    Encode a b58 payment request for a b58 public address, an amount in picoMOB and a memo,
+    as full-service's create_payment_request would, without contacting the server.
+    """
+    return _payment_request_to_b58(_b58_public_address_bytes(b58_public_address), amount_pmob, memo)
+
+
+def payment_requests_to_b58(requests):
+    """
+    Encode b58 payment requests for an iterable of (b58_public_address, amount_pmob, memo) tuples,
+    yielding them in order. Each distinct address is only decoded once.
+    """
+    public_addresses = {}
+    for b58_public_address, amount_pmob, memo in requests:
+        public_address_bytes = public_addresses.get(b58_public_address)
+        if public_address_bytes is None:
+            public_address_bytes = _b58_public_address_bytes(b58_public_address)
+            public_addresses[b58_public_address] = public_address_bytes
+        yield _payment_request_to_b58(public_address_bytes, amount_pmob, memo)
+
+
+def b58_to_payment_request(b58_string):
+    """
+    Decode a b58 payment request into a dict with its public_address_b58, value in picoMOB and
+    memo, like the data returned by full-service's check_b58_type.
+
+    Raise ValueError if the string is not a valid payment request.
+    """
+    result = check_b58_type(b58_string)
+    if result["b58_type"] != "PaymentRequest":
+        raise ValueError("Not a payment request")
+    return result["data"]
+
+
+def check_b58_type(b58_string):
+    """
+    Identify the kind of PrintableWrapper in a b58 string and extract its fields, returning a
+    dict with b58_type and data, like full-service's check_b58_type, without contacting a server.
+
+    Raise ValueError if the string is not a valid b58 PrintableWrapper.
+    """
+    wrapper_bytes = _checked_wrapper_bytes(b58_string)
+    try:
+        field, payload = wire.decode_printable_wrapper(wrapper_bytes)
+        if field == "public_address":
+            wire.decode_public_address(payload)
+        elif field == "transfer_payload":
+            wire.decode_transfer_payload(payload)
+        else:
+            public_address_bytes, value, memo = wire.decode_payment_request(payload)
+            public_address = wire.decode_public_address(public_address_bytes or b"")
+            keys = (public_address.view_public_key, public_address.spend_public_key)
+            public_address_bytes = wire.encode_public_address(public_address)
+    except ValueError:
+        # Fall back to protobuf for anything the wire codec does not accept.
+        parsed = parse_b58_wrapper(b58_string)
+        field = parsed.wrapper.WhichOneof("wrapper")
+        if field == "payment_request":
+            public_address = parsed.message.public_address
+            keys = (public_address.view_public_key.data, public_address.spend_public_key.data)
+            public_address_bytes = public_address.SerializeToString()
+            value, memo = parsed.message.value, parsed.message.memo
+
+    data = {}
+    if field == "public_address":
+        data["public_address_b58"] = b58_string
+    elif field == "payment_request":
+        if not _valid_keys(*keys):
+            raise ValueError("Payment request has an invalid public address")
+        data["public_address_b58"] = _wrap_and_encode(wire.encode_printable_wrapper("public_address", public_address_bytes))
+        data["value"] = str(value)
+        data["memo"] = memo
+    return {"b58_type": _B58_TYPES[field], "data": data}
+
+
+def check_b58_types(b58_strings):
+    """Classify each of an iterable of b58 strings, yielding check_b58_type's result, or None if it is invalid"""
+    for b58_string in b58_strings:
+        try:
+            yield check_b58_type(b58_string)
+        except ValueError:
+            yield None
+
+
+def verify_address(b58_string):
+    """
+    Check that a b58 string is a public address whose view and spend keys are valid Ristretto
+    points, like full-service's verify_address.
+    """
     try:
-        wrapper.ParseFromString(wrapper_bytes)
-        return wrapper.PublicAddress is not None
-    except Exception:
+        wrapper_bytes = _checked_wrapper_bytes(b58_string)
+        try:
+            field, payload = wire.decode_printable_wrapper(wrapper_bytes)
+            if field != "public_address":
+                return False
+            public_address = wire.decode_public_address(payload)
+            return _valid_keys(public_address.view_public_key, public_address.spend_public_key)
+        except ValueError:
+            parsed = parse_b58_wrapper(b58_string)
+    except ValueError:
         return False
+    return parsed.b58_type == "PublicAddress" and _valid_keys(
+        parsed.message.view_public_key.data, parsed.message.spend_public_key.data
+    )
+
+
+def _valid_keys(view_public_key, spend_public_key):
+    return ristretto.is_valid_point(view_public_key) and ristretto.is_valid_point(spend_public_key)
+
+
+def _payment_request_to_b58(public_address_bytes, amount_pmob, memo):
+    value = int(amount_pmob)
+    if not 0 <= value < 1 << 64:
+        raise ValueError("Amount {} is out of range".format(amount_pmob))
+    payment_request = wire.encode_payment_request(public_address_bytes, value, memo)
+    return _wrap_and_encode(wire.encode_printable_wrapper("payment_request", payment_request))
+
+
+def _b58_public_address_bytes(b58_public_address):
+    """Return the serialized PublicAddress in a b58 address, checking that it is one"""
+    wrapper_bytes = _checked_wrapper_bytes(b58_public_address)
+    try:
+        field, _ = wire.decode_printable_wrapper(wrapper_bytes)
+    except ValueError:
+        field = parse_b58_wrapper(b58_public_address).wrapper.WhichOneof("wrapper")
+    if field != "public_address":
+        raise ValueError("Not a public address")
+    if not verify_address(b58_public_address):
+        raise ValueError("Public address has invalid keys")
+    return _wrapper_to_public_address_bytes(wrapper_bytes)
+
+
+def _checked_wrapper_bytes(b58_string):
+    data = memoryview(b58.b58decode(b58_string))
+    if not _passes_checksum(data):
+        raise ValueError("Checksum mismatch")
+    return data[4:]
+
+
+def _wrap_and_encode(wrapper_bytes):
+    checksum_bytes = zlib.crc32(wrapper_bytes).to_bytes(4, byteorder="little")
+    return b58.b58encode_str(checksum_bytes + wrapper_bytes)
 
 
 def b64_receipt_to_full_service_receipt(b64_string):
     """Convert a b64-encoded protobuf Receipt into a full-service receipt object"""
-    receipt_bytes = base64.b64decode(b64_string)
+    # Cached receipts are shared, so return a copy which the caller is free to modify.
+    full_service_receipt = _cached("b64_receipt_to_full_service_receipt", b64_string)
+    return dict(full_service_receipt, amount=dict(full_service_receipt["amount"]))
+
+
+def _b64_receipt_to_full_service_receipt(b64_string):
+    from . import external_pb2
+    receipt_bytes = binascii.a2b_base64(b64_string)
     receipt = external_pb2.Receipt.FromString(receipt_bytes)
 
     full_service_receipt = {
@@ -108,18 +433,23 @@ def b64_receipt_to_full_service_receipt(b64_string):
 def full_service_receipt_to_b64_receipt(full_service_receipt):
     """Convert a full-service receipt object to a b64-encoded protobuf Receipt"""
     assert full_service_receipt["object"] == "receiver_receipt"
-
-    public_key = external_pb2.CompressedRistretto.FromString(
-        bytes.fromhex(full_service_receipt["public_key"])
-    )
-    confirmation = external_pb2.TxOutConfirmationNumber.FromString(
-        bytes.fromhex(full_service_receipt["confirmation"])
-    )
-    tombstone_block = int(full_service_receipt["tombstone_block"])
-    amount_commitment = external_pb2.CompressedRistretto(
-        data=bytes.fromhex(full_service_receipt["amount"]["commitment"])
+    return _cached(
+        "full_service_receipt_to_b64_receipt",
+        full_service_receipt["public_key"],
+        full_service_receipt["confirmation"],
+        full_service_receipt["tombstone_block"],
+        full_service_receipt["amount"]["commitment"],
+        full_service_receipt["amount"]["masked_value"],
     )
-    amount_masked_value = int(full_service_receipt["amount"]["masked_value"])
+
+
+def _full_service_receipt_to_b64_receipt(public_key, confirmation, tombstone_block, commitment, masked_value):
+    from . import external_pb2
+    public_key = external_pb2.CompressedRistretto.FromString(bytes.fromhex(public_key))
+    confirmation = external_pb2.TxOutConfirmationNumber.FromString(bytes.fromhex(confirmation))
+    tombstone_block = int(tombstone_block)
+    amount_commitment = external_pb2.CompressedRistretto(data=bytes.fromhex(commitment))
+    amount_masked_value = int(masked_value)
     amount = external_pb2.Amount(
         commitment=amount_commitment, masked_value=amount_masked_value
     )
@@ -129,4 +459,107 @@ def full_service_receipt_to_b64_receipt(full_service_receipt):
         tombstone_block=tombstone_block,
         amount=amount,
     )
-    return base64.b64encode(r.SerializeToString()).decode("utf-8")
+    return binascii.b2a_base64(r.SerializeToString(), newline=False).decode("utf-8")
+
+
+def b64_receipts_to_full_service_receipts(b64_strings, processes=None, chunksize=1000):
+    """Convert an iterable of b64-encoded protobuf Receipts into full-service receipt objects, in order"""
+    return _bulk_convert(_b64_receipts_to_full_service_receipts, b64_strings, processes, chunksize)
+
+
+def full_service_receipts_to_b64_receipts(full_service_receipts, processes=None, chunksize=1000):
+    """Convert an iterable of full-service receipt objects to b64-encoded protobuf Receipts, in order"""
+    return _bulk_convert(_full_service_receipts_to_b64_receipts, full_service_receipts, processes, chunksize)
+
+
+def _b64_receipts_to_full_service_receipts(b64_strings):
+    from . import external_pb2
+    # One message is reused for the whole chunk.
+    receipt = external_pb2.Receipt()
+    results = []
+    for b64_string in b64_strings:
+        receipt.ParseFromString(binascii.a2b_base64(b64_string))
+        results.append({
+            "object": "receiver_receipt",
+            "public_key": receipt.public_key.SerializeToString().hex(),
+            "confirmation": receipt.confirmation.SerializeToString().hex(),
+            "tombstone_block": str(receipt.tombstone_block),
+            "amount": {
+                "object": "amount",
+                "commitment": receipt.amount.commitment.data.hex(),
+                "masked_value": str(receipt.amount.masked_value),
+            },
+        })
+    return results
+
+
+def _full_service_receipts_to_b64_receipts(full_service_receipts):
+    from . import external_pb2
+    receipt = external_pb2.Receipt()
+    public_key = receipt.public_key
+    confirmation = receipt.confirmation
+    amount = receipt.amount
+    commitment = amount.commitment
+    results = []
+    for full_service_receipt in full_service_receipts:
+        assert full_service_receipt["object"] == "receiver_receipt"
+        public_key.ParseFromString(bytes.fromhex(full_service_receipt["public_key"]))
+        confirmation.ParseFromString(bytes.fromhex(full_service_receipt["confirmation"]))
+        receipt.tombstone_block = int(full_service_receipt["tombstone_block"])
+        commitment.data = bytes.fromhex(full_service_receipt["amount"]["commitment"])
+        amount.masked_value = int(full_service_receipt["amount"]["masked_value"])
+        # Submessages are always present in a full-service receipt, even when empty.
+        public_key.SetInParent()
+        confirmation.SetInParent()
+        commitment.SetInParent()
+        results.append(binascii.b2a_base64(receipt.SerializeToString(), newline=False).decode("utf-8"))
+    return results
+
+
+DEFAULT_CACHE_SIZE = 4096
+
+_CACHED_FUNCTIONS = {
+    "b64_public_address_to_b58_wrapper": _b64_public_address_to_b58_wrapper,
+    "b58_wrapper_to_b64_public_address": _b58_wrapper_to_b64_public_address,
+    "b58_string_passes_checksum": _b58_string_passes_checksum,
+    "b64_receipt_to_full_service_receipt": _b64_receipt_to_full_service_receipt,
+    "full_service_receipt_to_b64_receipt": _full_service_receipt_to_b64_receipt,
+}
+
+_caches = {}
+
+
+def configure_cache(maxsize=DEFAULT_CACHE_SIZE, enabled=True):
+    """
+    Set the number of results remembered by each of the address, checksum and receipt
+    conversions, or disable caching with enabled=False. This clears the caches.
+
+    The caches are thread-safe LRU caches, so repeated conversions of the same hot addresses or
+    receipts are answered with a dictionary lookup.
+    """
+    for name, function in _CACHED_FUNCTIONS.items():
+        _caches[name] = lru_cache(maxsize=maxsize if enabled else 0)(function)
+
+
+def _cached(name, *args):
+    """Call a cached conversion, with bytes-like arguments as bytes, bypassing the cache for any other unhashable ones"""
+    args = tuple( bytes(arg) if isinstance(arg, (bytearray, memoryview)) else arg for arg in args )
+    try:
+        hash(args)
+    except TypeError:
+        return _CACHED_FUNCTIONS[name](*args)
+    return _caches[name](*args)
+
+
+def cache_info():
+    """Return a dict of each cached conversion's hits, misses, maxsize and current size"""
+    return { name: cache.cache_info()._asdict() for name, cache in _caches.items() }
+
+
+def clear_cache():
+    """Forget every cached conversion result, and reset the statistics"""
+    for cache in _caches.values():
+        cache.cache_clear()
+
+
+configure_cache()
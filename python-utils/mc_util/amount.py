@@ -0,0 +1,109 @@
+"""
+An integer amount of picoMOB, with exact parsing and formatting of MOB strings.
+"""
+from decimal import Decimal
+
+PMOB_PER_MOB = 10**12
+
+_FRACTION_DIGITS = 12
+
+
+class Pmob(int):
+    """
+    An amount in picoMOB.
+
+    Pmob is an int, so it compares, hashes, serializes and converts with str() exactly like the
+    plain number of picoMOB, and adding or subtracting integers gives another Pmob. Pmob("123")
+    parses a picoMOB string, and Pmob.from_mob("1.5") parses a MOB amount.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_mob(cls, mob):
+        """
+        Convert an amount in MOB to picoMOB, rounding half to even like round(Decimal(mob) * 10**12).
+
+        Plain decimal strings are parsed directly; anything else, such as exponent notation or a
+        float, goes through Decimal.
+        """
+        if isinstance(mob, cls):
+            raise TypeError("{!r} is already in picoMOB.".format(mob))
+        if isinstance(mob, int):
+            return cls(mob * PMOB_PER_MOB)
+        if isinstance(mob, str):
+            result = _parse_mob(mob)
+            if result is not None:
+                return cls(result)
+        return cls(round(Decimal(mob) * PMOB_PER_MOB))
+
+    @classmethod
+    def total(cls, values):
+        """
+        Total an iterable of picoMOB amounts, given as ints or strings.
+
+        This adds plain ints, which is much faster than summing Pmob values one at a time.
+        """
+        return cls(sum(map(int, values)))
+
+    def to_mob(self):
+        """This amount in MOB, as a Decimal."""
+        return Decimal(int(self)) / PMOB_PER_MOB
+
+    def format(self):
+        """Format in MOB, without trailing zeros, such as "1.5" or "0.0004"."""
+        whole, fraction = divmod(abs(self), PMOB_PER_MOB)
+        result = str(whole)
+        if fraction:
+            result += "." + "{:012d}".format(fraction).rstrip("0")
+        if self < 0:
+            result = "-" + result
+        return result
+
+    def __repr__(self):
+        return "Pmob({})".format(int(self))
+
+    # int's str() falls back to repr(), so restore the plain number.
+    __str__ = int.__repr__
+
+    def __add__(self, other):
+        if isinstance(other, int):
+            return Pmob(int.__add__(self, other))
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, int):
+            return Pmob(int.__sub__(self, other))
+        return NotImplemented
+
+    def __rsub__(self, other):
+        if isinstance(other, int):
+            return Pmob(int.__rsub__(self, other))
+        return NotImplemented
+
+    def __neg__(self):
+        return Pmob(int.__neg__(self))
+
+    def __abs__(self):
+        return Pmob(int.__abs__(self))
+
+
+def _parse_mob(s):
+    """Parse a plain decimal string of MOB to an int of picoMOB, or return None to use Decimal."""
+    s = s.strip()
+    negative = s.startswith("-")
+    if negative or s.startswith("+"):
+        s = s[1:]
+    whole, point, fraction = s.partition(".")
+    if not (whole or fraction) or not (whole + fraction).isascii() or not (whole + fraction).isdigit():
+        return None
+
+    result = int(whole or "0") * PMOB_PER_MOB
+    if fraction:
+        result += int(fraction[:_FRACTION_DIGITS].ljust(_FRACTION_DIGITS, "0"))
+        rest = fraction[_FRACTION_DIGITS:].rstrip("0")
+        # Round half to even.
+        if rest and (rest[0] > "5" or (rest[0] == "5" and (len(rest) > 1 or result % 2 == 1))):
+            result += 1
+    return -result if negative else result
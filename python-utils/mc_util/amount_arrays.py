@@ -0,0 +1,125 @@
+"""
+Bulk conversion and exact aggregation of picoMOB amounts.
+
+With NumPy installed, amounts are held in uint64 arrays and totalled and grouped
+with vectorized operations. Without it, the same functions work on lists of ints. Totals are
+always exact Python ints: uint64 sums are split into 32-bit halves, so they cannot overflow.
+"""
+from collections import defaultdict
+
+from .amount import PMOB_PER_MOB, Pmob
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+MAX_PMOB = 2**64 - 1
+
+_LOW_MASK = 2**32 - 1
+
+
+def pmob_array(values):
+    """
+    Convert an iterable of picoMOB amounts, as strings or ints, to a uint64 array, or a list of
+    ints without NumPy. Raise ValueError if any value is not an integer in [0, 2**64).
+    """
+    if numpy is not None and isinstance(values, numpy.ndarray) and values.dtype.kind in "iu":
+        if values.dtype.kind == "i" and values.size and values.min() < 0:
+            raise ValueError("Amounts must be between 0 and {}.".format(MAX_PMOB))
+        return values.astype(numpy.uint64)
+
+    # Python's int() parses strings several times faster than NumPy's string casts.
+    result = [ int(v) for v in values ]
+    if result and (min(result) < 0 or max(result) > MAX_PMOB):
+        raise ValueError("Amounts must be between 0 and {}.".format(MAX_PMOB))
+    if numpy is None:
+        return result
+    return numpy.array(result, dtype=numpy.uint64)
+
+
+def mob_array(values):
+    """
+    Convert an iterable of MOB amount strings to picoMOB, as a uint64 array or a list of ints.
+
+    Plain decimal strings with up to 12 decimal places are converted with vectorized string
+    operations, and any others one at a time with Pmob.from_mob. Raise ValueError if any value
+    is not a number, or is out of range.
+    """
+    values = list(values)
+    if numpy is None:
+        return pmob_array( _from_mob(v) for v in values )
+
+    strings = numpy.char.strip(numpy.asarray(values, dtype=str))
+    whole, _, fraction = (numpy.char.partition(strings, ".")[..., i] for i in range(3))
+    simple = (
+        numpy.char.isdigit(numpy.char.add(whole, fraction))
+        & (numpy.char.str_len(fraction) <= 12)
+        & (numpy.char.str_len(whole) <= 7)
+    )
+    whole = numpy.where(simple & (whole != ""), whole, "0")
+    fraction = numpy.char.ljust(numpy.where(simple, fraction, ""), 12, "0")
+    result = whole.astype(numpy.uint64) * numpy.uint64(PMOB_PER_MOB) + fraction.astype(numpy.uint64)
+
+    for i in numpy.flatnonzero(~simple):
+        value = _from_mob(values[i])
+        if not 0 <= value <= MAX_PMOB:
+            raise ValueError("Amounts must be between 0 and {}.".format(MAX_PMOB))
+        result[i] = value
+    return result
+
+
+def _from_mob(value):
+    try:
+        return Pmob.from_mob(value)
+    except ArithmeticError as e:
+        # decimal.InvalidOperation for strings which are not numbers, and OverflowError for infinity.
+        raise ValueError("Invalid MOB amount {!r}: {}".format(value, e)) from None
+
+
+def sum_pmob(amounts):
+    """The exact total of a uint64 array or list of picoMOB amounts, as a Pmob."""
+    if numpy is None or not isinstance(amounts, numpy.ndarray):
+        return Pmob.total(amounts)
+    low = int((amounts & numpy.uint64(_LOW_MASK)).sum(dtype=numpy.uint64))
+    high = int((amounts >> numpy.uint64(32)).sum(dtype=numpy.uint64))
+    return Pmob((high << 32) + low)
+
+
+def group_sum_pmob(keys, amounts):
+    """
+    Total picoMOB amounts by key, returning a dict of key to exact Pmob total. keys and amounts
+    are sequences of the same length.
+    """
+    if numpy is not None and isinstance(amounts, numpy.ndarray):
+        keys = numpy.asarray(keys)
+    if numpy is None or not isinstance(amounts, numpy.ndarray) or keys.dtype.kind == "O":
+        # Mixed keys, such as None alongside strings, cannot be sorted, so total them in a dict.
+        totals = defaultdict(int)
+        for key, amount in zip(keys, amounts):
+            totals[key] += int(amount)
+        return { key: Pmob(total) for key, total in totals.items() }
+
+    unique_keys, inverse = numpy.unique(keys, return_inverse=True)
+    if unique_keys.size == 0:
+        return {}
+    order = numpy.argsort(inverse, kind="stable")
+    starts = numpy.flatnonzero(numpy.r_[True, numpy.diff(inverse[order]) != 0])
+    sorted_amounts = amounts[order]
+    low = numpy.add.reduceat(sorted_amounts & numpy.uint64(_LOW_MASK), starts, dtype=numpy.uint64)
+    high = numpy.add.reduceat(sorted_amounts >> numpy.uint64(32), starts, dtype=numpy.uint64)
+    return {
+        key.item() if hasattr(key, "item") else key: Pmob((int(h) << 32) + int(l))
+        for key, h, l in zip(unique_keys, high, low)
+    }
+
+
+def sum_txos_by(txos, field):
+    """
+    Total the value_pmob of full-service txo objects, grouped by one of their fields, such as
+    "received_account_id", "subaddress_index" or "received_block_index".
+    """
+    txos = list(txos)
+    keys = [ txo[field] for txo in txos ]
+    return group_sum_pmob(keys, pmob_array( txo["value_pmob"] for txo in txos ))
@@ -0,0 +1,71 @@
+"""
+Base58 encoding with the Bitcoin alphabet, as used for MobileCoin b58 strings.
+
+This is byte-for-byte compatible with the `base58` package's b58encode and b58decode, but
+converts between bytes and integers several digits at a time: each big-integer division or
+multiplication handles five base58 digits, and those digits are produced or consumed through
+precomputed tables, rather than one big-integer operation per character.
+"""
+
+ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+
+# Five base58 digits fit in a single 30-bit CPython integer digit, which keeps each big-integer
+# step on its fast path.
+_CHUNK_DIGITS = 5
+_CHUNK = 58 ** _CHUNK_DIGITS
+_PAIR = 58 ** 2
+_QUAD = 58 ** 4
+
+_PAIRS = [ a + b for a in ALPHABET for b in ALPHABET ]
+
+# Maps each ASCII character to its digit value, or 255 if it is not in the alphabet.
+_DIGITS = bytes( ALPHABET.index(chr(i)) if chr(i) in ALPHABET else 255 for i in range(256) )
+
+
+def b58encode(v):
+    """Encode bytes using Base58, returning ASCII bytes like base58.b58encode"""
+    return b58encode_str(v).encode('ascii')
+
+
+def b58encode_str(v):
+    """Encode bytes using Base58, returning a str"""
+    if isinstance(v, str):
+        v = v.encode('ascii')
+    v = bytes(v)
+    stripped = v.lstrip(b'\0')
+    zeros = len(v) - len(stripped)
+
+    n = int.from_bytes(stripped, byteorder='big')
+    chunks = []
+    while n:
+        n, r = divmod(n, _CHUNK)
+        a, r = divmod(r, _QUAD)
+        b, c = divmod(r, _PAIR)
+        chunks.append(_PAIRS[c])
+        chunks.append(_PAIRS[b])
+        chunks.append(ALPHABET[a])
+    chunks.reverse()
+
+    # The most significant chunk is padded with zero digits, which must not be emitted.
+    return '1' * zeros + ''.join(chunks).lstrip('1')
+
+
+def b58decode(v):
+    """Decode a Base58 string or ASCII bytes, like base58.b58decode"""
+    if isinstance(v, str):
+        v = v.encode('ascii')
+    v = bytes(v).rstrip()
+    stripped = v.lstrip(b'1')
+    zeros = len(v) - len(stripped)
+
+    digits = (b'1' * (-len(stripped) % _CHUNK_DIGITS) + stripped).translate(_DIGITS)
+    if 255 in digits:
+        invalid = next( c for c in stripped if _DIGITS[c] == 255 )
+        raise ValueError('Invalid character {!r}'.format(chr(invalid)))
+
+    n = 0
+    for i in range(0, len(digits), _CHUNK_DIGITS):
+        a, b, c, d, e = digits[i:i + _CHUNK_DIGITS]
+        n = n * _CHUNK + ((((a * 58 + b) * 58 + c) * 58 + d) * 58 + e)
+
+    return b'\0' * zeros + n.to_bytes((n.bit_length() + 7) // 8, byteorder='big')
@@ -0,0 +1,109 @@
+"""
+Convert files of receiver receipts between b64-encoded protobufs and full-service receipt objects.
+
+Files are read and written incrementally, so they may be arbitrarily large. Two formats are
+supported, chosen by file extension:
+
+NDJSON
+    Each line holds either a full-service receipt object, or a b64 receipt as a JSON string or a
+    bare line of text. Each is converted to the other form.
+
+CSV
+    Rows hold either a b64_receipt column, or the flattened full-service receipt columns in
+    RECEIPT_FIELDS. Whichever is missing is filled in, and any other columns are passed through.
+"""
+import csv
+import json
+
+from . import _b64_receipts_to_full_service_receipts, _bulk_convert, _full_service_receipts_to_b64_receipts
+
+
+RECEIPT_FIELDS = ["public_key", "confirmation", "tombstone_block", "amount_commitment", "amount_masked_value"]
+
+
+def convert_receipt_file(input_path, output_path, processes=None, chunksize=1000):
+    """Convert a .csv or NDJSON file of receipts, writing the results in input order"""
+    if str(input_path).lower().endswith(".csv"):
+        convert = convert_csv
+    else:
+        convert = convert_ndjson
+    with open(input_path, newline="") as input_file, open(output_path, "w", newline="") as output_file:
+        return convert(input_file, output_file, processes, chunksize)
+
+
+def convert_ndjson(input_file, output_file, processes=None, chunksize=1000):
+    """Convert NDJSON receipts from one text file object to another, returning the number converted"""
+    lines = ( line for line in input_file if line.strip() )
+    count = 0
+    for line in _bulk_convert(_convert_ndjson_lines, lines, processes, chunksize):
+        output_file.write(line)
+        count += 1
+    return count
+
+
+def convert_csv(input_file, output_file, processes=None, chunksize=1000):
+    """Convert CSV receipts from one text file object to another, returning the number converted"""
+    reader = csv.DictReader(input_file)
+    fieldnames = list(reader.fieldnames or [])
+    fieldnames += [ f for f in ["b64_receipt"] + RECEIPT_FIELDS if f not in fieldnames ]
+    writer = csv.DictWriter(output_file, fieldnames)
+    writer.writeheader()
+    count = 0
+    for row in _bulk_convert(_convert_csv_rows, reader, processes, chunksize):
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def _convert_ndjson_lines(lines):
+    b64_receipts = []
+    full_service_receipts = []
+    kinds = []
+    for line in lines:
+        line = line.strip()
+        if line.startswith("{"):
+            full_service_receipts.append(json.loads(line))
+            kinds.append(True)
+        else:
+            b64_receipts.append(json.loads(line) if line.startswith('"') else line)
+            kinds.append(False)
+
+    # Convert each kind in one batch, then put the results back in input order.
+    b64_results = iter(_full_service_receipts_to_b64_receipts(full_service_receipts))
+    object_results = iter(_b64_receipts_to_full_service_receipts(b64_receipts))
+    return [
+        json.dumps(next(b64_results) if is_object else next(object_results)) + "\n"
+        for is_object in kinds
+    ]
+
+
+def _convert_csv_rows(rows):
+    b64_rows = [ row for row in rows if row.get("b64_receipt") ]
+    full_service_rows = [ row for row in rows if not row.get("b64_receipt") ]
+
+    b64_receipts = [ row["b64_receipt"] for row in b64_rows ]
+    for row, receipt in zip(b64_rows, _b64_receipts_to_full_service_receipts(b64_receipts)):
+        row["public_key"] = receipt["public_key"]
+        row["confirmation"] = receipt["confirmation"]
+        row["tombstone_block"] = receipt["tombstone_block"]
+        row["amount_commitment"] = receipt["amount"]["commitment"]
+        row["amount_masked_value"] = receipt["amount"]["masked_value"]
+
+    full_service_receipts = [
+        {
+            "object": "receiver_receipt",
+            "public_key": row["public_key"],
+            "confirmation": row["confirmation"],
+            "tombstone_block": row["tombstone_block"],
+            "amount": {
+                "object": "amount",
+                "commitment": row["amount_commitment"],
+                "masked_value": row["amount_masked_value"],
+            },
+        }
+        for row in full_service_rows
+    ]
+    for row, b64_receipt in zip(full_service_rows, _full_service_receipts_to_b64_receipts(full_service_receipts)):
+        row["b64_receipt"] = b64_receipt
+
+    return rows
@@ -0,0 +1,57 @@
+"""
+Validation of compressed Ristretto255 points, as used for MobileCoin public keys.
+
+full-service decompresses the view and spend keys of every public address it is given, and refuses
+addresses whose keys are not the canonical encoding of a Ristretto point. is_valid_point applies the
+same check, following the decoding procedure of RFC 9496, section 4.3.1.
+"""
+
+_P = 2**255 - 19
+_D = 37095705934669439343138083508754565189542113879843219016388785533085940283555
+_SQRT_M1 = 19681161376707505956807079304988542015446066515923890162744021073123829784752
+
+
+def is_valid_point(data):
+    """Check that 32 bytes are the canonical encoding of a Ristretto255 point"""
+    if data is None or len(data) != 32:
+        return False
+    s = int.from_bytes(bytes(data), "little")
+    # The encoding must be canonical and non-negative.
+    if s >= _P or _is_negative(s):
+        return False
+
+    ss = s * s % _P
+    u1 = (1 - ss) % _P
+    u2 = (1 + ss) % _P
+    u2_sqr = u2 * u2 % _P
+    v = (-(_D * u1 % _P * u1) - u2_sqr) % _P
+    was_square, invsqrt = _sqrt_ratio_m1(1, v * u2_sqr % _P)
+
+    den_x = invsqrt * u2 % _P
+    den_y = invsqrt * den_x % _P * v % _P
+    x = _abs(2 * s * den_x % _P)
+    y = u1 * den_y % _P
+    t = x * y % _P
+    return was_square and not _is_negative(t) and y != 0
+
+
+def _sqrt_ratio_m1(u, v):
+    v3 = v * v % _P * v % _P
+    v7 = v3 * v3 % _P * v % _P
+    r = u * v3 % _P * pow(u * v7 % _P, (_P - 5) // 8, _P) % _P
+    check = v * r % _P * r % _P
+
+    correct_sign = check == u % _P
+    flipped_sign = check == -u % _P
+    flipped_sign_i = check == -u * _SQRT_M1 % _P
+    if flipped_sign or flipped_sign_i:
+        r = r * _SQRT_M1 % _P
+    return correct_sign or flipped_sign, _abs(r)
+
+
+def _is_negative(x):
+    return x % _P % 2 == 1
+
+
+def _abs(x):
+    return -x % _P if _is_negative(x) else x
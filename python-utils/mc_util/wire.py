@@ -0,0 +1,201 @@
+"""
+A minimal protobuf wire codec for the messages used by b58 addresses.
+
+Only external.PublicAddress, external.CompressedRistretto and the printable.PrintableWrapper
+variants, PaymentRequest and TransferPayload, are handled, and only in the canonical form written by the generated
+_pb2 classes: fields in order, no duplicates and no unknown fields. Anything else raises ValueError, so that callers can fall
+back to the protobuf runtime, which is then guaranteed to produce the same result.
+"""
+from collections import namedtuple
+
+
+PublicAddress = namedtuple(
+    "PublicAddress",
+    ["view_public_key", "spend_public_key", "fog_report_url", "fog_report_id", "fog_authority_sig"],
+    defaults=["", "", b""],
+)
+PublicAddress.__doc__ = """
+The fields of an external.PublicAddress. The keys are the CompressedRistretto data bytes, or None
+if the key's message is absent, which is distinct from a present but empty one.
+"""
+
+WRAPPER_FIELDS = ("public_address", "payment_request", "transfer_payload")
+
+_VARINT = 0
+_LENGTH_DELIMITED = 2
+
+
+def encode_public_address(address):
+    """Serialize a PublicAddress exactly as external_pb2.PublicAddress.SerializeToString would"""
+    parts = []
+    for number, key in ((1, address.view_public_key), (2, address.spend_public_key)):
+        if key is not None:
+            _append_field(parts, number, _encode_compressed_ristretto(key))
+    if address.fog_report_url:
+        _append_field(parts, 3, address.fog_report_url.encode("utf-8"))
+    if address.fog_report_id:
+        _append_field(parts, 4, address.fog_report_id.encode("utf-8"))
+    if address.fog_authority_sig:
+        _append_field(parts, 5, address.fog_authority_sig)
+    return b"".join(parts)
+
+
+def decode_public_address(data):
+    """Parse a serialized external.PublicAddress from bytes or a memoryview"""
+    values = [None, None, "", "", b""]
+    last = 0
+    for number, wire_type, value in _iter_fields(data):
+        if number <= last or number > 5 or wire_type != _LENGTH_DELIMITED:
+            raise ValueError("Unexpected field {} in PublicAddress".format(number))
+        last = number
+        if number <= 2:
+            values[number - 1] = _decode_compressed_ristretto(value)
+        elif number <= 4:
+            values[number - 1] = str(value, "utf-8")
+        else:
+            values[number - 1] = bytes(value)
+    return PublicAddress(*values)
+
+
+def encode_printable_wrapper(field, payload):
+    """Serialize a PrintableWrapper holding the serialized message `payload` in the named oneof field"""
+    parts = []
+    _append_field(parts, WRAPPER_FIELDS.index(field) + 1, payload)
+    return b"".join(parts)
+
+
+def decode_printable_wrapper(data):
+    """
+    Parse a serialized printable.PrintableWrapper, returning the name of its oneof field and a
+    memoryview of the serialized message it holds.
+    """
+    fields = list(_iter_fields(data))
+    if len(fields) != 1:
+        raise ValueError("PrintableWrapper must hold exactly one field")
+    number, wire_type, value = fields[0]
+    if not 1 <= number <= len(WRAPPER_FIELDS) or wire_type != _LENGTH_DELIMITED:
+        raise ValueError("Unexpected field {} in PrintableWrapper".format(number))
+    return WRAPPER_FIELDS[number - 1], value
+
+
+def encode_payment_request(public_address_bytes, value, memo):
+    """Serialize a printable.PaymentRequest for a serialized PublicAddress, a value in pMOB and a memo"""
+    parts = []
+    _append_field(parts, 1, public_address_bytes)
+    if value:
+        parts.append(_encode_varint(2 << 3 | _VARINT))
+        parts.append(_encode_varint(value))
+    if memo:
+        _append_field(parts, 3, memo.encode("utf-8"))
+    return b"".join(parts)
+
+
+def decode_payment_request(data):
+    """
+    Parse a serialized printable.PaymentRequest, returning a memoryview of its serialized
+    PublicAddress, or None if it has none, along with its value and memo.
+    """
+    public_address, value, memo = None, 0, ""
+    last = 0
+    for number, wire_type, field_value in _iter_fields(data):
+        if number <= last or number > 3 or wire_type != (_VARINT if number == 2 else _LENGTH_DELIMITED):
+            raise ValueError("Unexpected field {} in PaymentRequest".format(number))
+        last = number
+        if number == 1:
+            public_address = field_value
+        elif number == 2:
+            if field_value >= 1 << 64:
+                raise ValueError("PaymentRequest value out of range")
+            value = field_value
+        else:
+            memo = str(field_value, "utf-8")
+    return public_address, value, memo
+
+
+def decode_transfer_payload(data):
+    """
+    Parse a serialized printable.TransferPayload, returning its root_entropy, tx_out_public_key
+    (None if absent), memo and bip39_entropy.
+    """
+    values = [b"", None, "", b""]
+    last = 0
+    for number, wire_type, value in _iter_fields(data):
+        if number <= last or number > 4 or wire_type != _LENGTH_DELIMITED:
+            raise ValueError("Unexpected field {} in TransferPayload".format(number))
+        last = number
+        if number == 2:
+            values[1] = _decode_compressed_ristretto(value)
+        elif number == 3:
+            values[2] = str(value, "utf-8")
+        else:
+            values[number - 1] = bytes(value)
+    return tuple(values)
+
+
+def _encode_compressed_ristretto(data):
+    if not data:
+        return b""
+    parts = []
+    _append_field(parts, 1, data)
+    return b"".join(parts)
+
+
+def _decode_compressed_ristretto(data):
+    fields = list(_iter_fields(data))
+    if not fields:
+        return b""
+    number, wire_type, value = fields[0]
+    if len(fields) != 1 or number != 1 or wire_type != _LENGTH_DELIMITED or not value:
+        raise ValueError("Unexpected field {} in CompressedRistretto".format(number))
+    return bytes(value)
+
+
+def _append_field(parts, number, value):
+    parts.append(_encode_varint(number << 3 | _LENGTH_DELIMITED))
+    parts.append(_encode_varint(len(value)))
+    parts.append(value)
+
+
+def _encode_varint(n):
+    if n < 0x80:
+        return bytes((n,))
+    result = bytearray()
+    while n >= 0x80:
+        result.append(n & 0x7f | 0x80)
+        n >>= 7
+    result.append(n)
+    return bytes(result)
+
+
+def _read_varint(data, position):
+    result = 0
+    shift = 0
+    while True:
+        if position >= len(data) or shift > 63:
+            raise ValueError("Truncated varint")
+        b = data[position]
+        position += 1
+        result |= (b & 0x7f) << shift
+        if b < 0x80:
+            return result, position
+        shift += 7
+
+
+def _iter_fields(data):
+    """Yield (field number, wire type, value) for varint and length-delimited fields"""
+    data = memoryview(data)
+    position = 0
+    while position < len(data):
+        key, position = _read_varint(data, position)
+        number, wire_type = key >> 3, key & 7
+        if wire_type == _VARINT:
+            value, position = _read_varint(data, position)
+        elif wire_type == _LENGTH_DELIMITED:
+            length, position = _read_varint(data, position)
+            if position + length > len(data):
+                raise ValueError("Truncated field {}".format(number))
+            value = data[position:position + length]
+            position += length
+        else:
+            raise ValueError("Unsupported wire type {}".format(wire_type))
+        yield number, wire_type, value
@@ -10,5 +10,6 @@ setup(
     author_email='eran@mobilecoin.com',
     url='https://github.com/mobilecoinofficial/full-service/tree/main/python-utils',
     packages=['mc_util'],
-    install_requires=['base58', 'protobuf'],
+    install_requires=['protobuf'],
+    extras_require={'numpy': ['numpy']},
 )
@@ -0,0 +1,76 @@
+"""
+Measure address conversion throughput: through protobuf, one at a time, and in bulk.
+
+    python address_benchmark.py --count 100000
+"""
+import argparse
+import base64
+import os
+import time
+import zlib
+
+import mc_util
+from mc_util import b58, external_pb2, printable_pb2
+
+
+def random_b64_public_addresses(count):
+    public_address = external_pb2.PublicAddress()
+    results = []
+    for _ in range(count):
+        public_address.view_public_key.data = os.urandom(32)
+        public_address.spend_public_key.data = os.urandom(32)
+        results.append(base64.b64encode(public_address.SerializeToString()).decode('utf-8'))
+    return results
+
+
+def protobuf_b64_to_b58(b64_string):
+    """The conversion through the generated protobuf classes, for comparison with mc_util.wire"""
+    wrapper = printable_pb2.PrintableWrapper()
+    wrapper.public_address.ParseFromString(base64.b64decode(b64_string))
+    wrapper_bytes = wrapper.SerializeToString()
+    return b58.b58encode_str(zlib.crc32(wrapper_bytes).to_bytes(4, 'little') + wrapper_bytes)
+
+
+def protobuf_b58_to_b64(b58_string):
+    wrapper = printable_pb2.PrintableWrapper()
+    wrapper.ParseFromString(b58.b58decode(b58_string)[4:])
+    return base64.b64encode(wrapper.public_address.SerializeToString()).decode('utf-8')
+
+
+def measure(name, count, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print('{:<40} {:>12.0f} addresses/sec'.format(name, count / elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark mc_util address conversions.')
+    parser.add_argument('--count', type=int, default=20000, help='Number of addresses to convert.')
+    args = parser.parse_args()
+
+    b64_addresses = random_b64_public_addresses(args.count)
+    b58_addresses = [ mc_util.b64_public_address_to_b58_wrapper(a) for a in b64_addresses ]
+
+    mc_util.configure_cache(enabled=False)
+
+    measure('b64 -> b58, protobuf', args.count,
+            lambda: [ protobuf_b64_to_b58(a) for a in b64_addresses ])
+    measure('b64 -> b58, one at a time', args.count,
+            lambda: [ mc_util.b64_public_address_to_b58_wrapper(a) for a in b64_addresses ])
+    measure('b64 -> b58, bulk', args.count,
+            lambda: list(mc_util.b64_public_addresses_to_b58_wrappers(b64_addresses)))
+
+    measure('b58 -> b64, protobuf', args.count,
+            lambda: [ protobuf_b58_to_b64(a) for a in b58_addresses ])
+    measure('b58 -> b64, one at a time', args.count,
+            lambda: [ mc_util.b58_wrapper_to_b64_public_address(a) for a in b58_addresses ])
+    measure('b58 -> b64, bulk', args.count,
+            lambda: list(mc_util.b58_wrappers_to_b64_public_addresses(b58_addresses)))
+
+    assert list(mc_util.b64_public_addresses_to_b58_wrappers(b64_addresses)) == b58_addresses
+    assert list(mc_util.b58_wrappers_to_b64_public_addresses(b58_addresses)) == b64_addresses
+
+
+if __name__ == '__main__':
+    main()
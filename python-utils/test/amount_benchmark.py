@@ -0,0 +1,43 @@
+"""
+Compare mc_util.amount_arrays with per-value conversion and summing of picoMOB strings.
+
+    python amount_benchmark.py --count 1000000
+"""
+import argparse
+from decimal import Decimal
+import random
+import time
+
+from mc_util import amount_arrays
+
+
+def measure(name, count, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print('{:<28} {:>14.0f} per sec'.format(name, count / elapsed))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bulk picoMOB conversion and aggregation.')
+    parser.add_argument('--count', type=int, default=1000000, help='Number of amounts.')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    values = [ str(rng.randrange(2**64)) for _ in range(args.count) ]
+    keys = [ str(rng.randrange(100)) for _ in range(args.count) ]
+
+    expected = measure('Decimal sum', args.count, lambda: sum( Decimal(v) for v in values ))
+    measure('int sum', args.count, lambda: sum(map(int, values)))
+
+    if amount_arrays.numpy is None:
+        print('NumPy is not installed; amount_arrays uses its pure-Python fallback.')
+    amounts = measure('pmob_array', args.count, lambda: amount_arrays.pmob_array(values))
+    total = measure('sum_pmob', args.count, lambda: amount_arrays.sum_pmob(amounts))
+    assert total == expected
+    measure('group_sum_pmob', args.count, lambda: amount_arrays.group_sum_pmob(keys, amounts))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Compare mc_util's base58 codec with the base58 package on wrapper-sized inputs.
+
+    python b58_benchmark.py --count 20000 --size 100
+"""
+import argparse
+import os
+import time
+
+from mc_util import b58
+
+
+def measure(name, count, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print('{:<24} {:>12.0f} per sec'.format(name, count / elapsed))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark base58 encoding and decoding.')
+    parser.add_argument('--count', type=int, default=20000, help='Number of values to encode and decode.')
+    parser.add_argument('--size', type=int, default=100, help='Size in bytes of each value.')
+    args = parser.parse_args()
+
+    values = [ os.urandom(args.size) for _ in range(args.count) ]
+    encoded = [ b58.b58encode(v) for v in values ]
+    assert [ b58.b58decode(e) for e in encoded ] == values
+
+    encode = measure('mc_util encode', args.count, lambda: [ b58.b58encode(v) for v in values ])
+    decode = measure('mc_util decode', args.count, lambda: [ b58.b58decode(e) for e in encoded ])
+
+    try:
+        import base58
+    except ImportError:
+        print('The base58 package is not installed; skipping the comparison.')
+        return
+
+    assert [ base58.b58encode(v) for v in values ] == encoded
+    base_encode = measure('base58 encode', args.count, lambda: [ base58.b58encode(v) for v in values ])
+    base_decode = measure('base58 decode', args.count, lambda: [ base58.b58decode(e) for e in encoded ])
+    print('Speedup: {:.1f}x encode, {:.1f}x decode'.format(base_encode / encode, base_decode / decode))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Measure how long a fresh interpreter takes to import mc_util and make its first call.
+
+Each case runs in a new process, so module caches do not carry over between runs.
+
+    python import_benchmark.py --runs 20
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+B64_ADDRESS = 'CiIKIHiQHBGDToQt9r6YwSeVNRPhFgldQSLMJ9gHtFEcuB4REiIKIPYv8cM6IoWxruYS7YcoHyxouytbDxQ5oT5Ktyj5jvtq'
+
+CASES = [
+    ('python only', 'pass'),
+    ('import mc_util', 'import mc_util'),
+    ('mob2pmob', 'import mc_util; mc_util.mob2pmob("1.5")'),
+    ('checksum', 'import mc_util; mc_util.b58_string_passes_checksum("3MNQE1X")'),
+    ('address conversion', 'import mc_util; mc_util.b64_public_address_to_b58_wrapper("{}")'.format(B64_ADDRESS)),
+]
+
+TIMED = '''
+import time
+start = time.perf_counter()
+{}
+print(time.perf_counter() - start)
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark mc_util import time.')
+    parser.add_argument('--runs', type=int, default=20, help='Number of fresh interpreters per case.')
+    args = parser.parse_args()
+
+    print('{:<24} {:>10} {:>10}'.format('case', 'median ms', 'min ms'))
+    for name, code in CASES:
+        times = []
+        for _ in range(args.runs):
+            output = subprocess.check_output([sys.executable, '-c', TIMED.format(code)])
+            times.append(1000 * float(output))
+        print('{:<24} {:>10.1f} {:>10.1f}'.format(name, statistics.median(times), min(times)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+import pytest
+
+import mc_util
+
+
+B58_ADDRESS = '6UEtkm1rieLhuz2wvELPHdGiCb96zNnW856QVeGLvYzE7NhmbG1MxnoSPGqyVfEHDvxzQmaURFpZcxT9TSypVgRVAusr7svtD1TcrYj92Uh'
+B64_ADDRESS = 'CiIKIHiQHBGDToQt9r6YwSeVNRPhFgldQSLMJ9gHtFEcuB4REiIKIPYv8cM6IoWxruYS7YcoHyxouytbDxQ5oT5Ktyj5jvtq'
+
+
+def test_single_conversion():
+    assert mc_util.b58_wrapper_to_b64_public_address(B58_ADDRESS) == B64_ADDRESS
+    assert mc_util.b64_public_address_to_b58_wrapper(B64_ADDRESS) == B58_ADDRESS
+
+
+def test_bulk_conversion_matches_single():
+    b64_addresses = [B64_ADDRESS] * 5
+    b58_addresses = list(mc_util.b64_public_addresses_to_b58_wrappers(b64_addresses, chunksize=2))
+    assert b58_addresses == [B58_ADDRESS] * 5
+    assert list(mc_util.b58_wrappers_to_b64_public_addresses(iter(b58_addresses), chunksize=2)) == b64_addresses
+
+
+def test_bulk_conversion_with_fog():
+    # Addresses with more than the two keys take the one-at-a-time path.
+    public_address = mc_util.external_pb2.PublicAddress.FromString(mc_util.binascii.a2b_base64(B64_ADDRESS))
+    public_address.fog_report_url = 'fog://fog.example.com'
+    b64_address = mc_util.binascii.b2a_base64(public_address.SerializeToString(), newline=False).decode()
+    b58_addresses = list(mc_util.b64_public_addresses_to_b58_wrappers([B64_ADDRESS, b64_address]))
+    assert b58_addresses == [ mc_util.b64_public_address_to_b58_wrapper(a) for a in [B64_ADDRESS, b64_address] ]
+    assert list(mc_util.b58_wrappers_to_b64_public_addresses(b58_addresses)) == [B64_ADDRESS, b64_address]
+
+
+def test_bulk_conversion_empty():
+    assert list(mc_util.b64_public_addresses_to_b58_wrappers([])) == []
+
+
+def test_parse_b58_wrapper():
+    parsed = mc_util.parse_b58_wrapper(B58_ADDRESS)
+    assert parsed.b58_type == 'PublicAddress'
+    assert parsed.message.view_public_key.data.hex().startswith('78901c11')
+    assert mc_util.b58_string_is_public_address(B58_ADDRESS)
+
+
+def test_parse_b58_wrapper_payment_request():
+    wrapper = mc_util.printable_pb2.PrintableWrapper()
+    wrapper.payment_request.public_address.CopyFrom(mc_util.parse_b58_wrapper(B58_ADDRESS).message)
+    wrapper.payment_request.value = 1000
+    wrapper.payment_request.memo = 'coffee'
+    wrapper_bytes = wrapper.SerializeToString()
+    b58_string = mc_util.b58.b58encode_str(mc_util.zlib.crc32(wrapper_bytes).to_bytes(4, 'little') + wrapper_bytes)
+
+    parsed = mc_util.parse_b58_wrapper(b58_string)
+    assert parsed.b58_type == 'PaymentRequest'
+    assert parsed.message.value == 1000
+    assert parsed.message.memo == 'coffee'
+    assert not mc_util.b58_string_is_public_address(b58_string)
+
+
+def test_parse_b58_wrapper_invalid():
+    corrupted = B58_ADDRESS[:-1] + ('2' if B58_ADDRESS[-1] != '2' else '3')
+    assert not mc_util.b58_string_passes_checksum(corrupted)
+    assert not mc_util.b58_string_is_public_address(corrupted)
+    with pytest.raises(ValueError):
+        mc_util.parse_b58_wrapper(corrupted)
+    assert list(mc_util.parse_b58_wrappers([B58_ADDRESS, corrupted, '0', ''])) == [
+        mc_util.parse_b58_wrapper(B58_ADDRESS), None, None, None,
+    ]
+
+
+def test_payment_request_round_trip():
+    b58_string = mc_util.payment_request_to_b58(B58_ADDRESS, 1234567890, 'order 42')
+    parsed = mc_util.parse_b58_wrapper(b58_string)
+    assert parsed.b58_type == 'PaymentRequest'
+    assert parsed.message.value == 1234567890
+    assert parsed.message.memo == 'order 42'
+    assert mc_util.b58_to_payment_request(b58_string) == {
+        'public_address_b58': B58_ADDRESS,
+        'value': '1234567890',
+        'memo': 'order 42',
+    }
+
+
+def test_payment_request_matches_protobuf():
+    for amount, memo in [(0, ''), (1, ''), (2**64 - 1, 'é' * 100)]:
+        wrapper = mc_util.printable_pb2.PrintableWrapper()
+        wrapper.payment_request.public_address.CopyFrom(mc_util.parse_b58_wrapper(B58_ADDRESS).message)
+        wrapper.payment_request.value = amount
+        wrapper.payment_request.memo = memo
+        wrapper_bytes = wrapper.SerializeToString()
+        expected = mc_util.b58.b58encode_str(mc_util.zlib.crc32(wrapper_bytes).to_bytes(4, 'little') + wrapper_bytes)
+        assert mc_util.payment_request_to_b58(B58_ADDRESS, amount, memo) == expected
+
+
+def test_payment_requests_bulk():
+    requests = [ (B58_ADDRESS, i, 'order {}'.format(i)) for i in range(5) ]
+    b58_strings = list(mc_util.payment_requests_to_b58(requests))
+    assert b58_strings == [ mc_util.payment_request_to_b58(*r) for r in requests ]
+    assert [ mc_util.b58_to_payment_request(s)['value'] for s in b58_strings ] == ['0', '1', '2', '3', '4']
+
+
+def test_payment_request_invalid():
+    with pytest.raises(ValueError):
+        mc_util.payment_request_to_b58(B58_ADDRESS, -1)
+    with pytest.raises(ValueError):
+        mc_util.payment_request_to_b58(B58_ADDRESS, 2**64)
+    payment_request = mc_util.payment_request_to_b58(B58_ADDRESS, 1)
+    with pytest.raises(ValueError):
+        mc_util.payment_request_to_b58(payment_request, 1)
+    with pytest.raises(ValueError):
+        mc_util.b58_to_payment_request(B58_ADDRESS)
+
+
+def transfer_payload_b58(memo='gift'):
+    wrapper = mc_util.printable_pb2.PrintableWrapper()
+    wrapper.transfer_payload.bip39_entropy = bytes(range(32))
+    wrapper.transfer_payload.tx_out_public_key.data = bytes(range(32, 64))
+    wrapper.transfer_payload.memo = memo
+    wrapper_bytes = wrapper.SerializeToString()
+    return mc_util.b58.b58encode_str(mc_util.zlib.crc32(wrapper_bytes).to_bytes(4, 'little') + wrapper_bytes)
+
+
+def test_check_b58_type():
+    assert mc_util.check_b58_type(B58_ADDRESS) == {
+        'b58_type': 'PublicAddress',
+        'data': {'public_address_b58': B58_ADDRESS},
+    }
+    payment_request = mc_util.payment_request_to_b58(B58_ADDRESS, 5, 'memo')
+    assert mc_util.check_b58_type(payment_request) == {
+        'b58_type': 'PaymentRequest',
+        'data': {'public_address_b58': B58_ADDRESS, 'value': '5', 'memo': 'memo'},
+    }
+    assert mc_util.check_b58_type(transfer_payload_b58()) == {'b58_type': 'TransferPayload', 'data': {}}
+
+    with pytest.raises(ValueError):
+        mc_util.check_b58_type('not b58!')
+    assert list(mc_util.check_b58_types([B58_ADDRESS, '1111'])) == [mc_util.check_b58_type(B58_ADDRESS), None]
+
+
+def test_verify_address():
+    assert mc_util.verify_address(B58_ADDRESS)
+    assert not mc_util.verify_address(mc_util.payment_request_to_b58(B58_ADDRESS, 5))
+    assert not mc_util.verify_address(transfer_payload_b58())
+    assert not mc_util.verify_address('0OIl')
+
+    # A public address whose spend key is missing.
+    wrapper_bytes = mc_util.wire.encode_printable_wrapper('public_address', b'\x0a\x22\x0a\x20' + bytes(32))
+    b58_string = mc_util.b58.b58encode_str(mc_util.zlib.crc32(wrapper_bytes).to_bytes(4, 'little') + wrapper_bytes)
+    assert mc_util.check_b58_type(b58_string)['b58_type'] == 'PublicAddress'
+    assert not mc_util.verify_address(b58_string)
+
+    # Keys of the right length which are not Ristretto points, which the server refuses.
+    b58_string = _public_address_b58(b'\x01' * 32, b'\x02' * 32)
+    assert not mc_util.verify_address(b58_string)
+    with pytest.raises(ValueError):
+        mc_util.payment_request_to_b58(b58_string, 5)
+
+
+def _public_address_b58(view_public_key, spend_public_key):
+    public_address = mc_util.wire.encode_public_address(mc_util.wire.PublicAddress(view_public_key, spend_public_key))
+    wrapper_bytes = mc_util.wire.encode_printable_wrapper('public_address', public_address)
+    return mc_util.b58.b58encode_str(mc_util.zlib.crc32(wrapper_bytes).to_bytes(4, 'little') + wrapper_bytes)
+
+
+def test_ristretto_points():
+    # Test vectors from RFC 9496: multiples of the generator, then invalid encodings.
+    for point in [
+        '0000000000000000000000000000000000000000000000000000000000000000',
+        'e2f2ae0a6abc4e71a884a961c500515f58e30b6aa582dd8db6a65945e08d2d76',
+        '6a493210f7499cd17fecb510ae0cea23a110e8d5b901f8acadd3095c73a3b919',
+        '94741f5d5d52755ece4f23f044ee27d5d1ea1e2bd196b462166b16152a9d0259',
+    ]:
+        assert mc_util.ristretto.is_valid_point(bytes.fromhex(point))
+    for point in [
+        '00ffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff',
+        'edffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff7f',
+        '0100000000000000000000000000000000000000000000000000000000000000',
+        '26948d35ca62e643e26a83177332e6b6afeb9d08e4268b650f1f5bbd8d81d371',
+        '3eb858e78f5a7254d8c9731174a94f76755fd3941c0ac93735c07ba14579630e',
+        'ecffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff7f',
+    ]:
+        assert not mc_util.ristretto.is_valid_point(bytes.fromhex(point))
+    assert not mc_util.ristretto.is_valid_point(bytes(31))
+
+
+def test_amounts():
+    assert mc_util.mob2pmob('1.5') == 1500000000000
+    assert repr(mc_util.mob2pmob('0.0000000000015')) == 'Pmob(2)'
+    with pytest.raises(TypeError):
+        mc_util.mob2pmob(mc_util.Pmob(7))
+    with pytest.raises(ValueError):
+        mc_util.mob2pmob(2**64 // 10**12 + 1)
+    assert mc_util.pmob2mob(mc_util.Pmob.total(['1000000000000', 500000000000])) == mc_util.Decimal('1.5')
+    assert mc_util.Pmob(123400000000).format() == '0.1234'
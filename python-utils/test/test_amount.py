@@ -0,0 +1,31 @@
+from decimal import Decimal
+import json
+import random
+
+from mc_util.amount import Pmob
+
+
+def test_from_mob_matches_decimal():
+    rng = random.Random(0)
+    for _ in range(10000):
+        whole = str(rng.randrange(10**rng.randrange(1, 8)))
+        fraction = "".join( rng.choice("0123456789") for _ in range(rng.randrange(0, 16)) )
+        s = rng.choice(["", "-"]) + whole + ("." + fraction if fraction else "")
+        assert Pmob.from_mob(s) == round(Decimal(s) * 10**12), s
+
+    # Exactly half rounds to even.
+    assert Pmob.from_mob("0.0000000000005") == 0
+    assert Pmob.from_mob("0.0000000000015") == 2
+    assert Pmob.from_mob(".5") == 500000000000
+    assert Pmob.from_mob("1e-3") == 1000000000
+    assert Pmob.from_mob(2) == 2 * 10**12
+
+
+def test_behaves_as_int():
+    total = sum( Pmob(v) for v in ["1", "2", "3"] )
+    assert repr(total) == "Pmob(6)"
+    assert repr(total - 10) == "Pmob(-4)"
+    assert str(total) == "6"
+    assert json.dumps({"value": total}) == '{"value": 6}'
+    assert total.to_mob() == Decimal("6E-12")
+    assert repr(Pmob.total(["1", 2, Pmob(3)])) == "Pmob(6)"
@@ -0,0 +1,58 @@
+from decimal import Decimal
+import random
+
+import pytest
+
+from mc_util import amount_arrays
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(amount_arrays, "numpy", None)
+    return request.param
+
+
+def test_pmob_array(backend):
+    values = ["0", "1", "400000000", str(2**64 - 1)]
+    assert [ int(v) for v in amount_arrays.pmob_array(values) ] == [0, 1, 400000000, 2**64 - 1]
+    assert [ int(v) for v in amount_arrays.pmob_array([5, 2**63]) ] == [5, 2**63]
+    assert len(amount_arrays.pmob_array([])) == 0
+
+    for bad in [["-1"], [str(2**64)], ["1.5"], ["123456789012345678901"], [-1]]:
+        with pytest.raises(ValueError):
+            amount_arrays.pmob_array(bad)
+
+
+def test_mob_array(backend):
+    values = ["1", "0.5", ".0004", "1.000000000001", "12345.678", "1e-3", "0.0000000000015"]
+    expected = [ round(Decimal(v) * 10**12) for v in values ]
+    assert [ int(v) for v in amount_arrays.mob_array(values) ] == expected
+
+    for bad in [["abc"], ["1", ""], ["1.2.3"], ["Infinity"], ["NaN"], ["-1"], [str(2**64)]]:
+        with pytest.raises(ValueError):
+            amount_arrays.mob_array(bad)
+
+
+def test_sums_are_exact(backend):
+    rng = random.Random(0)
+    values = [ rng.randrange(2**62, 2**64) for _ in range(1000) ]
+    amounts = amount_arrays.pmob_array([ str(v) for v in values ])
+    assert amount_arrays.sum_pmob(amounts) == sum(values)
+
+    keys = [ rng.choice(["a", "b", "c"]) for _ in values ]
+    totals = amount_arrays.group_sum_pmob(keys, amounts)
+    assert totals == { k: sum( v for v, key in zip(values, keys) if key == k ) for k in set(keys) }
+
+
+def test_sum_txos_by(backend):
+    txos = [
+        {"value_pmob": "100", "subaddress_index": "0", "received_block_index": "7"},
+        {"value_pmob": "250", "subaddress_index": "1", "received_block_index": "7"},
+        {"value_pmob": "50", "subaddress_index": None, "received_block_index": "8"},
+        {"value_pmob": "1", "subaddress_index": "0", "received_block_index": "9"},
+    ]
+    assert amount_arrays.sum_txos_by(txos, "subaddress_index") == {"0": 101, "1": 250, None: 50}
+    assert amount_arrays.sum_txos_by(txos, "received_block_index") == {"7": 350, "8": 50, "9": 1}
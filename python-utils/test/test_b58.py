@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from mc_util import b58
+
+
+VECTORS = [
+    (b'', ''),
+    (b'\0', '1'),
+    (b'\0\0\x01', '112'),
+    (b'hello world', 'StV1DL6CwTryKyV'),
+    (bytes.fromhex('00000000000000000000'), '1111111111'),
+    (bytes.fromhex('0000287fb4cd'), '11233QC4'),
+]
+
+
+@pytest.mark.parametrize('data, encoded', VECTORS)
+def test_vectors(data, encoded):
+    assert b58.b58encode_str(data) == encoded
+    assert b58.b58encode(data) == encoded.encode('ascii')
+    assert b58.b58decode(encoded) == data
+    assert b58.b58decode(encoded.encode('ascii')) == data
+
+
+def test_matches_base58_package():
+    base58 = pytest.importorskip('base58')
+    for length in list(range(40)) + [78, 100, 200]:
+        for zeros in range(3):
+            data = b'\0' * zeros + os.urandom(length)
+            encoded = base58.b58encode(data)
+            assert b58.b58encode(data) == encoded
+            assert b58.b58decode(encoded) == base58.b58decode(encoded)
+
+
+def test_invalid_character():
+    with pytest.raises(ValueError, match="Invalid character '0'"):
+        b58.b58decode('abc0')
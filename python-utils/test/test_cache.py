@@ -0,0 +1,68 @@
+import mc_util
+
+from test_addresses import B58_ADDRESS, B64_ADDRESS
+
+
+RECEIPT = {
+    'object': 'receiver_receipt',
+    'public_key': '0a20' + '11' * 32,
+    'confirmation': '0a20' + '22' * 32,
+    'tombstone_block': '1234',
+    'amount': {
+        'object': 'amount',
+        'commitment': '33' * 32,
+        'masked_value': '5678',
+    },
+}
+
+
+def setup_function():
+    mc_util.configure_cache()
+
+
+def test_address_cache_hits():
+    for _ in range(3):
+        assert mc_util.b58_wrapper_to_b64_public_address(B58_ADDRESS) == B64_ADDRESS
+    info = mc_util.cache_info()['b58_wrapper_to_b64_public_address']
+    assert (info['hits'], info['misses'], info['currsize']) == (2, 1, 1)
+
+    mc_util.clear_cache()
+    assert mc_util.cache_info()['b58_wrapper_to_b64_public_address']['currsize'] == 0
+
+
+def test_cache_size_and_disable():
+    mc_util.configure_cache(maxsize=1)
+    mc_util.b58_string_passes_checksum(B58_ADDRESS)
+    mc_util.b58_string_passes_checksum('2')
+    mc_util.b58_string_passes_checksum(B58_ADDRESS)
+    assert mc_util.cache_info()['b58_string_passes_checksum']['misses'] == 3
+
+    mc_util.configure_cache(enabled=False)
+    assert mc_util.b64_public_address_to_b58_wrapper(B64_ADDRESS) == B58_ADDRESS
+    assert mc_util.b64_public_address_to_b58_wrapper(B64_ADDRESS) == B58_ADDRESS
+    info = mc_util.cache_info()['b64_public_address_to_b58_wrapper']
+    assert (info['hits'], info['currsize']) == (0, 0)
+
+
+def test_receipt_round_trip_returns_copies():
+    b64_receipt = mc_util.full_service_receipt_to_b64_receipt(RECEIPT)
+    assert mc_util.full_service_receipt_to_b64_receipt(RECEIPT) == b64_receipt
+
+    receipt = mc_util.b64_receipt_to_full_service_receipt(b64_receipt)
+    assert receipt == RECEIPT
+    receipt['amount']['masked_value'] = '0'
+    assert mc_util.b64_receipt_to_full_service_receipt(b64_receipt) == RECEIPT
+
+    info = mc_util.cache_info()
+    assert info['full_service_receipt_to_b64_receipt']['hits'] == 1
+    assert info['b64_receipt_to_full_service_receipt']['hits'] == 1
+
+
+def test_unhashable_inputs():
+    b58_bytes = B58_ADDRESS.encode()
+    assert mc_util.b58_string_passes_checksum(bytearray(b58_bytes))
+    assert mc_util.b58_string_passes_checksum(memoryview(b58_bytes))
+    assert mc_util.b58_wrapper_to_b64_public_address(bytearray(b58_bytes)) == B64_ADDRESS
+    assert mc_util.b64_public_address_to_b58_wrapper(bytearray(B64_ADDRESS.encode())) == B58_ADDRESS
+    b64_receipt = mc_util.full_service_receipt_to_b64_receipt(RECEIPT)
+    assert mc_util.b64_receipt_to_full_service_receipt(memoryview(b64_receipt.encode())) == RECEIPT
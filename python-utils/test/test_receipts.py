@@ -0,0 +1,84 @@
+import csv
+import json
+import os
+
+import mc_util
+from mc_util import receipts
+
+
+def random_receipts(count):
+    for i in range(count):
+        yield {
+            'object': 'receiver_receipt',
+            'public_key': '0a20' + os.urandom(32).hex(),
+            'confirmation': '0a20' + os.urandom(32).hex(),
+            'tombstone_block': str(1000 + i),
+            'amount': {
+                'object': 'amount',
+                'commitment': os.urandom(32).hex() if i % 5 else '',
+                'masked_value': str(i * 2**40),
+            },
+        }
+
+
+def test_bulk_matches_single():
+    full_service_receipts = list(random_receipts(25))
+    b64_receipts = [ mc_util.full_service_receipt_to_b64_receipt(r) for r in full_service_receipts ]
+
+    assert list(mc_util.full_service_receipts_to_b64_receipts(full_service_receipts, chunksize=7)) == b64_receipts
+    assert list(mc_util.b64_receipts_to_full_service_receipts(b64_receipts, chunksize=7)) == full_service_receipts
+    assert list(mc_util.b64_receipts_to_full_service_receipts(b64_receipts, processes=2, chunksize=4)) == full_service_receipts
+
+
+def test_convert_ndjson(tmp_path):
+    full_service_receipts = list(random_receipts(10))
+    b64_receipts = [ mc_util.full_service_receipt_to_b64_receipt(r) for r in full_service_receipts ]
+
+    input_path = tmp_path / 'receipts.ndjson'
+    with open(input_path, 'w') as f:
+        for i, (receipt, b64_receipt) in enumerate(zip(full_service_receipts, b64_receipts)):
+            if i % 3 == 0:
+                f.write(json.dumps(receipt) + '\n')
+            elif i % 3 == 1:
+                f.write(json.dumps(b64_receipt) + '\n')
+            else:
+                f.write(b64_receipt + '\n\n')
+
+    output_path = tmp_path / 'converted.ndjson'
+    assert receipts.convert_receipt_file(input_path, output_path, chunksize=4) == 10
+    with open(output_path) as f:
+        converted = [ json.loads(line) for line in f ]
+    assert converted == [
+        b64_receipt if i % 3 == 0 else receipt
+        for i, (receipt, b64_receipt) in enumerate(zip(full_service_receipts, b64_receipts))
+    ]
+
+
+def test_convert_csv(tmp_path):
+    full_service_receipts = list(random_receipts(6))
+    b64_receipts = [ mc_util.full_service_receipt_to_b64_receipt(r) for r in full_service_receipts ]
+
+    input_path = tmp_path / 'receipts.csv'
+    with open(input_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, ['order_id', 'b64_receipt'])
+        writer.writeheader()
+        for i, b64_receipt in enumerate(b64_receipts):
+            writer.writerow({'order_id': i, 'b64_receipt': b64_receipt})
+
+    output_path = tmp_path / 'converted.csv'
+    assert receipts.convert_receipt_file(input_path, output_path, chunksize=4) == 6
+    with open(output_path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [ r['order_id'] for r in rows ] == [ str(i) for i in range(6) ]
+    assert [ r['amount_masked_value'] for r in rows ] == [ r['amount']['masked_value'] for r in full_service_receipts ]
+
+    # Converting the flattened columns alone gives the original b64 receipts back.
+    round_trip_path = tmp_path / 'round_trip.csv'
+    with open(round_trip_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, receipts.RECEIPT_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({ k: row[k] for k in receipts.RECEIPT_FIELDS })
+    receipts.convert_receipt_file(round_trip_path, tmp_path / 'b64.csv')
+    with open(tmp_path / 'b64.csv', newline='') as f:
+        assert [ r['b64_receipt'] for r in csv.DictReader(f) ] == b64_receipts
@@ -0,0 +1,83 @@
+import os
+import random
+
+import pytest
+
+import mc_util
+from mc_util import external_pb2, printable_pb2, wire
+
+
+def random_public_addresses():
+    rng = random.Random(0)
+    for i in range(200):
+        public_address = external_pb2.PublicAddress()
+        if i % 10 != 1:
+            public_address.view_public_key.data = os.urandom(32)
+        if i % 10 == 2:
+            public_address.spend_public_key.SetInParent()
+        elif i % 10 != 3:
+            public_address.spend_public_key.data = os.urandom(rng.choice([32, 200]))
+        if i % 2:
+            public_address.fog_report_url = 'fog://fog.example.com:{}'.format(i)
+            public_address.fog_report_id = str(i) if i % 3 else ''
+            public_address.fog_authority_sig = os.urandom(rng.randrange(64, 300))
+        yield public_address
+
+
+def test_public_address_matches_protobuf():
+    for public_address in random_public_addresses():
+        data = public_address.SerializeToString()
+        decoded = wire.decode_public_address(data)
+        assert decoded.view_public_key == (public_address.view_public_key.data if public_address.HasField('view_public_key') else None)
+        assert decoded.fog_report_url == public_address.fog_report_url
+        assert decoded.fog_authority_sig == public_address.fog_authority_sig
+        assert wire.encode_public_address(decoded) == data
+
+
+def test_printable_wrapper_matches_protobuf():
+    for public_address in random_public_addresses():
+        wrapper = printable_pb2.PrintableWrapper()
+        wrapper.public_address.CopyFrom(public_address)
+        data = wrapper.SerializeToString()
+        payload = public_address.SerializeToString()
+
+        assert wire.encode_printable_wrapper('public_address', payload) == data
+        field, decoded = wire.decode_printable_wrapper(memoryview(data))
+        assert field == 'public_address'
+        assert decoded == payload
+
+
+@pytest.mark.parametrize('data', [
+    b'\x0a\x02\x0a',          # truncated field
+    b'\x0a\x22\x0a\x20',      # length past the end
+    b'\x30\x01',              # unknown field
+    b'\x12\x00\x0a\x00',      # out of order
+    b'\x0d\x00\x00\x00\x00',  # fixed32 wire type
+])
+def test_rejects_unexpected_input(data):
+    with pytest.raises(ValueError):
+        wire.decode_public_address(data)
+
+
+def test_conversion_falls_back_to_protobuf():
+    public_address = next(random_public_addresses())
+    # An unknown field, which protobuf keeps when re-serializing.
+    data = public_address.SerializeToString() + b'\x30\x01'
+    wrapper = printable_pb2.PrintableWrapper()
+    wrapper.public_address.ParseFromString(data)
+    wrapper_bytes = wrapper.SerializeToString()
+
+    assert mc_util._public_address_to_wrapper_bytes(data) == wrapper_bytes
+    assert mc_util._wrapper_to_public_address_bytes(wrapper_bytes) == data
+
+
+def test_transfer_payload_matches_protobuf():
+    transfer_payload = printable_pb2.TransferPayload()
+    assert wire.decode_transfer_payload(transfer_payload.SerializeToString()) == (b'', None, '', b'')
+
+    transfer_payload.root_entropy = os.urandom(32)
+    transfer_payload.tx_out_public_key.data = os.urandom(32)
+    transfer_payload.memo = 'happy birthday'
+    assert wire.decode_transfer_payload(transfer_payload.SerializeToString()) == (
+        transfer_payload.root_entropy, transfer_payload.tx_out_public_key.data, 'happy birthday', b'',
+    )